@@ -0,0 +1,445 @@
+"""Record/replay cassettes for provider traffic (gateway, fal, Suno).
+
+Recording wraps the real clients at the same seams the stubs use and stores
+every exchange with its observed latency in <cassette>/cassette.json; media
+the providers return (clips, BGM) is downloaded to <cassette>/media/ so a
+replay needs no network at all:
+
+- gateway: the `get_llm_client()` singleton → each chat.completions.create()
+  response + latency (streamed calls: every chunk with its offset)
+- fal: the `fal_client` module used by veo_client → result, queue wait and run
+  time per submitted job; storage uploads → hosted URL + latency by content hash
+- Suno: the shared httpx client (generate / record-info) + the callbacks, with
+  their offsets from the generate call
+
+Replay serves the recorded responses with the recorded timings (× scale).
+Exchanges are matched by request content (model + messages, fal arguments);
+when a request has no exact match — e.g. N concurrent sessions replaying a
+one-session cassette — the next recording for the same model is reused, so
+timings stay realistic even when prompts differ.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+
+from bench.stubs import FakeFal
+
+logger = logging.getLogger(__name__)
+
+_MEDIA_SCHEME = "cassette-media://"
+_MEDIA_SUFFIXES = (".mp4", ".mov", ".webm", ".mp3", ".wav", ".m4a", ".png", ".jpg", ".jpeg", ".webp")
+
+
+def _key(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+class Cassette:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.media_dir = self.path / "media"
+        self.entries: list[dict] = []
+        # replay state: kind → consumed entry indexes / per-group round-robin cursor
+        self._used: set[int] = set()
+        self._cursor: dict[tuple[str, str], int] = {}
+        self._background: set[asyncio.Task] = set()
+
+    # ── persistence ──
+
+    def load(self) -> "Cassette":
+        self.entries = json.loads((self.path / "cassette.json").read_text())["entries"]
+        return self
+
+    async def save(self) -> None:
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / "cassette.json").write_text(
+            json.dumps({"version": 1, "entries": self.entries}, ensure_ascii=False, indent=1)
+        )
+        logger.info("[cassette] saved %d exchanges → %s", len(self.entries), self.path)
+
+    # ── media ──
+
+    async def _localize(self, obj):
+        """Download media URLs in a provider result into the cassette; rewrite them."""
+        if isinstance(obj, dict):
+            return {k: await self._localize(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [await self._localize(v) for v in obj]
+        if isinstance(obj, str) and obj.startswith(("http://", "https://")):
+            suffix = Path(urlparse(obj).path).suffix.lower()
+            if suffix in _MEDIA_SUFFIXES:
+                name = hashlib.sha256(obj.encode()).hexdigest()[:16] + suffix
+                target = self.media_dir / name
+                if not target.exists():
+                    self.media_dir.mkdir(parents=True, exist_ok=True)
+                    try:
+                        async with httpx.AsyncClient(timeout=120, follow_redirects=True) as client:
+                            resp = await client.get(obj)
+                            resp.raise_for_status()
+                        target.write_bytes(resp.content)
+                    except httpx.HTTPError as e:
+                        logger.warning("[cassette] media not captured (%s): %s", e, obj)
+                        return obj
+                return _MEDIA_SCHEME + name
+        return obj
+
+    def _expand(self, obj, media_base_url: str):
+        if isinstance(obj, dict):
+            return {k: self._expand(v, media_base_url) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self._expand(v, media_base_url) for v in obj]
+        if isinstance(obj, str) and obj.startswith(_MEDIA_SCHEME):
+            return f"{media_base_url}/{obj[len(_MEDIA_SCHEME):]}"
+        return obj
+
+    # ── replay matching ──
+
+    def _take(self, kind: str, group: str, key: str) -> dict:
+        candidates = [i for i, e in enumerate(self.entries) if e["kind"] == kind]
+        if not candidates:
+            raise LookupError(f"cassette has no {kind} exchanges")
+        for i in candidates:
+            if i not in self._used and self.entries[i].get("key") == key:
+                self._used.add(i)
+                return self.entries[i]
+        same_group = [i for i in candidates if self.entries[i].get("group") == group] or candidates
+        cursor = self._cursor.get((kind, group), 0)
+        self._cursor[(kind, group)] = cursor + 1
+        return self.entries[same_group[cursor % len(same_group)]]
+
+    # ── install ──
+
+    def record(self) -> None:
+        """Wrap the real gateway / fal / Suno clients; await save() when done."""
+        from src.routers import music
+        from src.services import llm_client, suno_client, veo_client
+
+        llm_client._client = _RecordingLLM(llm_client.get_llm_client(), self)
+        veo_client.fal_client = _RecordingFal(veo_client.fal_client, self)
+        suno_client._suno_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=15.0, read=30.0, write=30.0, pool=10.0),
+            transport=_RecordingSunoTransport(httpx.AsyncHTTPTransport(), self),
+        )
+        real_handler = suno_client.handle_suno_callback
+
+        def handle_callback(body: dict) -> None:
+            self._record_suno_callback(body)
+            real_handler(body)
+
+        # The router imported the function by name
+        suno_client.handle_suno_callback = music.handle_suno_callback = handle_callback
+
+    def replay(self, media_base_url: str, scale: float = 1.0) -> None:
+        """Serve recorded exchanges; media URLs point at media_base_url (serving media_dir)."""
+        from src.services import llm_client, suno_client, veo_client
+
+        llm_client._client = _ReplayLLM(self, scale)
+        veo_client.fal_client = _ReplayFal(self, media_base_url, scale)
+        suno_client._suno_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(_ReplaySuno(self, media_base_url, scale).handle)
+        )
+
+    # ── Suno recording helpers ──
+
+    def _suno_entry(self, task_id: str) -> dict | None:
+        return next((e for e in self.entries if e["kind"] == "suno" and e["task_id"] == task_id), None)
+
+    def _record_suno_callback(self, body: dict) -> None:
+        data = body.get("data", body)
+        task_id = data.get("task_id") or data.get("taskId") or body.get("taskId") or ""
+        entry = self._suno_entry(task_id)
+        if entry is None:
+            return
+        offset = time.time() - entry["submitted_at"]
+        callback = {"offset": offset, "body": body}
+        entry["callbacks"].append(callback)
+
+        async def localize():
+            callback["body"] = await self._localize(body)
+
+        task = asyncio.create_task(localize())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+# ── gateway ──
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class _RecordingLLM:
+    """Quacks like AsyncOpenAI for chat.completions.create()."""
+
+    def __init__(self, real, cassette: Cassette):
+        self.chat = _Namespace(completions=_Namespace(create=self._create))
+        self._real = real
+        self._cassette = cassette
+
+    async def _create(self, **kwargs):
+        t0 = time.time()
+        response = await self._real.chat.completions.create(**kwargs)
+        entry = {
+            "kind": "gateway",
+            "group": kwargs.get("model", ""),
+            "key": _key({"model": kwargs.get("model"), "messages": kwargs.get("messages")}),
+            "latency": time.time() - t0,
+        }
+        self._cassette.entries.append(entry)
+        if not kwargs.get("stream"):
+            entry["response"] = response.model_dump()
+            return response
+
+        # Streamed: keep every chunk with its offset from the request
+        entry["chunks"] = []
+
+        async def chunks():
+            async for chunk in response:
+                entry["chunks"].append({"offset": time.time() - t0, "chunk": chunk.model_dump()})
+                yield chunk
+
+        return chunks()
+
+
+class _ReplayLLM:
+    def __init__(self, cassette: Cassette, scale: float):
+        self.chat = _Namespace(completions=_Namespace(create=self._create))
+        self._cassette = cassette
+        self._scale = scale
+
+    async def _create(self, **kwargs):
+        from openai.types.chat import ChatCompletion
+
+        model = kwargs.get("model", "")
+        entry = self._cassette._take(
+            "gateway", model, _key({"model": model, "messages": kwargs.get("messages")}),
+        )
+        if kwargs.get("stream"):
+            return self._stream(entry)
+        if "chunks" in entry:
+            # Recorded streamed, requested whole: wait for the last chunk, join the text
+            await asyncio.sleep(entry["chunks"][-1]["offset"] * self._scale if entry["chunks"] else 0)
+            return ChatCompletion.model_validate(_join_chunks(entry["chunks"]))
+        await asyncio.sleep(entry["latency"] * self._scale)
+        return ChatCompletion.model_validate(entry["response"])
+
+    async def _stream(self, entry: dict):
+        from openai.types.chat import ChatCompletionChunk
+
+        t0 = time.time()
+        if "chunks" in entry:
+            for recorded in entry["chunks"]:
+                await asyncio.sleep(max(0.0, t0 + recorded["offset"] * self._scale - time.time()))
+                yield ChatCompletionChunk.model_validate(recorded["chunk"])
+            return
+        # Recorded whole, requested streamed: one chunk when the response completed
+        await asyncio.sleep(entry["latency"] * self._scale)
+        response = entry["response"]
+        yield ChatCompletionChunk.model_validate({
+            "id": response["id"], "object": "chat.completion.chunk", "created": response["created"],
+            "model": response["model"],
+            "choices": [{"index": 0, "delta": {"role": "assistant", "content": c["message"].get("content")},
+                         "finish_reason": c.get("finish_reason")} for c in response["choices"]],
+        })
+
+
+def _join_chunks(chunks: list[dict]) -> dict:
+    first = chunks[0]["chunk"]
+    content = "".join(
+        (c["chunk"]["choices"][0]["delta"].get("content") or "") for c in chunks if c["chunk"]["choices"]
+    )
+    return {
+        "id": first["id"], "object": "chat.completion", "created": first["created"], "model": first["model"],
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+# ── fal ──
+
+class _RecordingHandle:
+    def __init__(self, handle, fal: "_RecordingFal", application: str, arguments: dict):
+        self._handle = handle
+        self._fal = fal
+        self._application = application
+        self._arguments = arguments
+        self.request_id = handle.request_id
+        self.submitted_at = time.time()
+        self.started_at: float | None = None
+
+    async def iter_events(self, **kwargs):
+        async for update in self._handle.iter_events(**kwargs):
+            if self.started_at is None and isinstance(update, self._fal.InProgress):
+                self.started_at = time.time()
+            yield update
+
+    async def get(self):
+        result = await self._handle.get()
+        done_at = time.time()
+        started_at = self.started_at or self.submitted_at
+        self._fal._cassette.entries.append({
+            "kind": "fal",
+            "group": self._application,
+            "key": _key(self._arguments),
+            "queue_s": started_at - self.submitted_at,
+            "run_s": done_at - started_at,
+            "result": await self._fal._cassette._localize(result),
+        })
+        return result
+
+
+class _RecordingFal:
+    """Wraps the fal_client module: records submit → events → result timings."""
+
+    def __init__(self, real, cassette: Cassette):
+        self._real = real
+        self._cassette = cassette
+        self.Queued = real.Queued
+        self.InProgress = real.InProgress
+        self.Completed = real.Completed
+
+    async def upload_async(self, data: bytes, content_type: str, file_name: str | None = None) -> str:
+        t0 = time.time()
+        url = await self._real.upload_async(data, content_type, file_name=file_name)
+        self._cassette.entries.append({
+            "kind": "fal_upload", "group": content_type, "key": _key(hashlib.sha256(data).hexdigest()),
+            "url": url, "latency": time.time() - t0,
+        })
+        return url
+
+    async def submit_async(self, application: str, arguments: dict):
+        handle = await self._real.submit_async(application, arguments=arguments)
+        return _RecordingHandle(handle, self, application, arguments)
+
+    async def result_async(self, application: str, request_id: str):
+        return await self._real.result_async(application, request_id)
+
+    async def cancel_async(self, application: str, request_id: str):
+        return await self._real.cancel_async(application, request_id)
+
+
+class _ReplayFal(FakeFal):
+    def __init__(self, cassette: Cassette, media_base_url: str, scale: float):
+        super().__init__(latency=None, media_base_url=media_base_url)
+        self._cassette = cassette
+        self._scale = scale
+
+    async def upload_async(self, data: bytes, content_type: str, file_name: str | None = None) -> str:
+        # Same URL as recorded for the same bytes, so the job arguments match exactly
+        try:
+            entry = self._cassette._take("fal_upload", content_type, _key(hashlib.sha256(data).hexdigest()))
+        except LookupError:  # cassette from before frame uploads
+            return f"{self.media_base_url}/uploads/{hashlib.sha256(data).hexdigest()[:16]}"
+        await asyncio.sleep(entry["latency"] * self._scale)
+        return entry["url"]
+
+    def _plan(self, application: str, arguments: dict) -> tuple[float, float, dict]:
+        entry = self._cassette._take("fal", application, _key(arguments))
+        return (
+            entry["queue_s"] * self._scale,
+            entry["run_s"] * self._scale,
+            self._cassette._expand(entry["result"], self.media_base_url),
+        )
+
+
+# ── Suno ──
+
+class _RecordingSunoTransport(httpx.AsyncBaseTransport):
+    def __init__(self, real: httpx.AsyncBaseTransport, cassette: Cassette):
+        self._real = real
+        self._cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        t0 = time.time()
+        response = await self._real.handle_async_request(request)
+        await response.aread()
+        latency = time.time() - t0
+        try:
+            body = json.loads(response.content)
+        except ValueError:
+            return response
+
+        path = request.url.path
+        if path.endswith("/generate") and request.method == "POST":
+            data = body.get("data") if isinstance(body, dict) else None
+            task_id = data.get("taskId") if isinstance(data, dict) else None
+            self._cassette.entries.append({
+                "kind": "suno", "group": "suno", "task_id": task_id or "",
+                "submitted_at": time.time(),
+                "generate": {"status": response.status_code, "latency": latency, "body": body},
+                "callbacks": [], "polls": [],
+            })
+        elif path.endswith("/record-info"):
+            entry = self._cassette._suno_entry(request.url.params.get("taskId", ""))
+            if entry is not None:
+                entry["polls"].append({
+                    "offset": time.time() - entry["submitted_at"], "latency": latency,
+                    "status": response.status_code, "body": await self._cassette._localize(body),
+                })
+        return response
+
+    async def aclose(self) -> None:
+        await self._real.aclose()
+
+
+class _ReplaySuno:
+    """httpx.MockTransport handler: generate → scheduled callbacks, record-info by offset."""
+
+    def __init__(self, cassette: Cassette, media_base_url: str, scale: float):
+        self._cassette = cassette
+        self._media_base_url = media_base_url
+        self._scale = scale
+        # replayed task_id → (recorded entry, submitted at)
+        self._tasks: dict[str, tuple[dict, float]] = {}
+
+    def _rewrite(self, body, recorded_id: str, task_id: str):
+        body = self._cassette._expand(body, self._media_base_url)
+        return json.loads(json.dumps(body).replace(recorded_id, task_id)) if recorded_id else body
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        from src.services import suno_client
+
+        if request.url.path.endswith("/generate") and request.method == "POST":
+            entry = self._cassette._take("suno", "suno", "")
+            task_id = uuid.uuid4().hex
+            await asyncio.sleep(entry["generate"]["latency"] * self._scale)
+            submitted_at = time.time()
+            self._tasks[task_id] = (entry, submitted_at)
+
+            for callback in entry["callbacks"]:
+                async def fire(callback=callback):
+                    await asyncio.sleep(max(0.0, submitted_at + callback["offset"] * self._scale - time.time()))
+                    suno_client.handle_suno_callback(self._rewrite(callback["body"], entry["task_id"], task_id))
+
+                task = asyncio.create_task(fire())
+                self._cassette._background.add(task)
+                task.add_done_callback(self._cassette._background.discard)
+
+            body = self._rewrite(entry["generate"]["body"], entry["task_id"], task_id)
+            return httpx.Response(entry["generate"]["status"], json=body)
+
+        if request.url.path.endswith("/record-info"):
+            task_id = request.url.params.get("taskId", "")
+            if task_id not in self._tasks or not self._tasks[task_id][0]["polls"]:
+                return httpx.Response(200, json={"code": 404, "msg": "not recorded", "data": None})
+            entry, submitted_at = self._tasks[task_id]
+            elapsed = (time.time() - submitted_at) / (self._scale or 1.0)
+            # Latest poll recorded at or before this point in the task's life
+            poll = next(
+                (p for p in reversed(entry["polls"]) if p["offset"] <= elapsed),
+                entry["polls"][0],
+            )
+            await asyncio.sleep(poll["latency"] * self._scale)
+            return httpx.Response(poll["status"], json=self._rewrite(poll["body"], entry["task_id"], task_id))
+
+        return httpx.Response(404, json={"code": 404, "msg": "not recorded"})
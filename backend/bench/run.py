@@ -0,0 +1,297 @@
+"""Offline end-to-end benchmark: teaser pipelines against local stub providers.
+
+Runs N concurrent sessions through the real FastAPI app (session → blueprint →
+teaser → status polling) or straight through DirectorAgent.produce_teaser,
+with the gateway / fal / Suno replaced by bench/stubs.py. No network needed
+(ffmpeg is used for test media and the final render when installed).
+
+Reports per concurrency level: wall time, per-session latency, stage overlap
+(sum of stage time / union of stage time, from the pipeline traces), the most
+common critical-path bottleneck and peak RSS.
+
+Instead of the synthetic stubs, provider traffic can be recorded once against
+the real providers and replayed with its recorded latencies (bench/cassette.py).
+With --baseline the run fails when wall time regresses past --tolerance.
+
+Usage (from backend/):
+    python -m bench.run
+    python -m bench.run --sessions 1,10 --mode direct --scale 0.02 --json bench.json
+    python -m bench.run --sessions 1 --record cassettes/default   # real providers, needs API keys
+    python -m bench.run --replay cassettes/default --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--sessions", default="1,10,50", help="comma-separated concurrency levels")
+    p.add_argument("--mode", choices=("http", "direct"), default="http")
+    p.add_argument("--scale", type=float, default=None,
+                   help="latency multiplier (default: 0.05 for stubs, 1.0 for --replay)")
+    p.add_argument("--max-concurrent", type=int, default=0,
+                   help="TEASER_MAX_CONCURRENT (default: the largest level, i.e. no queueing)")
+    p.add_argument("--json", dest="json_path", help="also write results to this file")
+    source = p.add_mutually_exclusive_group()
+    source.add_argument("--record", metavar="CASSETTE", help="run against the real providers and record them")
+    source.add_argument("--replay", metavar="CASSETTE", help="replay a recorded cassette instead of the stubs")
+    p.add_argument("--baseline", help="results JSON to compare wall time against (exit 1 on regression)")
+    p.add_argument("--tolerance", type=float, default=0.2, help="allowed wall-time regression vs --baseline")
+    p.add_argument("--verbose", action="store_true", help="keep INFO logs from the app")
+    return p.parse_args(argv)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        # ru_maxrss is KB on Linux, bytes on macOS; only a monotonic fallback
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1e6 if sys.platform == "darwin" else rss / 1e3
+
+
+async def _sample_peak_rss(stop: asyncio.Event, peak: list[float]) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], _rss_mb())
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.05)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _stage_stats(trace: dict | None) -> dict | None:
+    """Stage overlap and critical-path bottleneck from a Chrome trace."""
+    if not trace:
+        return None
+    stages = sorted(
+        (e["ts"] / 1e6, (e["ts"] + e["dur"]) / 1e6)
+        for e in trace["traceEvents"]
+        if e.get("ph") == "X" and e.get("cat") == "stage"
+    )
+    if not stages:
+        return None
+    busy = sum(end - start for start, end in stages)
+    union, cur_start, cur_end = 0.0, *stages[0]
+    for start, end in stages[1:]:
+        if start > cur_end:
+            union += cur_end - cur_start
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    union += cur_end - cur_start
+
+    critical = trace["otherData"].get("critical_path", [])
+    bottleneck = max(critical, key=lambda s: s["duration_s"])["stage"] if critical else None
+    return {
+        "parallelism": busy / union if union else 0.0,
+        "bottleneck": bottleneck.rstrip("0123456789").rstrip("_") if bottleneck else None,
+    }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def _serve(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.02)
+    return server, task
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    # Settings are read at import time — configure before touching src.*
+    tmp = Path(tempfile.mkdtemp(prefix="debut-bench-"))
+    os.environ["TEASER_MAX_CONCURRENT"] = str(args.max_concurrent or max(levels))
+    os.environ["TEASER_MAX_QUEUED"] = str(max(levels) * 2)
+    os.environ["STATE_STORE_URL"] = "memory"
+    os.environ["HEDGE_ENABLED"] = "false"
+    os.environ["MEDIA_CACHE_ENABLED"] = "false"  # every session must hit the providers
+    os.environ.setdefault("SUNO_API_KEY", "bench")
+
+    import httpx
+
+    from bench.cassette import Cassette
+    from bench.stubs import FakeFal, StubLatency, _blueprint_json, build_stub_app, prepare_media
+    from src.config import settings
+    from src.main import app
+    from src.services import asset_store, ffmpeg_renderer, suno_client, tracing, veo_client
+    from src.worker import _director
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    asset_store.ASSETS_ROOT = ffmpeg_renderer.ASSETS_ROOT = tmp / "assets"
+    stub_port, app_port = _free_port(), _free_port()
+    stub_url, app_url = f"http://127.0.0.1:{stub_port}", f"http://127.0.0.1:{app_port}"
+    servers = []
+
+    cassette = None
+    if args.record:
+        # Real providers; Suno callbacks only arrive if SUNO_CALLBACK_URL routes to this app
+        cassette = Cassette(args.record)
+        cassette.record()
+        source = f"record → {args.record}"
+    else:
+        scale = args.scale if args.scale is not None else (1.0 if args.replay else 0.05)
+        latency = StubLatency(scale=scale)
+        if args.replay:
+            cassette = Cassette(args.replay).load()
+            media_dir = cassette.media_dir
+            media_dir.mkdir(parents=True, exist_ok=True)
+            cassette.replay(f"{stub_url}/media", scale=scale)
+            source = f"replay {args.replay} ×{scale}"
+        else:
+            media_dir = tmp / "media"
+            prepare_media(media_dir)
+            settings.GATEWAY_BASE_URL = f"{stub_url}/v1"
+            suno_client.SUNO_BASE = stub_url
+            veo_client.fal_client = FakeFal(latency, f"{stub_url}/media")
+            source = f"stubs ×{scale}"
+        settings.SUNO_CALLBACK_URL = f"{app_url}/api/music/callback"
+        servers.append(await _serve(build_stub_app(latency, media_dir, settings.IMAGE_MODEL), stub_port))
+    servers.append(await _serve(app, app_port))
+    print(f"[bench] app={app_url} mode={args.mode} providers={source} "
+          f"ffmpeg={'yes' if shutil.which('ffmpeg') else 'no (render will fail)'} assets={tmp}")
+
+    client = httpx.AsyncClient(base_url=app_url, timeout=None, limits=httpx.Limits(max_connections=500))
+
+    async def http_session(level: int, i: int) -> tuple[str, bool]:
+        r = await client.post("/api/session/create")
+        session_id = r.json()["session_id"]
+        r = await client.post("/api/blueprint/generate", json={
+            "session_id": session_id, "unit_name": f"Bench{level}x{i}", "concepts": ["girlcrush"],
+            "member_count": 2,
+        })
+        r.raise_for_status()
+        r = await client.post("/api/teaser/generate", json={"session_id": session_id})
+        r.raise_for_status()
+        op_id = r.json()["operation_id"]
+        while True:
+            await asyncio.sleep(0.1)
+            status = (await client.get(f"/api/teaser/status/{op_id}")).json()
+            if status["status"] in ("completed", "error"):
+                return session_id, status["status"] == "completed" and bool(status.get("video_url"))
+
+    async def direct_session(level: int, i: int) -> tuple[str, bool]:
+        session_id = f"bench-{level}-{i}"
+        blueprint = {"unit_name": f"Bench{level}x{i}", "concepts": ["girlcrush"], "art_style": "realistic",
+                     "group_type": "girl", **_blueprint_json()}
+        result = await _director.produce_teaser(blueprint, session_id)
+        return session_id, bool(result.get("teaser_url"))
+
+    flow = http_session if args.mode == "http" else direct_session
+    results = []
+    try:
+        for level in levels:
+            stop, peak = asyncio.Event(), [_rss_mb()]
+            sampler = asyncio.create_task(_sample_peak_rss(stop, peak))
+            latencies: list[float] = []
+
+            async def timed(i: int):
+                t = time.time()
+                try:
+                    session_id, ok = await flow(level, i)
+                except Exception as e:
+                    print(f"[bench] session {i} failed: {type(e).__name__}: {e}")
+                    return None, False
+                latencies.append(time.time() - t)
+                return session_id, ok
+
+            t0 = time.time()
+            outcomes = await asyncio.gather(*(timed(i) for i in range(level)))
+            wall = time.time() - t0
+            stop.set()
+            await sampler
+
+            stats = [s for s in (_stage_stats(tracing.get_trace(sid)) for sid, _ in outcomes if sid) if s]
+            bottlenecks = Counter(s["bottleneck"] for s in stats if s["bottleneck"])
+            results.append({
+                "sessions": level,
+                "ok": sum(1 for _, ok in outcomes if ok),
+                "wall_s": round(wall, 2),
+                "session_p50_s": round(_percentile(latencies, 0.5), 2),
+                "session_p95_s": round(_percentile(latencies, 0.95), 2),
+                "session_max_s": round(max(latencies, default=0.0), 2),
+                "stage_parallelism": round(statistics.mean(s["parallelism"] for s in stats), 2) if stats else None,
+                "bottleneck": bottlenecks.most_common(1)[0][0] if bottlenecks else None,
+                "peak_rss_mb": round(peak[0], 1),
+            })
+            print(f"[bench] {level} sessions done in {wall:.1f}s")
+    finally:
+        await client.aclose()
+        if args.record:
+            await cassette.save()
+        for server, _ in servers:
+            server.should_exit = True
+        await asyncio.gather(*(task for _, task in servers), return_exceptions=True)
+    return results
+
+
+def _print_table(results: list[dict]) -> None:
+    cols = ["sessions", "ok", "wall_s", "session_p50_s", "session_p95_s", "session_max_s",
+            "stage_parallelism", "bottleneck", "peak_rss_mb"]
+    widths = [max(len(c), *(len(str(r[c])) for r in results)) for c in cols]
+    print("  ".join(c.rjust(w) for c, w in zip(cols, widths)))
+    for r in results:
+        print("  ".join(str(r[c]).rjust(w) for c, w in zip(cols, widths)))
+
+
+def _regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    by_level = {r["sessions"]: r for r in baseline}
+    problems = []
+    for r in results:
+        base = by_level.get(r["sessions"])
+        if base is None:
+            continue
+        if r["ok"] < base["ok"]:
+            problems.append(f"{r['sessions']} sessions: {r['ok']} ok (baseline {base['ok']})")
+        if r["wall_s"] > base["wall_s"] * (1 + tolerance):
+            problems.append(f"{r['sessions']} sessions: wall {r['wall_s']}s (baseline {base['wall_s']}s)")
+    return problems
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    _print_table(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        problems = _regressions(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for problem in problems:
+            print(f"[bench] REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""Local stand-ins for the AI Gateway, fal (Veo) and Suno.
+
+- Gateway: OpenAI-compatible /v1/chat/completions returning canned blueprint /
+  scenario JSON (streamed as SSE chunks when `stream` is set) and a PNG for
+  image-model requests.
+- Suno: /api/v1/generate + record-info; fires the "complete" callback to the
+  callBackUrl after the configured latency.
+- fal: `FakeFal` mimics the parts of fal_client that veo_client uses
+  (upload_async, submit_async → handle.iter_events / get, result_async,
+  cancel_async) and serves test clips from the stub server's /media.
+
+Latencies are the production-like defaults below multiplied by `scale`, with
+±20% jitter.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import shutil
+import struct
+import subprocess
+import uuid
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.staticfiles import StaticFiles
+
+
+@dataclass
+class StubLatency:
+    """Seconds at scale=1 (roughly what production sees)."""
+    llm: float = 20.0
+    image: float = 25.0
+    fal_queue: float = 10.0
+    fal_run: float = 60.0
+    fal_upload: float = 2.0
+    suno: float = 60.0
+    scale: float = 0.05
+
+    def sample(self, base: float) -> float:
+        return base * self.scale * random.uniform(0.8, 1.2)
+
+
+# ── Canned media ──
+
+def _png(width: int = 64, height: int = 64, rgb: tuple[int, int, int] = (200, 60, 140)) -> bytes:
+    raw = b"".join(b"\x00" + bytes(rgb) * width for _ in range(height))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+PNG_DATA_URI = f"data:image/png;base64,{base64.b64encode(_png()).decode()}"
+
+
+def prepare_media(media_dir: Path) -> bool:
+    """Write clip.mp4 / bgm.mp3 (real media if ffmpeg exists). Returns whether ffmpeg was used."""
+    media_dir.mkdir(parents=True, exist_ok=True)
+    clip, bgm = media_dir / "clip.mp4", media_dir / "bgm.mp3"
+    if shutil.which("ffmpeg"):
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=size=1280x720:rate=24",
+             "-t", "8", "-c:v", "libx264", "-pix_fmt", "yuv420p", str(clip)],
+            check=True,
+        )
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi", "-i", "sine=frequency=440:duration=40",
+             str(bgm)],
+            check=True,
+        )
+        return True
+    clip.write_bytes(b"\x00" * 1024)
+    bgm.write_bytes(b"\x00" * 1024)
+    return False
+
+
+# ── Canned LLM payloads ──
+
+def _blueprint_json(member_count: int = 2) -> dict:
+    return {
+        "members": [
+            {
+                "member_id": f"m{i + 1}", "stage_name": f"BENCH{i + 1}", "real_name": f"벤치{i + 1}",
+                "position": "Main Vocal", "personality": "calm", "speech_style": "polite",
+                "fan_nickname": "bee", "visual_description": "short silver hair, black jacket",
+                "age": 20, "mbti": "INTJ", "color_palette": ["#000000", "#C0C0C0"], "motion_style": "sharp",
+            }
+            for i in range(member_count)
+        ],
+        "group_worldview": "bench worldview",
+        "debut_concept_description": "bench concept",
+        "fandom_name": "BENCHIES",
+        "debut_statement": "hello bench",
+    }
+
+
+def _scenario_json() -> dict:
+    return {
+        "title": "벤치 티저",
+        "mood": "mysterious",
+        "color_grading": "teal and orange",
+        "music_direction": {
+            "genre": "dark pop", "tempo": "medium", "mood_keywords": ["mysterious"],
+            "lyrics_hint": "", "instrumental_style": "synth-heavy",
+        },
+        "scenes": [
+            {
+                "scene_number": n, "duration": 8, "description": f"씬 {n}",
+                "visual_concept": f"neon alley, volumetric fog, scene {n}",
+                "camera_movement": "slow push-in", "lighting": "neon rim light",
+                "member_focus": f"m{(n - 1) % 2 + 1}", "emotion": "mysterious",
+                "transition_to_next": "cut",
+            }
+            for n in range(1, 5)
+        ],
+    }
+
+
+def _completion(model: str, message: dict, n: int = 1) -> dict:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": 0,
+        "model": model,
+        "choices": [
+            {"index": i, "message": {"role": "assistant", **message}, "finish_reason": "stop"} for i in range(n)
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def _stream_chunks(model: str, content: str, duration: float, pieces: int = 16):
+    """SSE chat.completion.chunk events spreading `content` over `duration` seconds."""
+    step = max(1, -(-len(content) // pieces))
+    chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+    def event(delta: dict, finish: str | None = None) -> str:
+        return "data: " + json.dumps({
+            "id": chunk_id, "object": "chat.completion.chunk", "created": 0, "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }, ensure_ascii=False) + "\n\n"
+
+    async def events():
+        yield event({"role": "assistant", "content": ""})
+        for i in range(0, len(content), step):
+            await asyncio.sleep(duration / pieces)
+            yield event({"content": content[i:i + step]})
+        yield event({}, finish="stop")
+        yield "data: [DONE]\n\n"
+
+    return events()
+
+
+def build_stub_app(latency: StubLatency, media_dir: Path, image_model: str) -> FastAPI:
+    app = FastAPI(title="Debut provider stubs")
+    app.mount("/media", StaticFiles(directory=str(media_dir)), name="media")
+    # Suno task_id → ready-at (loop time) and audio URL
+    suno_tasks: dict[str, dict] = {}
+    background: set[asyncio.Task] = set()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "")
+        if model == image_model:
+            await asyncio.sleep(latency.sample(latency.image))
+            return _completion(model, {
+                "content": "",
+                "images": [{"type": "image_url", "image_url": {"url": PNG_DATA_URI}}],
+            })
+
+        delay = latency.sample(latency.llm)
+        system = next((m["content"] for m in body.get("messages", []) if m.get("role") == "system"), "")
+        user = next((m["content"] for m in body.get("messages", []) if m.get("role") == "user"), "")
+        if isinstance(user, list):
+            user = " ".join(part.get("text", "") for part in user if isinstance(part, dict))
+        if "storyboard" in system:
+            if '{"scene"' in user:
+                payload = {"scene": _scenario_json()["scenes"][0]}
+            else:
+                payload = _scenario_json()
+        else:
+            payload = _blueprint_json()
+        if body.get("response_format", {}).get("type") == "json_object":
+            content = json.dumps(payload, ensure_ascii=False)
+        else:
+            content = "bench text response"
+        if body.get("stream"):
+            return StreamingResponse(_stream_chunks(model, content, delay), media_type="text/event-stream")
+        await asyncio.sleep(delay)
+        return _completion(model, {"content": content}, n=body.get("n") or 1)
+
+    @app.post("/api/v1/generate")
+    async def suno_generate(request: Request):
+        body = await request.json()
+        task_id = uuid.uuid4().hex
+        base = str(request.base_url).rstrip("/")
+        delay = latency.sample(latency.suno)
+        audio_url = f"{base}/media/bgm.mp3"
+        suno_tasks[task_id] = {"ready_at": asyncio.get_running_loop().time() + delay, "audio_url": audio_url}
+
+        async def fire_callback():
+            await asyncio.sleep(delay)
+            callback_url = body.get("callBackUrl")
+            if not callback_url:
+                return
+            try:
+                async with httpx.AsyncClient(timeout=10) as client:
+                    await client.post(callback_url, json={
+                        "code": 200, "msg": "success",
+                        "data": {"callbackType": "complete", "task_id": task_id,
+                                 "data": [{"audio_url": audio_url}]},
+                    })
+            except httpx.HTTPError:
+                pass
+
+        task = asyncio.create_task(fire_callback())
+        background.add(task)
+        task.add_done_callback(background.discard)
+        return {"code": 200, "msg": "success", "data": {"taskId": task_id}}
+
+    @app.get("/api/v1/generate/record-info")
+    async def suno_record_info(taskId: str):
+        task = suno_tasks.get(taskId)
+        if task is None:
+            return {"code": 404, "msg": "not found", "data": None}
+        if asyncio.get_running_loop().time() < task["ready_at"]:
+            return {"code": 200, "data": {"status": "PENDING"}}
+        return {"code": 200, "data": {"status": "SUCCESS", "response": {"sunoData": [{"audio_url": task["audio_url"]}]}}}
+
+    return app
+
+
+# ── fal_client stand-in ──
+
+class Queued:
+    status = "IN_QUEUE"
+
+    def __init__(self, position: int = 0):
+        self.position = position
+
+
+class InProgress:
+    status = "IN_PROGRESS"
+
+    def __init__(self, logs: list | None = None):
+        self.logs = logs or []
+
+
+class Completed:
+    status = "COMPLETED"
+
+    def __init__(self, logs: list | None = None, metrics: dict | None = None):
+        self.logs = logs or []
+        self.metrics = metrics or {}
+
+
+class _FakeHandle:
+    def __init__(self, fal: "FakeFal", request_id: str):
+        self.fal = fal
+        self.request_id = request_id
+
+    async def iter_events(self, with_logs: bool = False, interval: float = 0.1):
+        job = self.fal.jobs[self.request_id]
+        yield Queued(position=0)
+        await job["started"].wait()
+        yield InProgress()
+        await job["done"].wait()
+        yield Completed()
+
+    async def get(self) -> dict:
+        return await self.fal.result_async("", self.request_id)
+
+
+class FakeFal:
+    """Drop-in for the `fal_client` module as used by veo_client."""
+
+    Queued = Queued
+    InProgress = InProgress
+    Completed = Completed
+
+    def __init__(self, latency: StubLatency, media_base_url: str):
+        self.latency = latency
+        self.media_base_url = media_base_url
+        self.jobs: dict[str, dict] = {}
+
+    def _plan(self, application: str, arguments: dict) -> tuple[float, float, dict]:
+        """(queue seconds, run seconds, result) for a submitted job."""
+        return (
+            self.latency.sample(self.latency.fal_queue),
+            self.latency.sample(self.latency.fal_run),
+            {"video": {"url": f"{self.media_base_url}/clip.mp4"}},
+        )
+
+    async def upload_async(self, data: bytes, content_type: str, file_name: str | None = None) -> str:
+        await asyncio.sleep(self.latency.sample(self.latency.fal_upload))
+        return f"{self.media_base_url}/uploads/{hashlib.sha256(data).hexdigest()[:16]}"
+
+    async def submit_async(self, application: str, arguments: dict) -> _FakeHandle:
+        request_id = uuid.uuid4().hex
+        queue_s, run_s, result = self._plan(application, arguments)
+        job = {"started": asyncio.Event(), "done": asyncio.Event(), "result": result}
+        self.jobs[request_id] = job
+
+        async def run():
+            await asyncio.sleep(queue_s)
+            job["started"].set()
+            await asyncio.sleep(run_s)
+            job["done"].set()
+
+        job["task"] = asyncio.create_task(run())
+        return _FakeHandle(self, request_id)
+
+    async def result_async(self, application: str, request_id: str) -> dict:
+        job = self.jobs[request_id]
+        await job["done"].wait()
+        return job["result"]
+
+    async def cancel_async(self, application: str, request_id: str) -> None:
+        job = self.jobs.get(request_id)
+        if job and not job["done"].is_set():
+            job["task"].cancel()
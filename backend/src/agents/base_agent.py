@@ -1,14 +1,32 @@
 """Base agent with shared LLM calling logic via AI Gateway."""
 
+import asyncio
 import json
 import logging
+import re
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Callable
 
 from src.config import settings
-from src.services.llm_client import get_llm_client
+from src.services.json_stream import JsonObjectStream
+from src.services.llm_cache import cache_key, get_llm_cache
+from src.services.llm_client import chat_completion, stream_chat_completion
 
 logger = logging.getLogger(__name__)
 
+_STREAM_END = object()
+
+# Models the gateway rejected `n` for: skip straight to the fan-out next time
+_N_UNSUPPORTED: set[str] = set()
+_N_PARAM = re.compile(r"(?<![\w-])['\"`]?n['\"`]?(?![\w-])")
+
+
+def _rejects_n(e: Exception) -> bool:
+    """Whether a 400 is about the `n` parameter, not the prompt or another argument."""
+    if getattr(e, "param", None) == "n":
+        return True
+    return bool(_N_PARAM.search(str(getattr(e, "message", None) or e)))
+
 
 class BaseAgent(ABC):
     """Base class for all agents. Provides LLM calling and JSON parsing."""
@@ -20,17 +38,7 @@ class BaseAgent(ABC):
     def system_prompt(self) -> str:
         ...
 
-    async def call_llm(
-        self,
-        user_prompt: str,
-        *,
-        temperature: float = 0.85,
-        max_tokens: int = 8000,
-        json_mode: bool = True,
-    ) -> dict:
-        """Call LLM via AI Gateway and return parsed JSON."""
-        client = get_llm_client()
-
+    def _request(self, user_prompt: str, temperature: float, max_tokens: int, json_mode: bool) -> dict:
         kwargs: dict = {
             "model": self.model,
             "messages": [
@@ -42,15 +50,154 @@ class BaseAgent(ABC):
         }
         if json_mode:
             kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    async def call_llm(
+        self,
+        user_prompt: str,
+        *,
+        temperature: float = 0.85,
+        max_tokens: int = 8000,
+        json_mode: bool = True,
+        on_field: Callable[[str, object], None] | None = None,
+        on_item: Callable[[str, int, object], None] | None = None,
+        cache: bool | None = None,
+        bypass_cache: bool = False,
+    ) -> dict:
+        """Call LLM via AI Gateway and return parsed JSON.
+
+        With `on_field` / `on_item` the completion is streamed (see stream_llm):
+        on_field(key, value) fires for each completed top-level field and
+        on_item(key, index, item) for each completed element of a top-level array.
+
+        cache: use the persistent response cache (default: LLM_CACHE_ENABLED).
+        bypass_cache: skip the lookup but store the fresh result.
+        """
+        if not (settings.LLM_CACHE_ENABLED if cache is None else cache):
+            return await self._call_llm(user_prompt, temperature, max_tokens, json_mode, on_field, on_item)
+
+        llm_cache = get_llm_cache()
+        key = cache_key(self.model, self.system_prompt(), user_prompt, temperature, json_mode)
+        if bypass_cache:
+            llm_cache.record_bypass(agent=self.name)
+        else:
+            cached = llm_cache.get(key, agent=self.name)
+            if cached is not None:
+                logger.info("[%s] LLM cache hit (%s)", self.name, self.model)
+                if json_mode:
+                    _replay_events(cached, on_field, on_item)
+                return cached
+        result = await self._call_llm(user_prompt, temperature, max_tokens, json_mode, on_field, on_item)
+        llm_cache.put(key, result)
+        return result
+
+    async def _call_llm(self, user_prompt, temperature, max_tokens, json_mode, on_field, on_item) -> dict:
+        if json_mode and (on_field or on_item):
+            async for key, index, value in self.stream_llm(
+                user_prompt, temperature=temperature, max_tokens=max_tokens,
+            ):
+                if key is None:
+                    return value
+                if index is None:
+                    if on_field:
+                        on_field(key, value)
+                elif on_item:
+                    on_item(key, index, value)
 
         logger.info("[%s] Calling LLM (%s)...", self.name, self.model)
-        response = await client.chat.completions.create(**kwargs)
+        response = await chat_completion(**self._request(user_prompt, temperature, max_tokens, json_mode))
         text = response.choices[0].message.content
 
         if json_mode:
             return json.loads(text)
         return {"text": text}
 
+    async def call_llm_variants(
+        self,
+        user_prompt: str,
+        n: int,
+        *,
+        temperature: float = 0.95,
+        max_tokens: int = 8000,
+    ) -> list[dict]:
+        """`n` independent JSON completions of one prompt, in as few round trips as possible.
+
+        Asks for `n` choices in a single request; when the gateway/model returns
+        fewer (or rejects `n`), the remainder is fanned out in parallel — bounded
+        by the gateway limiter. Unparseable variants are dropped. Never cached.
+        """
+        kwargs = self._request(user_prompt, temperature, max_tokens, json_mode=True)
+        results: list[dict] = []
+        if n > 1 and self.model not in _N_UNSUPPORTED:
+            logger.info("[%s] Calling LLM (%s) n=%d...", self.name, self.model, n)
+            try:
+                response = await chat_completion(n=n, **kwargs)
+                for choice in response.choices:
+                    try:
+                        results.append(json.loads(choice.message.content))
+                    except (TypeError, ValueError):
+                        logger.warning("[%s] dropping unparseable variant %d", self.name, choice.index)
+                if len(response.choices) < n:
+                    logger.info("[%s] %s returned %d/%d choices", self.name, self.model, len(response.choices), n)
+            except Exception as e:
+                if getattr(e, "status_code", None) != 400 or not _rejects_n(e):
+                    raise
+                _N_UNSUPPORTED.add(self.model)
+                logger.warning("[%s] %s rejected n=%d (%s) — fanning out", self.name, self.model, n, e)
+
+        async def one() -> dict:
+            response = await chat_completion(**kwargs)
+            return json.loads(response.choices[0].message.content)
+
+        missing = n - len(results)
+        if missing > 0:
+            if n > 1:
+                logger.info("[%s] Calling LLM (%s) ×%d in parallel...", self.name, self.model, missing)
+            extra = await asyncio.gather(*(one() for _ in range(missing)), return_exceptions=True)
+            for r in extra:
+                if isinstance(r, BaseException):
+                    logger.warning("[%s] variant failed: %s", self.name, r)
+                else:
+                    results.append(r)
+        if not results:
+            raise RuntimeError(f"All {n} variants failed")
+        return results[:n]
+
+    async def stream_llm(
+        self,
+        user_prompt: str,
+        *,
+        temperature: float = 0.85,
+        max_tokens: int = 8000,
+    ) -> AsyncIterator[tuple[str | None, int | None, object]]:
+        """Streamed JSON call yielding parsed parts as soon as they are complete.
+
+        Yields (key, index, value) events (see JsonObjectStream):
+          (key, i, item)     — element i of a top-level array, e.g. ("scenes", 0, {...})
+          (key, None, value) — a completed top-level field
+          (None, None, dict) — last event: the full parsed response
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        parser = JsonObjectStream()
+
+        def on_text(delta: str):
+            for event in parser.feed(delta):
+                queue.put_nowait(event)
+
+        logger.info("[%s] Calling LLM (%s) streaming...", self.name, self.model)
+        task = asyncio.create_task(stream_chat_completion(
+            on_text=on_text, **self._request(user_prompt, temperature, max_tokens, json_mode=True),
+        ))
+        task.add_done_callback(lambda _: queue.put_nowait(_STREAM_END))
+        try:
+            while (event := await queue.get()) is not _STREAM_END:
+                yield event
+            text = await task
+        finally:
+            if not task.done():
+                task.cancel()
+        yield None, None, json.loads(text)
+
     async def call_llm_text(
         self,
         user_prompt: str,
@@ -63,3 +210,13 @@ class BaseAgent(ABC):
             user_prompt, temperature=temperature, max_tokens=max_tokens, json_mode=False
         )
         return result["text"]
+
+
+def _replay_events(result: dict, on_field, on_item) -> None:
+    """Fire streaming callbacks for a cached response, in stream order."""
+    for key, value in result.items():
+        if on_item and isinstance(value, list):
+            for index, item in enumerate(value):
+                on_item(key, index, item)
+        if on_field:
+            on_field(key, value)
@@ -123,46 +123,87 @@ class ConceptAgent(BaseAgent):
         member_count: int,
         art_style: str = "realistic",
         group_type: str = "girl",
+        on_member=None,
+        fresh: bool = False,
     ) -> dict:
-        """Generate complete idol group blueprint."""
-        self._art_style = art_style
-        concepts_str = ", ".join(concepts)
-
-        style_label = "실사 (포토리얼리스틱)" if art_style == "realistic" else "버추얼 (애니메이션/일러스트)"
-        group_label = "걸그룹 (여성 아이돌)" if group_type == "girl" else "보이그룹 (남성 아이돌)"
-
-        # Build concept direction hints
-        hint_map = _GIRL_CONCEPT_HINTS if group_type == "girl" else _BOY_CONCEPT_HINTS
-        concept_hints = []
-        for c in concepts:
-            if c in hint_map:
-                concept_hints.append(f"  - {hint_map[c]}")
-        concept_direction = "\n".join(concept_hints) if concept_hints else ""
-
-        user_prompt = (
-            f"그룹 타입: {group_label}\n"
-            f"유닛 이름: {unit_name}\n"
-            f"콘셉트 키워드: {concepts_str}\n"
-            f"멤버 수: {member_count}명\n"
-            f"아트 스타일: {style_label}\n"
-        )
+        """Generate complete idol group blueprint.
 
-        if concept_direction:
-            user_prompt += (
-                f"\n선택된 콘셉트 방향성:\n{concept_direction}\n\n"
-                f"위 콘셉트 방향성을 참고하여 비주얼, 성격, 세계관을 디자인해주세요.\n"
-            )
+        on_member(index, member_dict) streams each member as soon as it is written.
+        fresh=True skips the LLM response cache lookup.
+        """
+        self._art_style = art_style
+        user_prompt = _blueprint_prompt(unit_name, concepts, member_count, art_style, group_type)
 
-        user_prompt += (
-            f"\n이 유닛의 완전한 블루프린트를 만들어주세요. "
-            f"{'여성' if group_type == 'girl' else '남성'} 아이돌에 맞는 비주얼과 성격을 디자인하세요. "
-            f"각 멤버의 visual_description은 AI 이미지 생성에 바로 쓸 수 있을 정도로 상세하게. "
-            f"color_palette와 motion_style도 반드시 포함해주세요."
-        )
+        def _on_item(key: str, index: int, value):
+            if key == "members" and isinstance(value, dict):
+                on_member(index, value)
 
-        result = await self.call_llm(user_prompt)
+        on_item = _on_item if on_member else None
+        result = await self.call_llm(user_prompt, on_item=on_item, bypass_cache=fresh)
         logger.info(
             "[concept_agent] Blueprint generated for '%s' (%s, %s) with %d members",
             unit_name, art_style, group_type, member_count,
         )
         return result
+
+    async def generate_blueprint_variants(
+        self,
+        unit_name: str,
+        concepts: list[str],
+        member_count: int,
+        variants: int,
+        art_style: str = "realistic",
+        group_type: str = "girl",
+    ) -> list[dict]:
+        """Generate `variants` alternative blueprints for the same inputs in one round trip."""
+        self._art_style = art_style
+        user_prompt = _blueprint_prompt(unit_name, concepts, member_count, art_style, group_type)
+        results = await self.call_llm_variants(user_prompt, variants)
+        logger.info(
+            "[concept_agent] %d/%d blueprint variants generated for '%s'",
+            len(results), variants, unit_name,
+        )
+        return results
+
+
+def _blueprint_prompt(
+    unit_name: str,
+    concepts: list[str],
+    member_count: int,
+    art_style: str,
+    group_type: str,
+) -> str:
+    concepts_str = ", ".join(concepts)
+
+    style_label = "실사 (포토리얼리스틱)" if art_style == "realistic" else "버추얼 (애니메이션/일러스트)"
+    group_label = "걸그룹 (여성 아이돌)" if group_type == "girl" else "보이그룹 (남성 아이돌)"
+
+    # Build concept direction hints
+    hint_map = _GIRL_CONCEPT_HINTS if group_type == "girl" else _BOY_CONCEPT_HINTS
+    concept_hints = []
+    for c in concepts:
+        if c in hint_map:
+            concept_hints.append(f"  - {hint_map[c]}")
+    concept_direction = "\n".join(concept_hints) if concept_hints else ""
+
+    user_prompt = (
+        f"그룹 타입: {group_label}\n"
+        f"유닛 이름: {unit_name}\n"
+        f"콘셉트 키워드: {concepts_str}\n"
+        f"멤버 수: {member_count}명\n"
+        f"아트 스타일: {style_label}\n"
+    )
+
+    if concept_direction:
+        user_prompt += (
+            f"\n선택된 콘셉트 방향성:\n{concept_direction}\n\n"
+            f"위 콘셉트 방향성을 참고하여 비주얼, 성격, 세계관을 디자인해주세요.\n"
+        )
+
+    user_prompt += (
+        f"\n이 유닛의 완전한 블루프린트를 만들어주세요. "
+        f"{'여성' if group_type == 'girl' else '남성'} 아이돌에 맞는 비주얼과 성격을 디자인하세요. "
+        f"각 멤버의 visual_description은 AI 이미지 생성에 바로 쓸 수 있을 정도로 상세하게. "
+        f"color_palette와 motion_style도 반드시 포함해주세요."
+    )
+    return user_prompt
@@ -1,10 +1,10 @@
 """Director Agent — orchestrates the entire MV teaser production pipeline.
 
-Pipeline (optimized for speed):
+Pipeline (dependency-driven, see services/stage_graph.py):
   1. Scenario Agent → 4-scene storyboard
-  2. PARALLEL: [BGM generation] + [Image generation ×4]
-  3. PARALLEL: [Video generation ×4] (uses images as first frames)
-  4. Save all assets to local folders + assemble timeline
+  2. PARALLEL: [BGM generation] + [Keyframe images ×5]
+  3. Veo clip N starts as soon as keyframes N and N+1 exist (frame chaining)
+  4. Once all clips + BGM are in: save assets, assemble timeline, ffmpeg render
 """
 
 import asyncio
@@ -14,9 +14,12 @@ import time
 from src.agents.base_agent import BaseAgent
 from src.agents.scenario_agent import ScenarioAgent
 from src.services.gateway_client import generate_image
-from src.services.veo_client import generate_single_clip
-from src.services import asset_store
-from src.services.ffmpeg_renderer import render_teaser, get_output_path
+from src.services.veo_client import generate_single_clip, resume_clip, start_frame_upload
+from src.services import asset_store, tracing
+from src.services.checkpoint import TeaserCheckpoint
+from src.services.hedging import HedgeBudget
+from src.services.stage_graph import StageGraph
+from src.services.ffmpeg_renderer import ProgressiveConcat, render_teaser, get_output_path
 
 logger = logging.getLogger(__name__)
 
@@ -55,9 +58,20 @@ class DirectorAgent(BaseAgent):
         blueprint: dict,
         session_id: str,
         progress_callback=None,
+        checkpoint: TeaserCheckpoint | None = None,
     ) -> dict:
         """Full MV teaser production pipeline.
 
+        Stages run as a dependency graph rather than in lock-step batches:
+          scenes[i] (mid-scenario stream) → keyframe_i (×5; the end frame waits for the full scenario)
+          music_direction (mid-scenario stream) → bgm
+          keyframe_i + keyframe_{i+1} → video_i (×4)
+          video_* + bgm → render
+
+        Every stage records its state in a checkpoint manifest. Pass a loaded
+        `checkpoint` to resume: completed stages are skipped and stages with a
+        provider job in flight (Suno task / fal request) reattach to it.
+
         Returns:
             {
                 "scenario": {...},
@@ -65,10 +79,23 @@ class DirectorAgent(BaseAgent):
                 "bgm_url": "...",
                 "timeline": {...}
             }
+
+        The run is traced (see services/tracing.py): GET /api/teaser/trace/{session_id}.
         """
+        with tracing.pipeline_trace(session_id, blueprint.get("unit_name", "Unknown")):
+            return await self._produce_teaser(blueprint, session_id, progress_callback, checkpoint)
+
+    async def _produce_teaser(
+        self,
+        blueprint: dict,
+        session_id: str,
+        progress_callback,
+        checkpoint: TeaserCheckpoint | None,
+    ) -> dict:
         unit_name = blueprint.get("unit_name", "Unknown")
         art_style = blueprint.get("art_style", "realistic")
-        pipeline_start = time.time()
+        graph = StageGraph(name=f"director:{session_id}")
+        pipeline_start = graph.t0
 
         async def report(step: str, detail: str = ""):
             elapsed = time.time() - pipeline_start
@@ -81,191 +108,314 @@ class DirectorAgent(BaseAgent):
         for member in blueprint.get("members", []):
             asset_store.save_member_profile(unit_name, member)
 
-        # ── Step 1: Scenario Agent → storyboard only ──
-        await report("scenario", "시나리오 생성 중 (Scenario Agent)...")
-        t1 = time.time()
-        scenario = await self.scenario_agent.generate_scenario(blueprint)
-        scenes = scenario.get("scenes", [])
-
-        await report("scenario_done", f"'{scenario.get('title', '')}' — {len(scenes)}개 씬 ({time.time()-t1:.1f}s)")
-        asset_store.save_scenario(unit_name, scenario)
+        if checkpoint is None:
+            checkpoint = TeaserCheckpoint.start(unit_name, session_id)
+        else:
+            completed = checkpoint.completed_stages()
+            await report("resume", f"체크포인트에서 재개 — 완료된 단계 {len(completed)}개: {', '.join(completed) or '-'}")
+
+        # Hedged duplicates are capped per stage (keyframes / videos), not per call
+        keyframe_hedges = HedgeBudget()
+        video_hedges = HedgeBudget()
+
+        # BGM only needs music_direction: resolved mid-stream by the scenario call
+        # (or from the finished/restored scenario), None if the scenario failed
+        music_direction: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        def set_music_direction(value: dict | None):
+            if not music_direction.done():
+                music_direction.set_result(value)
+
+        # Keyframe i only needs scenes[i]: each resolves to a partial scenario
+        # (top-level fields + scenes[0..i]) as soon as that scene is streamed
+        scene_ready = [asyncio.get_running_loop().create_future() for _ in range(KEYFRAME_COUNT - 1)]
+
+        def set_scene(index: int, partial: dict | None):
+            if index < len(scene_ready) and not scene_ready[index].done():
+                scene_ready[index].set_result(partial)
+
+        def settle_scenes(scenario: dict | None):
+            """Resolve scenes the stream didn't deliver (restored / not streamed / failed)."""
+            for i in range(len(scene_ready)):
+                partial = None
+                if scenario is not None:
+                    partial = {**scenario, "scenes": scenario.get("scenes", [])[:i + 1]}
+                set_scene(i, partial)
+
+        # ── Stage: Scenario Agent → storyboard only ──
+        async def scenario_stage():
+            if checkpoint.is_done("scenario"):
+                scenario = checkpoint.result("scenario")
+                set_music_direction(scenario.get("music_direction", {}))
+                settle_scenes(scenario)
+                await report("scenario_done", f"'{scenario.get('title', '')}' — 체크포인트에서 복원")
+                return scenario
+            await report("scenario", "시나리오 생성 중 (Scenario Agent)...")
+            t1 = time.time()
+            try:
+                scenario = await self.scenario_agent.generate_scenario(
+                    blueprint, on_music_direction=set_music_direction, on_scene=set_scene,
+                )
+            except BaseException:
+                set_music_direction(None)
+                settle_scenes(None)
+                raise
+            # No-ops for whatever was already streamed
+            set_music_direction(scenario.get("music_direction", {}))
+            settle_scenes(scenario)
+            scenes = scenario.get("scenes", [])
+            await report("scenario_done", f"'{scenario.get('title', '')}' — {len(scenes)}개 씬 ({time.time()-t1:.1f}s)")
+            asset_store.save_scenario(unit_name, scenario)
+            checkpoint.mark_done("scenario", scenario)
+            await report("assets", "BGM + 키프레임 5장 병렬 생성 중 (씬이 스트리밍되는 대로 키프레임, 완료된 키프레임부터 영상 생성 시작)...")
+            return scenario
+
+        # ── Stage: BGM — starts from the streamed music_direction, only gates the final render ──
+        async def bgm_stage():
+            if checkpoint.is_done("bgm"):
+                return checkpoint.result("bgm")
+            task_id = checkpoint.provider_id("bgm", "task_id")
+            if task_id:
+                t2 = time.time()
+                bgm_url = await self.scenario_agent.resume_bgm_generation(task_id)
+            else:
+                direction = await music_direction
+                if direction is None:
+                    return None
+                t2 = time.time()
+                if not scenario_task.done():
+                    await report("bgm", "BGM 생성 시작 (시나리오 스트리밍 중 music_direction 수신)")
+                bgm_url = await self.scenario_agent.start_bgm_generation(
+                    {"music_direction": direction}, unit_name=unit_name,
+                    on_submitted=lambda tid: checkpoint.mark_submitted("bgm", task_id=tid),
+                    cache=True,
+                )
+            if bgm_url:
+                checkpoint.mark_done("bgm", bgm_url)
+                await report("bgm_done", f"BGM 완료 ({time.time()-t2:.1f}s)")
+                self._fire_and_forget(asset_store.save_bgm(unit_name, bgm_url))
+            else:
+                checkpoint.mark_failed("bgm")
+                await report("bgm_error", "BGM 생성 실패 — BGM 없이 진행")
+            return bgm_url
 
-        # ── Step 2: PARALLEL — BGM + Keyframes ×5 ──
-        # Generate 5 keyframes for 4 scenes (frame chaining for seamless transitions)
+        # ── Stage: Keyframe i (5 frames for 4 scenes, frame chaining) ──
         # Scene 1: frame[0]→frame[1], Scene 2: frame[1]→frame[2], Scene 3: frame[2]→frame[3], Scene 4: frame[3]→frame[4]
-        await report("assets", "BGM + 키프레임 5장 병렬 생성 중...")
-
-        # Build keyframe image tasks (5 frames for 4 scenes)
         # Each keyframe uses the focused member's profile image as reference
         # so the same character appears in the teaser scenes.
-        image_tasks = []
-        for i in range(KEYFRAME_COUNT):
-            if i < len(scenes):
-                scene = scenes[i]
-                member_id = scene.get("member_focus", "m1")
-                member = _find_member(blueprint, member_id)
-            else:
-                scene = scenes[-1]
-                member_id = scene.get("member_focus", "m1")
-                member = _find_member(blueprint, member_id)
-
-            # Pass member's profile image as reference for character consistency
-            ref_image = member.get("image_url")
-            has_ref = bool(ref_image)
-
-            image_prompt = _build_scene_image_prompt(
-                scene, member, scenario,
-                is_end_frame=(i >= len(scenes)),
-                art_style=art_style,
-                has_reference_image=has_ref,
-            )
-
-            image_tasks.append(
-                generate_image(
+        def keyframe_stage(i: int):
+            async def run(scenario):
+                if scenario is None:
+                    return None
+                scenes = scenario.get("scenes", [])
+                if not scenes:
+                    return None
+                name = f"keyframe_{i}"
+                if checkpoint.is_done(name):
+                    url = checkpoint.result(name)
+                    if not (url and asset_store.local_path_for_url(url)):
+                        # Checkpoints from before image handles only recorded the file
+                        url = asset_store.image_handle(asset_store.ASSETS_ROOT / checkpoint.stage(name).get("path", ""))
+                    if url:
+                        # Only clips still to be made (scenes i-1 and i) need it on fal
+                        if any(not checkpoint.is_done(f"video_{j}") for j in (i - 1, i) if 0 <= j < len(scenes)):
+                            start_frame_upload(url)
+                        return url
+
+                scene = scenes[i] if i < len(scenes) else scenes[-1]
+                member = _find_member(blueprint, scene.get("member_focus", "m1"))
+
+                # Pass member's profile image as reference for character consistency
+                ref_image = member.get("image_url")
+                image_prompt = _build_scene_image_prompt(
+                    scene, member, scenario,
+                    is_end_frame=(i >= len(scenes)),
+                    art_style=art_style,
+                    has_reference_image=bool(ref_image),
+                )
+                url = await generate_image(
                     visual_description=image_prompt,
                     unit_name=unit_name,
                     concept=scenario.get("mood", ""),
                     reference_image_b64=ref_image,
+                    hedge_budget=keyframe_hedges,
+                    cache=not checkpoint.needs_refresh(name),
                 )
-            )
-
-        # Run BGM + all keyframe images concurrently
-        t2 = time.time()
-        bgm_task = self.scenario_agent.start_bgm_generation(scenario, unit_name=unit_name)
-        all_results = await asyncio.gather(
-            bgm_task, *image_tasks, return_exceptions=True
-        )
-        step2_elapsed = time.time() - t2
-
-        # First result is BGM, rest are keyframe images
-        bgm_result = all_results[0]
-        bgm_url = bgm_result if isinstance(bgm_result, str) else None
-        image_results = all_results[1:]
-
-        if bgm_url:
-            await report("bgm_done", f"BGM 완료 ({step2_elapsed:.1f}s)")
-            self._fire_and_forget(asset_store.save_bgm(unit_name, bgm_url))
-        else:
-            await report("bgm_error", f"BGM 생성 실패 (err={bgm_result}) — BGM 없이 진행")
-
-        keyframes = []
-        for i, result in enumerate(image_results):
-            url = result if isinstance(result, str) else None
-            keyframes.append(url)
-            if url:
-                # Keyframe i is first_frame for scene i, and last_frame for scene i-1
-                if i < len(scenes):
-                    asset_store.save_scene_first_frame(unit_name, i + 1, url)
-                if i > 0:
-                    asset_store.save_scene_last_frame(unit_name, i, url)
-                await report("image_done", f"키프레임 {i+1}/{KEYFRAME_COUNT} 완료")
-            else:
-                logger.warning("Keyframe %d failed: %s", i + 1, result)
-                await report("image_error", f"키프레임 {i+1} 실패")
-
-        # ── Step 3: PARALLEL — Videos ×4 (first-last-frame chaining) ──
-        # Scene N uses keyframe[N] as first_frame and keyframe[N+1] as last_frame
-        await report("videos", "Veo 3.1 영상 생성 중 (4개 병렬, 프레임 체이닝)...")
-        video_tasks = []
-        total_scenes = len(scenes)
-        for i, scene in enumerate(scenes):
-            member_id = scene.get("member_focus", "m1")
-            member = _find_member(blueprint, member_id)
-            video_prompt = _build_video_prompt(
-                scene, scenario, member, blueprint,
-                scene_index=i, total_scenes=total_scenes,
-                art_style=art_style,
-                all_scenes=scenes,
-            )
-            first_frame = keyframes[i] if i < len(keyframes) else None
-            last_frame = keyframes[i + 1] if (i + 1) < len(keyframes) else None
-            video_tasks.append(
-                generate_single_clip(
-                    prompt=video_prompt,
-                    session_id=session_id,
-                    scene_number=i + 1,
-                    first_frame_url=first_frame,
-                    last_frame_url=last_frame,
+                if url:
+                    # Uploads to fal while the neighbouring keyframe is still generating
+                    start_frame_upload(url)
+                    # Keyframe i is first_frame for scene i, and last_frame for scene i-1
+                    saved = None
+                    if i < len(scenes):
+                        saved = asset_store.save_scene_first_frame(unit_name, i + 1, url)
+                    if i > 0:
+                        last = asset_store.save_scene_last_frame(unit_name, i, url)
+                        saved = saved or last
+                    checkpoint.mark_done(name, url, path=asset_store.relative_asset_path(saved))
+                    await report("image_done", f"키프레임 {i+1}/{KEYFRAME_COUNT} 완료")
+                else:
+                    checkpoint.mark_failed(name)
+                    logger.warning("Keyframe %d failed", i + 1)
+                    await report("image_error", f"키프레임 {i+1} 실패")
+                return url
+            return run
+
+        # ── Stage: Veo clip i — starts as soon as keyframes i and i+1 exist ──
+        def video_stage(i: int):
+            async def run(scenario, first_frame, last_frame):
+                if scenario is None:
+                    return None
+                scenes = scenario.get("scenes", [])
+                if i >= len(scenes):
+                    return None
+                name = f"video_{i}"
+                if checkpoint.is_done(name):
+                    return checkpoint.result(name)
+                scene = scenes[i]
+                member = _find_member(blueprint, scene.get("member_focus", "m1"))
+                video_prompt = _build_video_prompt(
+                    scene, scenario, member, blueprint,
+                    scene_index=i, total_scenes=len(scenes),
+                    art_style=art_style,
+                    all_scenes=scenes,
                 )
+                request_id = checkpoint.provider_id(name, "request_id")
+                if request_id:
+                    await report("video_start", f"씬 {i+1} 진행 중인 Veo 작업에 재연결")
+                    url = await resume_clip(request_id, scene_number=i + 1)
+                else:
+                    await report("video_start", f"씬 {i+1} 영상 생성 시작 (Veo 3.1, 프레임 체이닝)")
+                    url = await generate_single_clip(
+                        prompt=video_prompt,
+                        session_id=session_id,
+                        scene_number=i + 1,
+                        first_frame_url=first_frame,
+                        last_frame_url=last_frame,
+                        on_submitted=lambda rid: checkpoint.mark_submitted(name, request_id=rid),
+                        hedge_budget=video_hedges,
+                        cache=not checkpoint.needs_refresh(name),
+                    )
+                if url:
+                    checkpoint.mark_done(name, url)
+                    self._fire_and_forget(asset_store.save_scene_video(unit_name, i + 1, url))
+                    await report("video_done", f"씬 {i+1} 영상 완료")
+                else:
+                    checkpoint.mark_failed(name)
+                    logger.warning("Scene %d video failed", i + 1)
+                    await report("video_error", f"씬 {i+1} 영상 실패")
+                return url
+            return run
+
+        # ── Stage: Assemble timeline + FFmpeg render — concatenate clips + mix BGM ──
+        async def render_stage(scenario, bgm_url, *frames_and_videos):
+            scenes = scenario.get("scenes", []) if scenario else []
+            keyframes = frames_and_videos[:KEYFRAME_COUNT]
+            scene_videos = frames_and_videos[KEYFRAME_COUNT:KEYFRAME_COUNT + len(video_names)]
+            succeeded = sum(1 for v in scene_videos if v)
+            await report("videos_summary", f"영상 {succeeded}/{len(scenes)}개 완료")
+
+            await report("timeline", "타임라인 조립 중...")
+            enriched_scenes = []
+            for i, scene in enumerate(scenes):
+                enriched = {
+                    **scene,
+                    "image_url": keyframes[i] if i < len(keyframes) else None,
+                    "last_frame_url": keyframes[i + 1] if (i + 1) < len(keyframes) else None,
+                    "video_url": scene_videos[i] if i < len(scene_videos) else None,
+                }
+                enriched_scenes.append(enriched)
+                asset_store.save_scene_info(unit_name, i + 1, enriched)
+
+            timeline = _build_timeline(
+                session_id=session_id,
+                unit_name=unit_name,
+                debut_statement=blueprint.get("debut_statement", ""),
+                scenes=enriched_scenes,
+                bgm_url=bgm_url,
+                group_image_url=blueprint.get("group_image_url"),
             )
-
-        t3 = time.time()
-        video_results = await asyncio.gather(*video_tasks, return_exceptions=True)
-        step3_elapsed = time.time() - t3
-
-        scene_videos = []
-        succeeded = 0
-        for i, result in enumerate(video_results):
-            url = result if isinstance(result, str) else None
-            scene_videos.append(url)
-            if url:
-                succeeded += 1
-                self._fire_and_forget(asset_store.save_scene_video(unit_name, i + 1, url))
-                await report("video_done", f"씬 {i+1} 영상 완료")
+            asset_store.save_timeline(unit_name, timeline)
+
+            # Timeline/metadata above are cheap to rebuild; only the encode is checkpointed
+            if checkpoint.is_done("render"):
+                return enriched_scenes, timeline, checkpoint.result("render")
+
+            await report("render", f"최종 영상 합성 중 (ffmpeg, {succeeded}개 클립)...")
+            t5 = time.time()
+            teaser_url = await render_teaser(
+                timeline=timeline,
+                output_path=get_output_path(unit_name),
+                group_name=unit_name,
+                assembler=assembler,
+            )
+            step5_elapsed = time.time() - t5
+            if teaser_url:
+                checkpoint.mark_done("render", teaser_url)
+                await report("render_done", f"최종 MV 합성 완료! ({step5_elapsed:.1f}s) → {teaser_url}")
             else:
-                logger.warning("Scene %d video failed: %s", i + 1, result)
-                await report("video_error", f"씬 {i+1} 영상 실패: {result}")
-
-        await report("videos_summary", f"영상 {succeeded}/{len(scenes)}개 완료 ({step3_elapsed:.1f}s)")
-
-        # ── Step 4: Assemble & save ──
-        await report("timeline", "타임라인 조립 중...")
-        enriched_scenes = []
-        for i, scene in enumerate(scenes):
-            enriched = {
-                **scene,
-                "image_url": keyframes[i] if i < len(keyframes) else None,
-                "last_frame_url": keyframes[i + 1] if (i + 1) < len(keyframes) else None,
-                "video_url": scene_videos[i] if i < len(scene_videos) else None,
-            }
-            enriched_scenes.append(enriched)
-            asset_store.save_scene_info(unit_name, i + 1, enriched)
-
-        group_image_url = blueprint.get("group_image_url")
-
-        timeline = _build_timeline(
-            session_id=session_id,
-            unit_name=unit_name,
-            debut_statement=blueprint.get("debut_statement", ""),
-            scenes=enriched_scenes,
-            bgm_url=bgm_url,
-            group_image_url=group_image_url,
+                await report("render_error", f"ffmpeg 렌더링 실패 ({step5_elapsed:.1f}s) — 개별 클립은 사용 가능")
+            return enriched_scenes, timeline, teaser_url
+
+        scenario_task = graph.add("scenario", scenario_stage)
+        graph.add("bgm", bgm_stage)
+        for i, future in enumerate(scene_ready):
+            graph.add(f"scene_{i}", lambda future=future: future)
+        keyframe_names = [f"keyframe_{k}" for k in range(KEYFRAME_COUNT)]
+        for k, name in enumerate(keyframe_names):
+            graph.add(name, keyframe_stage(k), deps=[f"scene_{k}" if k < len(scene_ready) else "scenario"])
+        video_names = []
+        for i in range(KEYFRAME_COUNT - 1):
+            name = f"video_{i}"
+            graph.add(name, video_stage(i), deps=["scenario", f"keyframe_{i}", f"keyframe_{i+1}"])
+            video_names.append(name)
+        # Each clip joins the teaser's video track as it lands, so the render is mostly a BGM mux
+        segment_names = []
+        if not checkpoint.is_done("render"):
+            assembler = ProgressiveConcat(unit_name)
+            for i, video_name in enumerate(video_names):
+                name = f"segment_{i}"
+                graph.add(name, lambda url, i=i: assembler.add(i, url), deps=[video_name])
+                segment_names.append(name)
+        else:
+            assembler = None
+        graph.add(
+            "render", render_stage,
+            deps=["scenario", "bgm", *keyframe_names, *video_names, *segment_names],
         )
 
-        asset_store.save_timeline(unit_name, timeline)
-
-        # ── Step 5: FFmpeg render — concatenate clips + mix BGM ──
-        video_clip_count = sum(1 for v in scene_videos if v)
-        await report("render", f"최종 영상 합성 중 (ffmpeg, {video_clip_count}개 클립)...")
-        t5 = time.time()
-        output_path = get_output_path(unit_name)
-        teaser_url = await render_teaser(
-            timeline=timeline,
-            output_path=output_path,
-            group_name=unit_name,
-        )
-        step5_elapsed = time.time() - t5
-
-        if teaser_url:
-            await report("render_done", f"최종 MV 합성 완료! ({step5_elapsed:.1f}s) → {teaser_url}")
-        else:
-            await report("render_error", f"ffmpeg 렌더링 실패 ({step5_elapsed:.1f}s) — 개별 클립은 사용 가능")
+        try:
+            scenario = await graph.result("scenario")
+            if scenario is None:
+                raise graph.errors.get("scenario") or RuntimeError("Scenario generation failed")
+            bgm_url = await graph.result("bgm")
+            render_result = await graph.result("render")
+            if render_result is None:
+                raise graph.errors.get("render") or RuntimeError("Render stage failed")
+            enriched_scenes, timeline, teaser_url = render_result
+        finally:
+            graph.cancel()
+
+        scene_count = len(scenario.get("scenes", []))
+        keyframes = [await graph.result(name) for name in keyframe_names]
+        keyframe_ok = sum(1 for k in keyframes if k)
+        videos_ok = sum(1 for s in enriched_scenes if s.get("video_url"))
 
         total_elapsed = time.time() - pipeline_start
         await report("done", f"MV 티저 파이프라인 완료 (총 {total_elapsed:.1f}s)")
         logger.info(
             "[director] === PIPELINE SUMMARY for '%s' ===\n"
-            "  Step 1 (Scenario):       %.1fs\n"
-            "  Step 2 (BGM+Keyframes):  %.1fs | BGM=%s, Keyframes=%d/%d\n"
-            "  Step 3 (Veo Videos):     %.1fs | Videos=%d/%d\n"
-            "  Step 4 (Timeline):       instant\n"
-            "  Step 5 (FFmpeg):         %.1fs | URL=%s\n"
-            "  TOTAL:                   %.1fs",
+            "  Scenario:       %.1fs\n"
+            "  Keyframes:      %.1fs | Keyframes=%d/%d\n"
+            "  BGM:            %.1fs | BGM=%s\n"
+            "  Veo Videos:     %.1fs | Videos=%d/%d\n"
+            "  Timeline+FFmpeg:%.1fs | URL=%s\n"
+            "  TOTAL:          %.1fs",
             unit_name,
-            t2 - pipeline_start,  # step 1
-            step2_elapsed, "OK" if bgm_url else "FAIL", sum(1 for k in keyframes if k), KEYFRAME_COUNT,
-            step3_elapsed, succeeded, len(scenes),
-            step5_elapsed, teaser_url or "NONE",
+            graph.span("scenario"),
+            graph.span(*keyframe_names), keyframe_ok, KEYFRAME_COUNT,
+            graph.span("bgm"), "OK" if bgm_url else "FAIL",
+            graph.span(*video_names), videos_ok, scene_count,
+            graph.span("render"), teaser_url or "NONE",
             total_elapsed,
         )
 
@@ -278,6 +428,79 @@ class DirectorAgent(BaseAgent):
         }
 
 
+    async def regenerate_scene(
+        self,
+        blueprint: dict,
+        session_id: str,
+        scene_number: int,
+        instructions: str = "",
+        progress_callback=None,
+        regen_id: str | None = None,
+    ) -> dict:
+        """Re-produce a single scene of a finished (or partially finished) teaser.
+
+        Rewrites the scene's scenario text, then redraws the scene's own keyframe
+        (its first frame, drawn from the rewritten visual_concept) and regenerates
+        its clip. The previous scene's clip ends on that frame, so it is
+        re-rendered too to keep frame chaining intact. The scene's last frame is
+        the next scene's first frame: it is kept if that clip exists (only the
+        final scene's end frame is its own). BGM, the other clips and their
+        keyframes are reused from the checkpoint; the timeline and the final
+        render are redone.
+
+        `regen_id` identifies the request: a rerun with the same id (a job
+        reclaimed from a dead worker) finds the rewrite already recorded in the
+        checkpoint and only resumes the production.
+        """
+        checkpoint = TeaserCheckpoint.find(session_id)
+        if checkpoint is None or not checkpoint.is_done("scenario"):
+            raise ValueError("No completed scenario checkpoint for this session")
+
+        # Copy, so the checkpoint keeps the old text until the rewrite is recorded
+        scenario = dict(checkpoint.result("scenario"))
+        scenes = scenario["scenes"] = list(scenario.get("scenes", []))
+        if not 1 <= scene_number <= len(scenes):
+            raise ValueError(f"scene_number must be between 1 and {len(scenes)}")
+        idx = scene_number - 1
+
+        # One trace for the whole regen (produce_teaser joins it)
+        with tracing.pipeline_trace(session_id, checkpoint.unit_name):
+            applied = regen_id is not None and checkpoint.stage("scenario").get("regen") == regen_id
+            if applied:
+                logger.info("[director] scene %d regen %s already applied — resuming", scene_number, regen_id)
+            else:
+                if progress_callback:
+                    await progress_callback("scene_regen", f"씬 {scene_number} 재생성 중 (시나리오)...")
+                with tracing.span("scenario_regen", cat="agent", scene=scene_number):
+                    scenes[idx] = await self.scenario_agent.regenerate_scene(
+                        blueprint, scenario, scene_number, instructions=instructions,
+                    )
+
+                # Keyframe idx is drawn from this scene, so it's always redrawn; scene idx-1
+                # ends on it, so that clip is re-chained. Keyframe idx+1 is drawn from scene
+                # idx+1 — keep it if that scene's clip was built from it.
+                stale = [f"keyframe_{idx}", f"video_{idx}", "render"]
+                if idx > 0:
+                    stale.append(f"video_{idx - 1}")
+                if not (idx + 1 < len(scenes) and checkpoint.is_done(f"video_{idx + 1}")):
+                    stale.append(f"keyframe_{idx + 1}")
+                # The rerun may send the very request being replaced: skip the media cache
+                checkpoint.invalidate(*stale, refresh=True)
+                logger.info("[director] scene %d regen — recomputing %s", scene_number, stale)
+
+                # The rewrite is recorded with its regen id last, in one save: a rerun
+                # either repeats the whole step or skips it
+                asset_store.save_scenario(checkpoint.unit_name, scenario)
+                checkpoint.mark_done("scenario", scenario, regen=regen_id)
+
+            return await self.produce_teaser(
+                blueprint=blueprint,
+                session_id=session_id,
+                progress_callback=progress_callback,
+                checkpoint=checkpoint,
+            )
+
+
 # ── Helper functions ──
 
 def _find_member(blueprint: dict, member_id: str) -> dict:
@@ -1,14 +1,18 @@
 """Scenario Agent — designs the MV teaser storyboard with 4 scenes.
 
 Responsibilities:
-  1. Generate 4-scene scenario from blueprint (LLM call)
-  2. Provide BGM generation helper (called by DirectorAgent in parallel with images)
+  1. Generate 4-scene scenario from blueprint (streamed LLM call)
+  2. Provide BGM generation helper (started by DirectorAgent as soon as the
+     streamed music_direction is complete, in parallel with the scenes)
+  3. Reattach to an in-flight BGM task after a restart (checkpoint resume)
+  4. Rewrite a single scene in an existing scenario (partial re-production)
 """
 
+import json
 import logging
 
 from src.agents.base_agent import BaseAgent
-from src.services.suno_client import generate_bgm
+from src.services.suno_client import generate_bgm, resume_bgm
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +32,13 @@ You MUST respond with valid JSON matching this schema:
   "title": "MV 티저 제목 (Korean)",
   "mood": "overall mood keyword (dark, bright, mysterious, ethereal, fierce...)",
   "color_grading": "color tone description for the entire teaser",
+  "music_direction": {
+    "genre": "K-pop sub-genre (dark pop, future bass, R&B, etc.)",
+    "tempo": "slow / medium / fast",
+    "mood_keywords": ["mysterious", "powerful", "dramatic"],
+    "lyrics_hint": "2-3 lines of Korean lyrics hint or mood description for BGM generation",
+    "instrumental_style": "synth-heavy, orchestral, minimal, trap-influenced, etc."
+  },
   "scenes": [
     {
       "scene_number": 1,
@@ -40,14 +51,7 @@ You MUST respond with valid JSON matching this schema:
       "emotion": "mysterious / powerful / ethereal / fierce / melancholic",
       "transition_to_next": "fade / dissolve / cut / zoom / wipe"
     }
-  ],
-  "music_direction": {
-    "genre": "K-pop sub-genre (dark pop, future bass, R&B, etc.)",
-    "tempo": "slow / medium / fast",
-    "mood_keywords": ["mysterious", "powerful", "dramatic"],
-    "lyrics_hint": "2-3 lines of Korean lyrics hint or mood description for BGM generation",
-    "instrumental_style": "synth-heavy, orchestral, minimal, trap-influenced, etc."
-  }
+  ]
 }
 
 CRITICAL RULES:
@@ -57,6 +61,7 @@ CRITICAL RULES:
 - Scenes should have dramatic progression: mystery → tension → climax → reveal
 - EVERY member MUST appear: distribute member_focus across scenes using round-robin (if 3 members: m1, m2, m3, m1; if 2 members: m1, m2, m1, m2; if 4+: m1, m2, m3, m4)
 - Music direction should match the visual mood
+- Keep the key order of the schema: write music_direction BEFORE scenes (BGM production starts from it while the scenes are still being written)
 - transition_to_next defines how this scene transitions to the next one
 """
 
@@ -67,16 +72,15 @@ class ScenarioAgent(BaseAgent):
     def system_prompt(self) -> str:
         return SCENARIO_SYSTEM_PROMPT
 
-    async def generate_scenario(self, blueprint: dict) -> dict:
-        """Generate 4-scene MV teaser scenario from blueprint."""
-        members_info = []
-        for m in blueprint.get("members", []):
-            members_info.append(
-                f"- {m.get('stage_name', '')} ({m.get('position', '')}): "
-                f"{m.get('personality', '')} / 비주얼: {m.get('visual_description', '')} / "
-                f"무드컬러: {', '.join(m.get('color_palette', []))} / "
-                f"동작스타일: {m.get('motion_style', '')}"
-            )
+    async def generate_scenario(self, blueprint: dict, on_music_direction=None, on_scene=None) -> dict:
+        """Generate 4-scene MV teaser scenario from blueprint.
+
+        Streamed callbacks, so downstream work starts before the call finishes:
+          on_music_direction(dict) — music_direction is complete (written before scenes)
+          on_scene(index, partial_scenario) — scenes[index] is complete; partial_scenario
+            holds the top-level fields so far and scenes[0..index]
+        """
+        members_info = _members_info(blueprint)
 
         member_ids = [m.get("member_id", f"m{i+1}") for i, m in enumerate(blueprint.get("members", []))]
         member_count = len(member_ids)
@@ -104,7 +108,29 @@ class ScenarioAgent(BaseAgent):
             f"모든 멤버가 반드시 등장해야 합니다."
         )
 
-        result = await self.call_llm(user_prompt)
+        header: dict = {}
+        streamed_scenes: list[dict] = []
+
+        def on_field(key: str, value):
+            if key == "scenes":
+                return
+            header[key] = value
+            if key == "music_direction" and isinstance(value, dict) and on_music_direction:
+                logger.info("[scenario_agent] music_direction streamed: %s", value.get("genre", "?"))
+                on_music_direction(value)
+
+        def on_item(key: str, index: int, value):
+            if key == "scenes" and isinstance(value, dict) and on_scene:
+                streamed_scenes.append(value)
+                logger.info("[scenario_agent] scene %d streamed", index + 1)
+                on_scene(index, {**header, "scenes": list(streamed_scenes)})
+
+        streaming = bool(on_music_direction or on_scene)
+        result = await self.call_llm(
+            user_prompt,
+            on_field=on_field if streaming else None,
+            on_item=on_item if streaming else None,
+        )
         logger.info("[scenario_agent] Scenario generated: %s (%d scenes)",
                      result.get("title", "?"), len(result.get("scenes", [])))
         return result
@@ -113,9 +139,14 @@ class ScenarioAgent(BaseAgent):
         self,
         scenario: dict,
         unit_name: str = "",
+        on_submitted=None,
+        cache: bool = False,
     ) -> str | None:
         """Start BGM generation using scenario's music_direction.
         Separated from scenario so DirectorAgent can run BGM + images in parallel.
+
+        on_submitted(task_id) is forwarded to Suno so the task can be checkpointed;
+        cache reuses the track of an identical earlier request (see media_cache).
         """
         music_dir = scenario.get("music_direction", {})
 
@@ -126,6 +157,8 @@ class ScenarioAgent(BaseAgent):
             mood_keywords=music_dir.get("mood_keywords", []),
             lyrics_hint=music_dir.get("lyrics_hint", ""),
             instrumental_style=music_dir.get("instrumental_style", ""),
+            on_submitted=on_submitted,
+            cache=cache,
         )
 
         if bgm_url:
@@ -134,3 +167,73 @@ class ScenarioAgent(BaseAgent):
             logger.warning("[scenario_agent] BGM generation failed")
 
         return bgm_url
+
+    async def resume_bgm_generation(self, task_id: str) -> str | None:
+        """Reattach to a Suno task recorded in a pipeline checkpoint."""
+        bgm_url = await resume_bgm(task_id)
+        if bgm_url:
+            logger.info("[scenario_agent] BGM ready (resumed): %s", bgm_url[:80])
+        else:
+            logger.warning("[scenario_agent] BGM resume failed for task %s", task_id)
+        return bgm_url
+
+    async def regenerate_scene(
+        self,
+        blueprint: dict,
+        scenario: dict,
+        scene_number: int,
+        instructions: str = "",
+    ) -> dict:
+        """Rewrite one scene of an existing scenario, keeping the rest of the arc intact.
+
+        scene_number, duration and member_focus are preserved so keyframe/clip
+        assignment and frame chaining with neighbouring scenes stay valid.
+        """
+        scenes = scenario.get("scenes", [])
+        original = scenes[scene_number - 1]
+        # Keep the context prompt small: scene texts only, no generated asset URLs
+        context_keys = ("scene_number", "description", "visual_concept", "camera_movement",
+                        "lighting", "member_focus", "emotion", "transition_to_next")
+        context_scenes = [{k: sc.get(k) for k in context_keys if k in sc} for sc in scenes]
+
+        user_prompt = (
+            f"유닛 이름: {blueprint.get('unit_name', '')}\n"
+            f"콘셉트: {', '.join(blueprint.get('concepts', []))}\n"
+            f"세계관: {blueprint.get('group_worldview', '')}\n\n"
+            f"멤버:\n" + "\n".join(_members_info(blueprint)) + "\n\n"
+            f"기존 MV 티저 시나리오 '{scenario.get('title', '')}' "
+            f"(무드: {scenario.get('mood', '')}, 컬러: {scenario.get('color_grading', '')}):\n"
+            f"{json.dumps(context_scenes, ensure_ascii=False, indent=2)}\n\n"
+            f"씬 {scene_number}만 새로 디자인해주세요. 앞뒤 씬과 자연스럽게 이어져야 하며, "
+            f"member_focus는 {original.get('member_focus', 'm1')}로 유지합니다.\n"
+        )
+        if instructions:
+            user_prompt += f"수정 요청: {instructions}\n"
+        user_prompt += (
+            "\n전체 시나리오가 아니라 이 씬 하나만 다음 형식의 JSON으로 응답하세요: "
+            '{"scene": { ...scenes[] 항목과 동일한 스키마... }}'
+        )
+
+        # A regeneration asks for a new take: never serve a cached scene
+        result = await self.call_llm(user_prompt, bypass_cache=True)
+        scene = result.get("scene", result)
+        scene.update({
+            "scene_number": scene_number,
+            "duration": original.get("duration", 8),
+            "member_focus": original.get("member_focus", scene.get("member_focus", "m1")),
+        })
+        logger.info("[scenario_agent] Scene %d regenerated", scene_number)
+        return scene
+
+
+def _members_info(blueprint: dict) -> list[str]:
+    """One descriptive line per member for scenario prompts."""
+    members_info = []
+    for m in blueprint.get("members", []):
+        members_info.append(
+            f"- {m.get('stage_name', '')} ({m.get('position', '')}): "
+            f"{m.get('personality', '')} / 비주얼: {m.get('visual_description', '')} / "
+            f"무드컬러: {', '.join(m.get('color_palette', []))} / "
+            f"동작스타일: {m.get('motion_style', '')}"
+        )
+    return members_info
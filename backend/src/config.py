@@ -31,6 +31,61 @@ class Settings:
     TEASER_SCENE_DURATION: str = "8s"
     TEASER_ASPECT_RATIO: str = "9:16"
 
+    # Adaptive concurrency limits (AIMD) per provider and per "provider:model"
+    CONCURRENCY_LIMITS: dict = {
+        "gateway": {"initial": 16, "min": 2, "max": 64},
+        f"gateway:{IMAGE_MODEL}": {"initial": 8, "min": 1, "max": 32},
+        f"gateway:{AGENT_MODEL}": {"initial": 8, "min": 1, "max": 32},
+        "fal": {"initial": 8, "min": 1, "max": 32},
+        "suno": {"initial": 4, "min": 1, "max": 10},
+    }
+
+    # Hedged provider requests (duplicate slow Veo/image jobs, keep the first success)
+    HEDGE_ENABLED: bool = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "0.9"))
+    HEDGE_MIN_SAMPLES: int = 5  # below this, use HEDGE_DEFAULT_DELAYS
+    HEDGE_DEFAULT_DELAYS: dict = {"veo": 150.0, "image": 60.0}
+    HEDGE_MAX_PER_STAGE: int = int(os.getenv("HEDGE_MAX_PER_STAGE", "2"))
+
+    # Teaser job queue (concurrent director pipelines / max waiting jobs)
+    TEASER_MAX_CONCURRENT: int = int(os.getenv("TEASER_MAX_CONCURRENT", "3"))
+    TEASER_MAX_QUEUED: int = int(os.getenv("TEASER_MAX_QUEUED", "20"))
+    # false → API process only enqueues; run `python -m src.worker` to execute jobs
+    TEASER_INPROCESS_WORKERS: bool = os.getenv("TEASER_INPROCESS_WORKERS", "true").lower() == "true"
+
+    # Shared state (sessions, operations, job queue, Suno callbacks)
+    # "memory" (single process) or "sqlite:///abs/path/debut.db" (multi-process, one host)
+    STATE_STORE_URL: str = os.getenv("STATE_STORE_URL", "memory")
+    JOB_POLL_INTERVAL: float = 1.0       # idle workers check the store this often (s)
+    JOB_HEARTBEAT_INTERVAL: float = 15.0
+    JOB_STALE_AFTER: float = 90.0        # running job without heartbeat → reclaimed
+    JOB_RETENTION: float = 24 * 3600     # finished / failed jobs are deleted after this (s)
+    WORKER_METRICS_PORT: int = int(os.getenv("WORKER_METRICS_PORT", "0"))  # 0 = off
+
+    # Agent LLM response cache (opt-in; per call: call_llm(cache=..., bypass_cache=...))
+    # Kept outside assets/, which is served publicly
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv(
+        "LLM_CACHE_PATH", os.path.join(os.path.dirname(__file__), "..", ".cache", "llm_cache.db")
+    )
+    LLM_CACHE_MAX_MB: float = float(os.getenv("LLM_CACHE_MAX_MB", "200"))
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+    # Reference images are downscaled / recompressed before they're sent to the image model
+    IMAGE_REF_MAX_SIDE: int = int(os.getenv("IMAGE_REF_MAX_SIDE", "1024"))  # 0 = keep size
+    IMAGE_REF_FORMAT: str = os.getenv("IMAGE_REF_FORMAT", "jpeg")  # jpeg | webp | png
+    IMAGE_REF_QUALITY: int = int(os.getenv("IMAGE_REF_QUALITY", "88"))
+    # Group shot: one contact sheet of all members instead of one image per member
+    GROUP_IMAGE_CONTACT_SHEET: bool = os.getenv("GROUP_IMAGE_CONTACT_SHEET", "false").lower() == "true"
+
+    # Generated media cache (assets/cache/; per call: generate_*(cache=True))
+    MEDIA_CACHE_ENABLED: bool = os.getenv("MEDIA_CACHE_ENABLED", "true").lower() == "true"
+    MEDIA_CACHE_MAX_GB: float = float(os.getenv("MEDIA_CACHE_MAX_GB", "5"))
+
+    # Render pool: ffmpeg / Remotion processes at once (0 = half the CPUs), threads per job (0 = CPUs / procs)
+    RENDER_MAX_PROCS: int = int(os.getenv("RENDER_MAX_PROCS", "0"))
+    RENDER_THREADS: int = int(os.getenv("RENDER_THREADS", "0"))
+
     # App
     MAX_MEMBERS: int = 3
 
@@ -1,11 +1,17 @@
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from src.routers import session, blueprint, image, music, teaser
+from src.config import settings
+from src.services import metrics, rate_limiter, render_pool
+from src.services.llm_cache import get_llm_cache
+from src.worker import teaser_queue
 
 # Configure logging for all src.* modules
 logging.basicConfig(
@@ -14,7 +20,18 @@ logging.basicConfig(
     datefmt="%H:%M:%S",
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Consume teaser jobs here unless dedicated `python -m src.worker` processes do it
+    if settings.TEASER_INPROCESS_WORKERS:
+        teaser_queue.start()
+    yield
+    await teaser_queue.stop()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Debut API",
     version="1.0.0",
     description="Virtual Idol Debut Simulator — Gemini 3 Seoul Hackathon",
@@ -43,3 +60,32 @@ app.mount("/api/assets", StaticFiles(directory=str(ASSETS_DIR)), name="assets")
 @app.get("/api/health")
 async def health():
     return {"status": "healthy", "service": "Debut", "version": "1.0.0"}
+
+
+@app.get("/api/limits")
+async def limits():
+    """Adaptive provider concurrency limits, in-flight calls and queue depth."""
+    return rate_limiter.get_stats()
+
+
+@app.get("/api/render-pool")
+async def render_pool_stats():
+    """Render pool slots, per-job threads, running and queued ffmpeg / Remotion jobs."""
+    return render_pool.get_stats()
+
+
+@app.get("/api/llm-cache")
+async def llm_cache_stats():
+    """Agent LLM response cache size and hit/miss/bypass counters (this process)."""
+    if not settings.LLM_CACHE_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **get_llm_cache().stats()}
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (per-process metrics)."""
+    stats = teaser_queue.stats()
+    metrics.TEASER_QUEUE_JOBS.set(stats["queued"], state="queued")
+    metrics.TEASER_QUEUE_JOBS.set(stats["running"], state="running")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -12,14 +12,14 @@ class ImageGenRequest(BaseModel):
 class ImageEditRequest(BaseModel):
     session_id: str
     member_id: str
-    reference_image_b64: str
+    reference_image_b64: str  # image handle or data URI
     edit_instructions: str
 
 
 class ImageInpaintRequest(BaseModel):
     session_id: str
     member_id: str
-    base_image_b64: str
+    base_image_b64: str       # image handle or data URI
     mask_image_b64: str
     edit_instructions: str
 
@@ -36,4 +36,4 @@ class GroupImageGenResponse(BaseModel):
 class ImageGenResponse(BaseModel):
     session_id: str
     member_id: str
-    image_url: str  # data:image/png;base64,... or public URL
+    image_url: str  # image handle (/api/assets/images/{sha256}.png)
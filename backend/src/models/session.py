@@ -13,7 +13,7 @@ class Member(BaseModel):
     visual_description: str = ""
     age: int = 0
     mbti: str = ""
-    image_url: str | None = None
+    image_url: str | None = None  # image handle (/api/assets/images/...)
     color_palette: list[str] = []
     motion_style: str = ""
 
@@ -28,7 +28,7 @@ class Blueprint(BaseModel):
     debut_concept_description: str = ""
     fandom_name: str = ""
     debut_statement: str = ""
-    group_image_url: str | None = None
+    group_image_url: str | None = None  # image handle
 
 
 class BlueprintRequest(BaseModel):
@@ -39,12 +39,15 @@ class BlueprintRequest(BaseModel):
     art_style: str = "realistic"  # "realistic" | "virtual"
     group_type: str = "girl"  # "girl" | "boy"
     language: str = "ko"
+    fresh: bool = False  # bypass the LLM response cache (new creative take)
+    variants: int = Field(1, ge=1, le=4)  # >1: K alternative blueprints in one round trip
 
 
 class Session(BaseModel):
     session_id: str
     status: str = "created"
     blueprint: Blueprint | None = None
+    blueprint_variants: list[Blueprint] = []  # alternatives from a variants request
     music_url: str | None = None
     teaser_url: str | None = None
     teaser_operation_id: str | None = None
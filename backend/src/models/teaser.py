@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class TeaserGenRequest(BaseModel):
@@ -13,10 +13,18 @@ class TeaserGenResponse(BaseModel):
     session_id: str
     operation_id: str
     status: str = "processing"
+    queue_position: int | None = None  # 0 = next to start; None once running
 
 
 class TeaserStatusResponse(BaseModel):
     operation_id: str
-    status: str  # processing | completed | error
+    status: str  # queued | processing | completed | error
     video_url: str | None = None
     error: str | None = None
+    queue_position: int | None = None
+
+
+class SceneRegenRequest(BaseModel):
+    session_id: str
+    scene_number: int = Field(..., ge=1)
+    instructions: str = ""  # optional direction for the rewritten scene
@@ -1,6 +1,9 @@
+import asyncio
+import json
 import logging
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from src.models.session import BlueprintRequest, Blueprint, Member
@@ -35,42 +38,27 @@ class BlueprintUpdateRequest(BaseModel):
     debut_statement: str | None = None
 
 
-@router.post("/generate")
-async def generate(request: BlueprintRequest):
-    session = get_session(request.session_id)
-    if session is None:
-        raise HTTPException(status_code=404, detail="Session not found")
+def _member_from_raw(m_data: dict, index: int) -> Member:
+    return Member(
+        member_id=m_data.get("member_id", f"m{index+1}"),
+        stage_name=m_data.get("stage_name", ""),
+        real_name=m_data.get("real_name", ""),
+        position=m_data.get("position", ""),
+        personality=m_data.get("personality", ""),
+        speech_style=m_data.get("speech_style", ""),
+        fan_nickname=m_data.get("fan_nickname", ""),
+        visual_description=m_data.get("visual_description", ""),
+        age=m_data.get("age", 0),
+        mbti=m_data.get("mbti", ""),
+        color_palette=m_data.get("color_palette", []),
+        motion_style=m_data.get("motion_style", ""),
+    )
 
-    try:
-        raw = await _concept_agent.generate_blueprint(
-            unit_name=request.unit_name,
-            concepts=request.concepts,
-            member_count=request.member_count,
-            art_style=request.art_style,
-            group_type=request.group_type,
-        )
-    except Exception as e:
-        logger.exception("Blueprint generation failed")
-        raise HTTPException(status_code=500, detail=f"Blueprint generation failed: {e}")
 
-    members = []
-    for m_data in raw.get("members", []):
-        members.append(Member(
-            member_id=m_data.get("member_id", f"m{len(members)+1}"),
-            stage_name=m_data.get("stage_name", ""),
-            real_name=m_data.get("real_name", ""),
-            position=m_data.get("position", ""),
-            personality=m_data.get("personality", ""),
-            speech_style=m_data.get("speech_style", ""),
-            fan_nickname=m_data.get("fan_nickname", ""),
-            visual_description=m_data.get("visual_description", ""),
-            age=m_data.get("age", 0),
-            mbti=m_data.get("mbti", ""),
-            color_palette=m_data.get("color_palette", []),
-            motion_style=m_data.get("motion_style", ""),
-        ))
-
-    bp = Blueprint(
+def _build_blueprint(request: BlueprintRequest, raw: dict) -> Blueprint:
+    members = [_member_from_raw(m_data, i) for i, m_data in enumerate(raw.get("members", []))]
+
+    return Blueprint(
         unit_name=request.unit_name,
         concepts=request.concepts,
         art_style=request.art_style,
@@ -82,10 +70,10 @@ async def generate(request: BlueprintRequest):
         debut_statement=raw.get("debut_statement", ""),
     )
 
-    update_session(request.session_id, blueprint=bp, status="blueprint_ready")
 
+def _blueprint_body(session_id: str, bp: Blueprint) -> dict:
     return {
-        "session_id": request.session_id,
+        "session_id": session_id,
         "unit_name": bp.unit_name,
         "concepts": bp.concepts,
         "art_style": bp.art_style,
@@ -99,6 +87,125 @@ async def generate(request: BlueprintRequest):
     }
 
 
+def _save_blueprint(request: BlueprintRequest, raw: dict) -> dict:
+    """Build the Blueprint from the agent output, store it on the session, return the response body."""
+    bp = _build_blueprint(request, raw)
+    update_session(request.session_id, blueprint=bp, blueprint_variants=[], status="blueprint_ready")
+    return _blueprint_body(request.session_id, bp)
+
+
+@router.post("/generate")
+async def generate(request: BlueprintRequest):
+    session = get_session(request.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if request.variants > 1:
+        return await _generate_variants(request)
+
+    try:
+        raw = await _concept_agent.generate_blueprint(
+            unit_name=request.unit_name,
+            concepts=request.concepts,
+            member_count=request.member_count,
+            art_style=request.art_style,
+            group_type=request.group_type,
+            fresh=request.fresh,
+        )
+    except Exception as e:
+        logger.exception("Blueprint generation failed")
+        raise HTTPException(status_code=500, detail=f"Blueprint generation failed: {e}")
+
+    return _save_blueprint(request, raw)
+
+
+async def _generate_variants(request: BlueprintRequest) -> dict:
+    """K blueprints in one round trip; the first becomes the session blueprint until one is selected."""
+    try:
+        raws = await _concept_agent.generate_blueprint_variants(
+            unit_name=request.unit_name,
+            concepts=request.concepts,
+            member_count=request.member_count,
+            variants=request.variants,
+            art_style=request.art_style,
+            group_type=request.group_type,
+        )
+    except Exception as e:
+        logger.exception("Blueprint variant generation failed")
+        raise HTTPException(status_code=500, detail=f"Blueprint generation failed: {e}")
+
+    variants = [_build_blueprint(request, raw) for raw in raws]
+    update_session(
+        request.session_id, blueprint=variants[0], blueprint_variants=variants, status="blueprint_ready",
+    )
+    return {
+        **_blueprint_body(request.session_id, variants[0]),
+        "selected_variant": 0,
+        "variants": [_blueprint_body(request.session_id, bp) for bp in variants],
+    }
+
+
+@router.post("/{session_id}/variants/{index}/select")
+async def select_variant(session_id: str, index: int):
+    """Make one of the generated variants the session blueprint."""
+    session = get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if not 0 <= index < len(session.blueprint_variants):
+        raise HTTPException(status_code=404, detail="Variant not found")
+
+    bp = session.blueprint_variants[index]
+    update_session(session_id, blueprint=bp.model_copy(deep=True))
+    return {**_blueprint_body(session_id, bp), "selected_variant": index}
+
+
+@router.post("/generate/stream")
+async def generate_stream(request: BlueprintRequest):
+    """Same as /generate, streamed as NDJSON so members can be shown as they are written.
+
+    Lines: {"type": "member", "index": i, "member": {...}} per member, then
+    {"type": "blueprint", ...same body as /generate...} or {"type": "error", "detail": "..."}.
+    """
+    session = get_session(request.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_member(index: int, m_data: dict):
+        member = _member_from_raw(m_data, index)
+        queue.put_nowait({"type": "member", "index": index, "member": member.model_dump()})
+
+    async def produce():
+        try:
+            raw = await _concept_agent.generate_blueprint(
+                unit_name=request.unit_name,
+                concepts=request.concepts,
+                member_count=request.member_count,
+                art_style=request.art_style,
+                group_type=request.group_type,
+                on_member=on_member,
+                fresh=request.fresh,
+            )
+            queue.put_nowait({"type": "blueprint", **_save_blueprint(request, raw)})
+        except Exception as e:
+            logger.exception("Blueprint generation failed")
+            queue.put_nowait({"type": "error", "detail": f"Blueprint generation failed: {e}"})
+
+    async def lines():
+        task = asyncio.create_task(produce())
+        try:
+            while True:
+                event = await queue.get()
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+                if event["type"] != "member":
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.patch("/{session_id}/members/{member_id}")
 async def update_member(session_id: str, member_id: str, body: MemberUpdateRequest):
     """Update a single member's persona fields."""
@@ -117,6 +224,7 @@ async def update_member(session_id: str, member_id: str, body: MemberUpdateReque
     updates = body.model_dump(exclude_none=True)
     for key, value in updates.items():
         setattr(member, key, value)
+    update_session(session_id, blueprint=session.blueprint)
 
     return {"status": "ok", "member": member.model_dump()}
 
@@ -133,6 +241,7 @@ async def update_blueprint(session_id: str, body: BlueprintUpdateRequest):
     updates = body.model_dump(exclude_none=True)
     for key, value in updates.items():
         setattr(session.blueprint, key, value)
+    update_session(session_id, blueprint=session.blueprint)
 
     return {
         "status": "ok",
@@ -54,4 +54,7 @@ async def get(session_id: str):
         }
         result["members"] = members_list
 
+    if session.blueprint_variants:
+        result["blueprint_variants"] = [bp.model_dump() for bp in session.blueprint_variants]
+
     return result
@@ -1,23 +1,31 @@
-import asyncio
 import logging
-import time
+import uuid
 
 from fastapi import APIRouter, HTTPException
 
-from src.models.teaser import TeaserGenRequest, TeaserGenResponse, TeaserStatusResponse
-from src.agents.director_agent import DirectorAgent
-from src.services.session_store import get_session, update_session
+from src.models.teaser import (
+    TeaserGenRequest, TeaserGenResponse, TeaserStatusResponse, SceneRegenRequest,
+)
+from src.config import settings
+from src.services import asset_store, hedging, tracing
+from src.services.checkpoint import TeaserCheckpoint
+from src.services.job_queue import QueueFullError
+from src.services.session_store import get_session, update_session, restore_session
+from src.services.state_store import get_state_store
+from src.worker import teaser_queue
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-_director = DirectorAgent()
+_ACTIVE_STATUSES = ("queued", "processing")
 
-# Track MV teaser production operations (lightweight: no result payload stored)
-_mv_operations: dict[str, dict] = {}
 
-# Keep references to background tasks so they aren't GC'd
-_background_tasks: set[asyncio.Task] = set()
+def _active_operation(operation_id: str) -> dict | None:
+    """The teaser operation record (shared store) if it is queued or running."""
+    mv_op = get_state_store().get_operation(operation_id)
+    if mv_op and mv_op["status"] in _ACTIVE_STATUSES:
+        return mv_op
+    return None
 
 
 @router.post("/generate", response_model=TeaserGenResponse)
@@ -29,112 +37,123 @@ async def generate(request: TeaserGenRequest):
     if not session.blueprint:
         raise HTTPException(status_code=400, detail="Blueprint not generated yet")
 
-    operation_id = f"mv-{request.session_id}"
+    if _active_operation(f"mv-{request.session_id}"):
+        raise HTTPException(status_code=409, detail="Teaser production already in progress")
 
-    _mv_operations[operation_id] = {
-        "status": "processing",
-        "progress": "시작 중...",
-        "session_id": request.session_id,
-    }
+    # The worker reads the blueprint from the session when the job starts
+    return _start_pipeline(request.session_id, {"kind": "generate"})
 
-    # Build blueprint dict for director agent
-    bp = session.blueprint
-    blueprint_dict = {
-        "unit_name": bp.unit_name,
-        "concepts": bp.concepts,
-        "art_style": bp.art_style,
-        "group_type": bp.group_type,
-        "members": [m.model_dump() for m in bp.members],
-        "group_worldview": bp.group_worldview,
-        "debut_concept_description": bp.debut_concept_description,
-        "fandom_name": bp.fandom_name,
-        "debut_statement": bp.debut_statement,
-        "group_image_url": bp.group_image_url,
-    }
 
-    async def progress_callback(step: str, detail: str):
-        if operation_id in _mv_operations:
-            _mv_operations[operation_id]["progress"] = f"{step}: {detail}"
-        update_session(request.session_id, teaser_progress=f"{step}: {detail}")
+@router.post("/resume/{session_id}", response_model=TeaserGenResponse)
+async def resume(session_id: str):
+    """Resume a checkpointed teaser production (e.g. after a server restart).
 
-    # Run director pipeline in background (with GC-safe reference)
-    task = asyncio.create_task(
-        _run_director(operation_id, blueprint_dict, request.session_id, progress_callback)
-    )
-    _background_tasks.add(task)
-    task.add_done_callback(_background_tasks.discard)
+    Completed stages are skipped; Suno/fal jobs still in flight are reattached.
+    """
+    operation_id = f"mv-{session_id}"
+    mv_op = _active_operation(operation_id)
+    if mv_op:
+        # Already queued/running — nothing to resume
+        return TeaserGenResponse(
+            session_id=session_id, operation_id=operation_id, status=mv_op["status"],
+            queue_position=teaser_queue.position(operation_id),
+        )
 
-    update_session(
-        request.session_id,
-        teaser_operation_id=operation_id,
-        status="teaser_generating",
-    )
+    checkpoint = TeaserCheckpoint.find(session_id)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="No checkpoint found for session")
 
-    return TeaserGenResponse(
-        session_id=request.session_id,
-        operation_id=operation_id,
-        status="processing",
-    )
+    # After a restart an in-memory session is gone; the worker reloads its blueprint from disk
+    session = restore_session(session_id)
+    if session.blueprint is None and not asset_store.load_blueprint(checkpoint.unit_name):
+        raise HTTPException(status_code=404, detail="Checkpoint blueprint (group_info.json) not found")
 
+    return _start_pipeline(session_id, {"kind": "resume"}, progress="재개 중...")
 
-async def _run_director(
-    operation_id: str,
-    blueprint_dict: dict,
-    session_id: str,
-    progress_callback,
-):
-    """Background task: run full Director Agent pipeline."""
-    t0 = time.time()
-    logger.info("[teaser] === PIPELINE START === op=%s session=%s", operation_id, session_id)
-    try:
-        result = await _director.produce_teaser(
-            blueprint=blueprint_dict,
-            session_id=session_id,
-            progress_callback=progress_callback,
-        )
 
-        # Use Remotion-rendered teaser_url if available, otherwise fallback to first clip
-        teaser_url = result.get("teaser_url")
-        if not teaser_url:
-            video_urls = [s.get("video_url") for s in result.get("scenes", []) if s.get("video_url")]
-            teaser_url = video_urls[0] if video_urls else None
+@router.post("/regenerate-scene", response_model=TeaserGenResponse)
+async def regenerate_scene(request: SceneRegenRequest):
+    """Re-produce one scene (scenario text, its keyframe, its clip) and re-render.
+
+    The previous scene's clip is re-rendered too, since it ends on the redrawn
+    keyframe. BGM, the other clips and their keyframes are reused from the checkpoint.
+    """
+    session_id = request.session_id
+    operation_id = f"mv-{session_id}"
+    if _active_operation(operation_id):
+        raise HTTPException(status_code=409, detail="Teaser production already in progress")
+
+    checkpoint = TeaserCheckpoint.find(session_id)
+    if checkpoint is None or not checkpoint.is_done("scenario"):
+        raise HTTPException(status_code=404, detail="No teaser checkpoint found for session")
+    scene_count = len(checkpoint.result("scenario").get("scenes", []))
+    if request.scene_number > scene_count:
+        raise HTTPException(status_code=400, detail=f"scene_number must be between 1 and {scene_count}")
+
+    session = restore_session(session_id)
+    if session.blueprint is None and not asset_store.load_blueprint(checkpoint.unit_name):
+        raise HTTPException(status_code=404, detail="Checkpoint blueprint (group_info.json) not found")
+
+    payload = {
+        "kind": "regenerate_scene",
+        "scene_number": request.scene_number,
+        "instructions": request.instructions,
+        "regen_id": uuid.uuid4().hex,  # a reclaimed job applies the rewrite only once
+    }
+    return _start_pipeline(session_id, payload, progress=f"씬 {request.scene_number} 재생성 시작...")
 
-        elapsed = time.time() - t0
-        logger.info(
-            "[teaser] === PIPELINE COMPLETE === (%.1fs) teaser_url=%s scenes=%d bgm=%s",
-            elapsed, teaser_url, len(result.get("scenes", [])), bool(result.get("bgm_url")),
-        )
 
-        # Update session with all results (session is the source of truth)
-        update_session(
-            session_id,
-            scenario=result.get("scenario"),
-            teaser_scenes=result.get("scenes", []),
-            bgm_url=result.get("bgm_url"),
-            timeline=result.get("timeline"),
-            teaser_url=teaser_url,
-            status="completed",
+def _start_pipeline(session_id: str, payload: dict, progress: str = "시작 중...") -> TeaserGenResponse:
+    """Register the operation and enqueue a director production job.
+
+    `payload["kind"]` is "generate", "resume" or "regenerate_scene"; see
+    src.worker.run_teaser_job.
+    """
+    operation_id = f"mv-{session_id}"
+    payload = {**payload, "session_id": session_id}
+
+    # Register before enqueueing: a worker in another process may claim the job at once
+    store = get_state_store()
+    previous = store.get_operation(operation_id)
+    store.put_operation(operation_id, {"status": "queued", "progress": progress, "session_id": session_id})
+    try:
+        position = teaser_queue.submit(operation_id, session_id, payload)
+    except QueueFullError:
+        if previous:
+            store.put_operation(operation_id, previous)
+        else:
+            store.put_operation(operation_id, {"status": "error", "error": "queue full", "session_id": session_id})
+        raise HTTPException(
+            status_code=503,
+            detail="Teaser queue is full, try again shortly",
+            headers={"Retry-After": "30"},
         )
+    if position:
+        store.update_operation(operation_id, progress=f"대기 중 (앞에 {position}개)")
 
-        _mv_operations[operation_id]["status"] = "completed"
+    update_session(
+        session_id,
+        teaser_operation_id=operation_id,
+        status="teaser_generating",
+    )
 
-    except Exception as e:
-        elapsed = time.time() - t0
-        logger.exception("[teaser] === PIPELINE FAILED === (%.1fs) %s", elapsed, e)
-        _mv_operations[operation_id]["status"] = "error"
-        _mv_operations[operation_id]["error"] = str(e)
-        update_session(session_id, teaser_progress=f"error: {e}")
+    return TeaserGenResponse(
+        session_id=session_id,
+        operation_id=operation_id,
+        status="queued",
+        queue_position=position,
+    )
 
 
 @router.get("/status/{operation_id}", response_model=TeaserStatusResponse)
 async def status(operation_id: str):
-    mv_op = _mv_operations.get(operation_id)
+    mv_op = get_state_store().get_operation(operation_id)
     if not mv_op:
         raise HTTPException(status_code=404, detail="Operation not found")
 
     video_url = None
     if mv_op["status"] == "completed":
-        # Fetch from session (source of truth) rather than _mv_operations
+        # Fetch from session (source of truth) rather than the operation record
         session = get_session(mv_op.get("session_id", ""))
         if session and session.teaser_url:
             video_url = session.teaser_url
@@ -144,6 +163,7 @@ async def status(operation_id: str):
         status=mv_op["status"],
         video_url=video_url,
         error=mv_op.get("error"),
+        queue_position=teaser_queue.position(operation_id),
     )
 
 
@@ -155,7 +175,7 @@ async def get_progress(session_id: str):
         raise HTTPException(status_code=404, detail="Session not found")
 
     operation_id = f"mv-{session_id}"
-    mv_op = _mv_operations.get(operation_id, {})
+    mv_op = get_state_store().get_operation(operation_id) or {}
 
     # Read completed results from session (source of truth)
     scenes = session.teaser_scenes or []
@@ -164,9 +184,35 @@ async def get_progress(session_id: str):
         "session_id": session_id,
         "status": mv_op.get("status", session.status),
         "progress": mv_op.get("progress", session.teaser_progress),
+        "queue_position": teaser_queue.position(operation_id),
         "scenario": session.scenario,
         "scenes": scenes,
         "bgm_url": session.bgm_url,
         "timeline": session.timeline,
         "teaser_url": session.teaser_url,
     }
+
+
+@router.get("/trace/{session_id}")
+async def get_trace(session_id: str):
+    """Span trace of the session's latest pipeline run (Chrome trace / Perfetto JSON).
+
+    Open in chrome://tracing or ui.perfetto.dev; `otherData.critical_path` lists
+    the stages that bounded the run.
+    """
+    trace = tracing.get_trace(session_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="No trace found for session")
+    return trace
+
+
+@router.get("/hedge-stats")
+async def hedge_stats():
+    """How often hedged Veo/image requests fired and how often the hedge won."""
+    return {"enabled": settings.HEDGE_ENABLED, "kinds": hedging.get_stats()}
+
+
+@router.get("/queue")
+async def queue_stats():
+    """Teaser worker pool occupancy and queue depth."""
+    return teaser_queue.stats()
@@ -4,6 +4,8 @@ Structure:
   assets/
     {group_name}/
       group_info.json          # 그룹 블루프린트
+      checkpoint.json          # 티저 파이프라인 체크포인트 (resume용)
+      trace.json               # 마지막 파이프라인 실행 트레이스 (Chrome trace)
       scenario.json            # 시나리오 전체
       timeline.json            # Remotion 타임라인
       members/
@@ -21,21 +23,57 @@ Structure:
         bgm.mp3               # Suno BGM
       final/
         teaser.mp4             # 최종 합성 영상
+    images/
+      {sha256}.png             # 이미지 핸들 (세션/체크포인트/타임라인이 참조하는 /api/assets/images/...)
+    cache/
+      {image,clip,bgm}/{sha256}.*  # 생성 미디어 캐시 (media_cache.py)
+    blobs/
+      {sha[:2]}/{sha256}.*     # 바이너리 원본 (위의 png/mp4/mp3는 모두 여기로의 하드링크)
+
+Binary assets are content-addressed: each distinct file is written once under
+blobs/ and every per-scene path is a hardlink to it (a copy where the
+filesystem can't link). A keyframe shared by two scenes, a clip kept both in
+scenes/ and final/, or a BGM downloaded twice is stored once. Files are always
+replaced by rename, never rewritten in place, so a link never changes under
+another path.
 """
 
+import asyncio
 import json
 import base64
+import hashlib
 import logging
+import os
+import shutil
+import time
+import uuid
+from collections import OrderedDict
 from pathlib import Path
 
 import httpx
 
+from src.services import tracing
+
 logger = logging.getLogger(__name__)
 
 ASSETS_ROOT = Path(__file__).parent.parent.parent / "assets"
 
 # Shared httpx client for file downloads
 _dl_client: httpx.AsyncClient | None = None
+_DL_CHUNK = 1 << 20
+_DL_ATTEMPTS = 4  # first try + resumes after a dropped connection
+
+# Local media cache: URL → (blob of an earlier download, last handed out), LRU-
+# bounded, and downloads in flight so concurrent requests for one URL share them.
+# gc_blobs spares blobs handed out within _URL_BLOB_PIN s (maybe not linked yet).
+_url_blobs: OrderedDict[str, tuple[Path, float]] = OrderedDict()
+_URL_BLOBS_MAX = 256
+_URL_BLOB_PIN = 600
+_inflight: dict[str, asyncio.Task] = {}
+
+# Whether link_file can hardlink into the blob store (None: not tried yet).
+# Without hardlinks assets are copies, blobs have no other links and gc_blobs must not run.
+_hardlinks: bool | None = None
 
 
 def _get_dl_client() -> httpx.AsyncClient:
@@ -84,6 +122,17 @@ def save_json(path: Path, data: dict) -> Path:
     return path
 
 
+def load_json(path: Path) -> dict | None:
+    """Load JSON data from file, or None if missing/corrupt."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Failed to load JSON %s: %s", path, e)
+        return None
+
+
 def save_blueprint(group_name: str, blueprint: dict) -> Path:
     """Save group blueprint."""
     group_dir = get_group_dir(group_name)
@@ -98,6 +147,48 @@ def save_member_profile(group_name: str, member: dict) -> Path:
     return save_json(member_dir / "profile.json", member)
 
 
+def load_blueprint(group_name: str) -> dict | None:
+    """Load group blueprint saved by save_blueprint()."""
+    return load_json(get_group_dir(group_name) / "group_info.json")
+
+
+def save_checkpoint(group_name: str, checkpoint: dict) -> Path:
+    """Save pipeline checkpoint manifest (write-then-rename so a crash never leaves it half-written)."""
+    path = get_group_dir(group_name) / "checkpoint.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(checkpoint, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def load_checkpoint(group_name: str) -> dict | None:
+    """Load pipeline checkpoint manifest for a group."""
+    return load_json(get_group_dir(group_name) / "checkpoint.json")
+
+
+def find_checkpoint(session_id: str) -> dict | None:
+    """Find the checkpoint manifest recorded for a session across all groups."""
+    for path in ASSETS_ROOT.glob("*/checkpoint.json"):
+        data = load_json(path)
+        if data and data.get("session_id") == session_id:
+            return data
+    return None
+
+
+def save_trace(group_name: str, trace: dict) -> Path:
+    """Save the latest pipeline trace (Chrome trace JSON)."""
+    return save_json(get_group_dir(group_name) / "trace.json", trace)
+
+
+def find_trace(session_id: str) -> dict | None:
+    """Find the saved trace of a session's latest pipeline run across all groups."""
+    for path in ASSETS_ROOT.glob("*/trace.json"):
+        data = load_json(path)
+        if data and data.get("otherData", {}).get("session_id") == session_id:
+            return data
+    return None
+
+
 def save_scenario(group_name: str, scenario: dict) -> Path:
     """Save scenario data."""
     group_dir = get_group_dir(group_name)
@@ -116,54 +207,329 @@ def save_scene_info(group_name: str, scene_number: int, scene_data: dict) -> Pat
     return save_json(scene_dir / "scene_info.json", scene_data)
 
 
+def _blob_path(digest: str, suffix: str) -> Path:
+    return ASSETS_ROOT / "blobs" / digest[:2] / f"{digest}{suffix}"
+
+
+def store_blob(data: bytes, suffix: str = "") -> Path:
+    """Write bytes once under blobs/ by sha256; returns the blob path."""
+    blob = _blob_path(hashlib.sha256(data).hexdigest(), suffix)
+    if not blob.exists():
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f"{blob.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(blob)
+    return blob
+
+
+def _adopt_blob(tmp: Path, digest: str, suffix: str) -> Path:
+    """Move a fully written temp file into blobs/ (dropped if the blob exists)."""
+    blob = _blob_path(digest, suffix)
+    if blob.exists():
+        tmp.unlink()
+    else:
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp.replace(blob)
+    return blob
+
+
+def link_file(src: Path, path: Path) -> Path:
+    """Point `path` at `src`'s bytes: hardlink, or copy across filesystems."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    global _hardlinks
+    try:
+        os.link(src, tmp)
+    except OSError as e:
+        if _hardlinks is not False:
+            logger.warning("Hardlinks unavailable (%s), copying assets; blob GC disabled", e)
+        _hardlinks = False
+        shutil.copyfile(src, tmp)
+    tmp.replace(path)
+    return path
+
+
+def _hardlinks_work() -> bool:
+    """Whether the blob store can be hardlinked (tried once with a probe file)."""
+    global _hardlinks
+    if _hardlinks is None:
+        blobs_dir = ASSETS_ROOT / "blobs"
+        blobs_dir.mkdir(parents=True, exist_ok=True)
+        probe = blobs_dir / f".probe-{uuid.uuid4().hex[:8]}.tmp"
+        linked = probe.with_name(f"{probe.stem}.link.tmp")
+        try:
+            probe.touch()
+            os.link(probe, linked)
+            _hardlinks = True
+        except OSError:
+            _hardlinks = False
+        finally:
+            probe.unlink(missing_ok=True)
+            linked.unlink(missing_ok=True)
+    return _hardlinks
+
+
+def save_bytes(path: Path, data: bytes) -> Path:
+    """Save a binary asset (stored once as a blob, linked at `path`)."""
+    return link_file(store_blob(data, path.suffix), path)
+
+
+def gc_blobs() -> int:
+    """Delete blobs no asset path links to any more. Returns the count removed.
+
+    Skipped entirely where hardlinks don't work (copied assets never reference
+    a blob, so every blob would look unused). Blobs fetch_media handed out in
+    the last _URL_BLOB_PIN seconds are kept (a render may not have linked them
+    yet); in-flight downloads are still .tmp files.
+    """
+    if not _hardlinks_work():
+        return 0
+    now = time.time()
+    in_use = {blob for blob, handed_out in _url_blobs.values() if handed_out > now - _URL_BLOB_PIN}
+    removed = 0
+    cutoff = now - 60  # a fresh download may not be linked yet
+    for blob in (ASSETS_ROOT / "blobs").glob("*/*"):
+        try:
+            st = blob.stat()
+            if (
+                st.st_nlink == 1 and st.st_mtime < cutoff
+                and not blob.name.endswith(".tmp") and blob not in in_use
+            ):
+                blob.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
 def save_base64_image(path: Path, data_uri: str) -> Path:
     """Save base64 data URI as image file."""
-    path.parent.mkdir(parents=True, exist_ok=True)
     # Strip data URI prefix
     if "," in data_uri:
         b64_data = data_uri.split(",", 1)[1]
     else:
         b64_data = data_uri
-    path.write_bytes(base64.b64decode(b64_data))
+    save_bytes(path, base64.b64decode(b64_data))
     logger.debug("Saved image: %s", path)
     return path
 
 
-def save_member_concept_image(group_name: str, member: dict, data_uri: str) -> Path:
-    """Save member concept image."""
+def _handle_for(blob: Path) -> str:
+    path = ASSETS_ROOT / "images" / blob.name
+    if not path.exists():
+        link_file(blob, path)
+    return f"/api/assets/images/{blob.name}"
+
+
+def save_image(image: str) -> str:
+    """Store an image once and return its handle: /api/assets/images/{sha256}.png.
+
+    Images travel through sessions, checkpoints, timelines and API responses as
+    handles; image_data_uri() turns one back into bytes for a provider. Accepts a
+    data URI or raw base64; handles and other /api/assets/ URLs are returned as is.
+    """
+    if local_path_for_url(image):
+        return image
+    b64_data = image.split(",", 1)[1] if "," in image else image
+    return _handle_for(store_blob(base64.b64decode(b64_data), ".png"))
+
+
+def image_handle(path: Path) -> str | None:
+    """Handle for an image file already on disk, or None if it's missing."""
+    try:
+        return _handle_for(store_blob(path.read_bytes(), ".png"))
+    except OSError as e:
+        logger.warning("Failed to load image %s: %s", path, e)
+        return None
+
+
+def image_data_uri(image: str | None) -> str | None:
+    """Inline an image for a provider that needs the bytes (gateway, fal).
+
+    Handles / asset URLs are read from disk; data URIs and remote URLs pass
+    through, raw base64 gets a data URI prefix.
+    """
+    if not image or image.startswith(("data:", "http://", "https://")):
+        return image
+    if image.startswith("/api/assets/"):
+        path = local_path_for_url(image)
+        if path is None:
+            logger.warning("Image handle not found: %s", image)
+            return None
+        return f"data:image/png;base64,{base64.b64encode(path.read_bytes()).decode()}"
+    return f"data:image/png;base64,{image}"
+
+
+def _save_image_at(path: Path, image: str) -> Path:
+    local = local_path_for_url(image)
+    if local:
+        return link_file(local, path)
+    return save_base64_image(path, image)
+
+
+def save_member_concept_image(group_name: str, member: dict, image: str) -> Path:
+    """Save member concept image (handle or data URI)."""
     member_dir = get_member_dir(
         group_name, member.get("member_id", "m0"), member.get("stage_name", "unknown")
     )
-    return save_base64_image(member_dir / "concept.png", data_uri)
+    return _save_image_at(member_dir / "concept.png", image)
 
 
-def save_scene_first_frame(group_name: str, scene_number: int, data_uri: str) -> Path:
-    """Save scene first frame image."""
+def save_scene_first_frame(group_name: str, scene_number: int, image: str) -> Path:
+    """Save scene first frame image (handle or data URI)."""
     scene_dir = get_scene_dir(group_name, scene_number)
-    return save_base64_image(scene_dir / "first_frame.png", data_uri)
+    return _save_image_at(scene_dir / "first_frame.png", image)
 
 
-def save_scene_last_frame(group_name: str, scene_number: int, data_uri: str) -> Path:
-    """Save scene last frame image."""
+def save_scene_last_frame(group_name: str, scene_number: int, image: str) -> Path:
+    """Save scene last frame image (handle or data URI)."""
     scene_dir = get_scene_dir(group_name, scene_number)
-    return save_base64_image(scene_dir / "last_frame.png", data_uri)
+    return _save_image_at(scene_dir / "last_frame.png", image)
+
+
+def relative_asset_path(path: Path) -> str:
+    """Path relative to ASSETS_ROOT (stable across restarts / checkouts)."""
+    return str(path.relative_to(ASSETS_ROOT))
+
+
+def local_path_for_url(url: str) -> Path | None:
+    """The file behind an /api/assets/ URL (e.g. a cached clip), or None."""
+    if not url.startswith("/api/assets/"):
+        return None
+    root = ASSETS_ROOT.resolve()
+    path = (root / url[len("/api/assets/"):]).resolve()
+    if root not in path.parents or not path.is_file():
+        return None
+    return path
 
 
 async def download_and_save(url: str, path: Path) -> Path | None:
-    """Download a file from URL and save locally."""
+    """Download a file from URL and save locally.
+
+    Goes through the URL-keyed local media cache (fetch_media): files already on
+    disk are linked instead of fetched again, and concurrent saves of the same
+    URL — e.g. save_scene_video and the renderer — share one download.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
     try:
-        client = _get_dl_client()
-        resp = await client.get(url)
-        resp.raise_for_status()
-        path.write_bytes(resp.content)
-        logger.info("Downloaded: %s → %s", url, path)
+        local = local_path_for_url(url) or await fetch_media(url, path.suffix)
+        await asyncio.to_thread(link_file, local, path)
+        logger.info("Saved: %s → %s", url[:80], path)
         return path
     except Exception as e:
         logger.error("Download failed (%s): %s", url, e)
         return None
 
 
+async def fetch_media(url: str, suffix: str = "") -> Path:
+    """Local blob for a remote media URL, downloading it at most once.
+
+    URLs this process already fetched are served from disk; a request for a
+    URL that is still downloading waits for that download (single-flight).
+    """
+    entry = _url_blobs.get(url)
+    if entry is not None and entry[0].exists():
+        _remember_blob(url, entry[0])
+        return entry[0]
+    task = _inflight.get(url)
+    if task is None:
+        task = _inflight[url] = asyncio.create_task(_download_blob(url, suffix))
+        task.add_done_callback(lambda t: _download_done(url, t))
+    else:
+        logger.info("Joining in-flight download: %s", url[:80])
+    # One waiter being cancelled mustn't cancel the download for the others
+    return await asyncio.shield(task)
+
+
+def _remember_blob(url: str, blob: Path) -> None:
+    _url_blobs[url] = (blob, time.time())
+    _url_blobs.move_to_end(url)
+    while len(_url_blobs) > _URL_BLOBS_MAX:
+        _url_blobs.popitem(last=False)
+
+
+def _download_done(url: str, task: asyncio.Task) -> None:
+    _inflight.pop(url, None)
+    if not task.cancelled():
+        task.exception()  # retrieved here even if every waiter was cancelled
+
+
+async def _download_blob(url: str, suffix: str) -> Path:
+    blobs_dir = ASSETS_ROOT / "blobs"
+    blobs_dir.mkdir(parents=True, exist_ok=True)
+    tmp = blobs_dir / f".{uuid.uuid4().hex}.tmp"
+    try:
+        with tracing.span("download", cat="io", url=url[:200]) as span:
+            digest, size = await _stream_to_file(url, tmp)
+            blob = await asyncio.to_thread(_adopt_blob, tmp, digest, suffix)
+            if span:
+                span.args["bytes"] = size
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _remember_blob(url, blob)
+    logger.info("Downloaded: %s (%.1f MB)", url[:80], size / 1e6)
+    return blob
+
+
+def _write_chunk(f, digest, chunk: bytes) -> None:
+    f.write(chunk)
+    digest.update(chunk)
+
+
+def _total_size(resp: httpx.Response) -> int | None:
+    """Full size of the resource from Content-Range (206) or Content-Length (200)."""
+    if resp.headers.get("content-encoding", "identity") != "identity":
+        return None  # the length is of the encoded body
+    if resp.status_code == 206:
+        total = resp.headers.get("content-range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = resp.headers.get("content-length", "")
+    return int(length) if length.isdigit() else None
+
+
+async def _stream_to_file(url: str, tmp: Path) -> tuple[str, int]:
+    """Stream a URL into `tmp` in chunks, writing off the event loop.
+
+    A dropped connection is resumed with an HTTP Range request from the bytes
+    already written (restarting if the server ignores the range), and the
+    result is checked against the advertised size. Returns (sha256, size).
+    """
+    client = _get_dl_client()
+    digest = hashlib.sha256()
+    received, total = 0, None
+    f = await asyncio.to_thread(open, tmp, "wb")
+    try:
+        for attempt in range(_DL_ATTEMPTS):
+            # identity: Range offsets and Content-Length must refer to the bytes we write
+            headers = {"Accept-Encoding": "identity"}
+            if received:
+                headers["Range"] = f"bytes={received}-"
+            try:
+                async with client.stream("GET", url, headers=headers) as resp:
+                    resp.raise_for_status()
+                    if received and resp.status_code != 206:
+                        logger.warning("Range not honoured (%s), restarting download", url[:80])
+                        await asyncio.to_thread(f.seek, 0)
+                        await asyncio.to_thread(f.truncate)
+                        digest, received = hashlib.sha256(), 0
+                    total = _total_size(resp) or total
+                    async for chunk in resp.aiter_bytes(_DL_CHUNK):
+                        await asyncio.to_thread(_write_chunk, f, digest, chunk)
+                        received += len(chunk)
+                break
+            except httpx.TransportError as e:
+                if attempt + 1 == _DL_ATTEMPTS:
+                    raise
+                logger.warning("Download dropped at %d bytes (%s), resuming: %s", received, url[:80], e)
+                await asyncio.sleep(0.5 * (attempt + 1))
+    finally:
+        await asyncio.to_thread(f.close)
+    if total is not None and received != total:
+        raise IOError(f"incomplete download: {received} of {total} bytes")
+    return digest.hexdigest(), received
+
+
 async def save_scene_video(group_name: str, scene_number: int, video_url: str) -> Path | None:
     """Download and save scene video clip."""
     scene_dir = get_scene_dir(group_name, scene_number)
@@ -0,0 +1,131 @@
+"""Checkpoint manifest for the teaser pipeline.
+
+Stored as assets/{group}/checkpoint.json next to the files asset_store already
+writes. Each DirectorAgent stage records its state there:
+
+  {
+    "session_id": "...",
+    "unit_name": "...",
+    "stages": {
+      "scenario":   {"status": "done", "result": {...}},
+      "bgm":        {"status": "submitted", "task_id": "..."},
+      "keyframe_0": {"status": "done", "result": "/api/assets/images/{sha256}.png",
+                     "path": "Group/scenes/scene_1/first_frame.png"},
+      "video_0":    {"status": "submitted", "request_id": "..."},
+      "video_1":    {"refresh": true},
+      "render":     {"status": "done", "result": {...}}
+    }
+  }
+
+On resume, "done" stages are skipped and "submitted" stages reattach to the
+provider job (Suno task / fal request) instead of paying for a new one.
+Stages invalidated with refresh=True (scene regeneration) must not be served
+from the media cache; the flag stays until the stage is done again.
+"""
+
+import logging
+import time
+
+from src.services import asset_store
+
+logger = logging.getLogger(__name__)
+
+STATUS_SUBMITTED = "submitted"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class TeaserCheckpoint:
+    """Per-production checkpoint manifest, persisted on every update."""
+
+    def __init__(self, unit_name: str, session_id: str, data: dict | None = None):
+        self.unit_name = unit_name
+        self.session_id = session_id
+        self.data = data or {
+            "session_id": session_id,
+            "unit_name": unit_name,
+            "created_at": time.time(),
+            "stages": {},
+        }
+
+    @classmethod
+    def start(cls, unit_name: str, session_id: str) -> "TeaserCheckpoint":
+        """Begin a fresh manifest, replacing any previous run for this group."""
+        checkpoint = cls(unit_name, session_id)
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def find(cls, session_id: str) -> "TeaserCheckpoint | None":
+        """Load the manifest recorded for a session, if any."""
+        data = asset_store.find_checkpoint(session_id)
+        if not data:
+            return None
+        data.setdefault("stages", {})
+        return cls(data.get("unit_name", ""), session_id, data)
+
+    @property
+    def stages(self) -> dict:
+        return self.data["stages"]
+
+    def stage(self, name: str) -> dict:
+        return self.stages.get(name, {})
+
+    def is_done(self, name: str) -> bool:
+        return self.stage(name).get("status") == STATUS_DONE
+
+    def result(self, name: str):
+        return self.stage(name).get("result")
+
+    def needs_refresh(self, name: str) -> bool:
+        """Whether the stage was invalidated for a new take (bypass the media cache)."""
+        return bool(self.stage(name).get("refresh"))
+
+    def provider_id(self, name: str, key: str) -> str | None:
+        """Provider job ID for a stage that was submitted but not finished."""
+        stage = self.stage(name)
+        if stage.get("status") != STATUS_SUBMITTED:
+            return None
+        return stage.get(key)
+
+    def mark_submitted(self, name: str, **ids) -> None:
+        self._set(name, {"status": STATUS_SUBMITTED, **ids})
+
+    def mark_done(self, name: str, result=None, **extra) -> None:
+        entry = {"status": STATUS_DONE, **extra}
+        if result is not None:
+            entry["result"] = result
+        self._set(name, entry)
+
+    def mark_failed(self, name: str, error: str = "") -> None:
+        self._set(name, {"status": STATUS_FAILED, "error": error})
+
+    def invalidate(self, *names: str, refresh: bool = False) -> None:
+        """Forget stages so the next run recomputes them.
+
+        refresh=True asks for a new take rather than the same result again (see
+        needs_refresh) — the request may be identical to the one being replaced.
+        """
+        for name in names:
+            if refresh:
+                self.stages[name] = {"refresh": True, "updated_at": time.time()}
+            else:
+                self.stages.pop(name, None)
+        self.save()
+
+    def completed_stages(self) -> list[str]:
+        return [name for name, st in self.stages.items() if st.get("status") == STATUS_DONE]
+
+    def _set(self, name: str, entry: dict) -> None:
+        if entry["status"] != STATUS_DONE and self.needs_refresh(name):
+            entry["refresh"] = True  # a retry after a failure / restart still wants a new take
+        entry["updated_at"] = time.time()
+        self.stages[name] = entry
+        self.save()
+
+    def save(self) -> None:
+        try:
+            asset_store.save_checkpoint(self.unit_name, self.data)
+        except OSError as e:
+            # Checkpointing is best-effort; never fail the production over it
+            logger.warning("[checkpoint] save failed for '%s': %s", self.unit_name, e)
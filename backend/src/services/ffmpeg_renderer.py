@@ -1,11 +1,17 @@
-"""FFmpeg video renderer — concatenates scene clips and mixes BGM into final MV teaser."""
+"""FFmpeg video renderer — concatenates scene clips and mixes BGM into final MV teaser.
+
+ProgressiveConcat assembles the clips as Veo delivers them, so the render at
+the end of the pipeline is usually just the BGM mux.
+"""
 
 import asyncio
+import json
 import logging
 import time
 from pathlib import Path
 
-import httpx
+from src.services import asset_store, render_pool, tracing
+from src.services.metrics import FFMPEG_RENDER, FFMPEG_STEP
 
 logger = logging.getLogger(__name__)
 
@@ -13,36 +19,23 @@ ASSETS_ROOT = Path(__file__).parent.parent.parent / "assets"
 
 
 async def _download(url: str, dest: Path) -> bool:
-    """Download a remote URL to a local file."""
-    try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            r = await client.get(url)
-            r.raise_for_status()
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            dest.write_bytes(r.content)
-            logger.info("[ffmpeg] downloaded %s → %s (%.1fMB)", url[:80], dest, len(r.content) / 1e6)
-            return True
-    except Exception as e:
-        logger.error("[ffmpeg] download failed %s: %s", url[:80], e)
-        return False
+    """Fetch a clip / the BGM into the work dir via asset_store's local media cache.
 
+    A clip or BGM that save_scene_video / save_bgm already fetched is linked from
+    disk; one they are still fetching is awaited rather than downloaded again.
+    """
+    return await asset_store.download_and_save(url, dest) is not None
 
-async def render_teaser(
-    timeline: dict,
-    output_path: str,
-    group_name: str = "",
-) -> str | None:
-    """Concatenate scene video clips + mix BGM using ffmpeg.
 
-    1. Download all video clips to temp dir
-    2. Create ffmpeg concat demuxer file
-    3. Concatenate clips
-    4. If BGM exists, mix audio
-    5. Return local URL
-    """
-    t0 = time.time()
+def _work_dir(group_name: str) -> Path:
+    safe_name = "".join(c if c.isalnum() or c in "-_ " else "" for c in group_name).strip().replace(" ", "_")
+    work_dir = ASSETS_ROOT / safe_name / "final"
+    work_dir.mkdir(parents=True, exist_ok=True)
+    return work_dir
 
-    # Extract video URLs and BGM URL from timeline
+
+def _timeline_media(timeline: dict) -> tuple[list[str], str | None]:
+    """(video clip URLs in timeline order, BGM URL) of a timeline."""
     video_urls = []
     bgm_url = None
     for clip in timeline.get("clips", []):
@@ -50,6 +43,220 @@ async def render_teaser(
             video_urls.append(clip["data"]["src"])
         elif clip.get("type") == "audio":
             bgm_url = clip["data"]["src"]
+    return video_urls, bgm_url
+
+
+class ProgressiveConcat:
+    """Builds a teaser's video track while Veo is still generating clips.
+
+    Each clip is fetched and probed as soon as it lands (add), and clips are
+    appended in scene order to one growing final/segment.mp4 by stream copy. A
+    clip whose format differs from the first one is re-encoded to match before
+    it is appended, so the segment always stays copy-concatenable. When the
+    last clip is in, render_teaser(assembler=...) only muxes the BGM onto it;
+    if the segment doesn't match the timeline (or any step failed) it falls
+    back to the full render.
+    """
+
+    def __init__(self, group_name: str):
+        self.group_name = group_name
+        self.work_dir = _work_dir(group_name)
+        self.segment = self.work_dir / "segment.mp4"
+        # scene index → (url, local path, probe), or None for a scene without a clip
+        self._clips: dict[int, tuple[str, Path, dict] | None] = {}
+        self._next = 0  # scenes [0, _next) are in the segment
+        self._urls: list[str] = []
+        self._format: tuple | None = None
+        self._duration = 0.0
+        self._broken = False
+        self._lock = asyncio.Lock()
+
+    async def add(self, index: int, url: str | None) -> bool:
+        """Take scene `index`'s clip (None: the scene has none) and append what is now contiguous.
+
+        Returns False once the segment is unusable (the full render takes over).
+        """
+        entry = None
+        if url and not self._broken:
+            path = self.work_dir / f"clip_{index}.mp4"
+            probe = await _probe(path) if await _download(url, path) else None
+            if probe is None:
+                logger.warning("[ffmpeg] progressive: clip %d unavailable, falling back to full render", index + 1)
+                self._broken = True
+            entry = (url, path, probe)
+        self._clips[index] = entry
+
+        async with self._lock:
+            while not self._broken and self._next in self._clips:
+                entry = self._clips[self._next]
+                self._next += 1
+                if entry:
+                    await self._append(*entry)
+        return not self._broken
+
+    async def _append(self, url: str, path: Path, probe: dict) -> None:
+        t0 = time.time()
+        try:
+            if self._format is None:
+                # The first clip is the segment; its format is the one the rest must match
+                self._format = probe["format"]
+                asset_store.link_file(path, self.segment)
+            elif probe["format"] != self._format:
+                normalised = await self._normalise(path)
+                try:
+                    await self._concat(normalised)
+                finally:
+                    normalised.unlink(missing_ok=True)  # its frames now live in the segment
+            else:
+                await self._concat(path)
+        except Exception as e:
+            logger.warning("[ffmpeg] progressive: appending %s failed (%s: %s)", path.name, type(e).__name__, e)
+            self._broken = True
+            return
+        self._urls.append(url)
+        self._duration += probe["duration"]
+        logger.info(
+            "[ffmpeg] progressive: +%s → %d clips, %.1fs (%.1fs)",
+            path.name, len(self._urls), self._duration, time.time() - t0,
+        )
+
+    async def _normalise(self, path: Path) -> Path:
+        """Re-encode a clip to the segment's video format."""
+        codec, width, height, pix_fmt, rate = self._format
+        if codec != "h264":
+            raise RuntimeError(f"cannot re-encode to {codec}")
+        output = path.with_name(f"{path.stem}.norm.mp4")
+        cmd = [
+            "ffmpeg", "-y", "-i", str(path),
+            "-vf", f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                   f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={rate}",
+            "-pix_fmt", pix_fmt, "-c:v", "libx264", "-preset", "fast", "-c:a", "aac", str(output),
+        ]
+        try:
+            returncode, stderr = await _run_ffmpeg(cmd, step="normalise", timeout=300, clip=path.name)
+            if returncode != 0:
+                raise RuntimeError(stderr[-500:])
+        except BaseException:
+            output.unlink(missing_ok=True)
+            raise
+        return output
+
+    async def _concat(self, path: Path) -> None:
+        """segment + clip → segment (stream copy, written beside it and renamed into place)."""
+        concat_file = self.work_dir / "segment.txt"
+        concat_file.write_text(f"file '{self.segment.name}'\nfile '{path.name}'")
+        appending = self.work_dir / ".segment.appending.mp4"
+        cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_file),
+               "-map", "0", "-c", "copy", str(appending)]
+        try:
+            returncode, stderr = await _run_ffmpeg(cmd, step="append", timeout=120, clips=len(self._urls) + 1)
+            if returncode != 0:
+                raise RuntimeError(stderr[-500:])
+            appending.replace(self.segment)
+        finally:
+            appending.unlink(missing_ok=True)
+
+    async def finish(self, video_urls: list[str], bgm_url: str | None, output_path: str) -> str | None:
+        """Mux the BGM onto the finished segment, if it holds exactly `video_urls`.
+
+        The segment and any leftover intermediates are removed afterwards either
+        way (a fallback full render works from the clips).
+        """
+        try:
+            return await self._finish(video_urls, bgm_url, output_path)
+        finally:
+            self._cleanup()
+
+    def _cleanup(self) -> None:
+        for path in (self.segment, self.work_dir / "segment.txt", self.work_dir / "mux.txt",
+                     *self.work_dir.glob("*.norm.mp4")):
+            path.unlink(missing_ok=True)
+
+    async def _finish(self, video_urls: list[str], bgm_url: str | None, output_path: str) -> str | None:
+        async with self._lock:
+            if self._broken or self._urls != video_urls:
+                if not self._broken:
+                    logger.info(
+                        "[ffmpeg] progressive: segment has %d/%d timeline clips, full render",
+                        len(self._urls), len(video_urls),
+                    )
+                return None
+            t0 = time.time()
+            bgm_path = self.work_dir / "bgm.mp3"
+            has_bgm = bool(bgm_url) and await _download(bgm_url, bgm_path)
+
+            concat_file = self.work_dir / "mux.txt"
+            concat_file.write_text(f"file '{self.segment.name}'")
+            final_output = Path(output_path)
+            final_output.parent.mkdir(parents=True, exist_ok=True)
+            rendering = final_output.with_name(f".{final_output.stem}.rendering{final_output.suffix}")
+            cmd = _render_cmd(concat_file, bgm_path if has_bgm else None, self._duration, rendering, copy=True)
+            try:
+                returncode, stderr = await _run_ffmpeg(
+                    cmd, step="mux", timeout=120, clips=len(self._urls), bgm=has_bgm,
+                )
+                if returncode != 0:
+                    logger.warning("[ffmpeg] progressive: BGM mux failed: %s", stderr[-500:])
+                    return None
+                rendering.replace(final_output)
+            except (OSError, asyncio.TimeoutError) as e:
+                logger.warning("[ffmpeg] progressive: BGM mux failed (%s: %s)", type(e).__name__, e)
+                return None
+            finally:
+                rendering.unlink(missing_ok=True)
+
+        logger.info(
+            "[ffmpeg] === RENDER COMPLETE (progressive) === (%.1fs mux) file=%s clips=%d bgm=%s",
+            time.time() - t0, final_output, len(self._urls), has_bgm,
+        )
+        return _local_path_to_url(str(final_output))
+
+
+async def render_teaser(
+    timeline: dict,
+    output_path: str,
+    group_name: str = "",
+    assembler: ProgressiveConcat | None = None,
+) -> str | None:
+    """Render the teaser, recording its duration by outcome.
+
+    With an assembler that already holds every timeline clip only the BGM mux is
+    left; otherwise (or if that fails) the full render runs (see _render_teaser).
+    """
+    t0 = time.time()
+    outcome = "error"
+    try:
+        url = None
+        if assembler is not None:
+            video_urls, bgm_url = _timeline_media(timeline)
+            url = await assembler.finish(video_urls, bgm_url, output_path)
+        if url is None:
+            url = await _render_teaser(timeline, output_path, group_name)
+        outcome = "ok" if url else "failed"
+        return url
+    finally:
+        FFMPEG_RENDER.observe(time.time() - t0, outcome=outcome)
+
+
+async def _render_teaser(
+    timeline: dict,
+    output_path: str,
+    group_name: str,
+) -> str | None:
+    """Concatenate scene video clips + mux BGM in a single ffmpeg pass.
+
+    1. Fetch all clips + BGM into the work dir (linked from the local media cache)
+    2. Probe the clips: stream copy if they share one video format, else re-encode
+    3. One ffmpeg run: concat demuxer → BGM trimmed to the video length → teaser
+       (no intermediate files; written beside the target and renamed into place)
+    4. Return local URL
+
+    Only on failure (or timeout) is ffmpeg run again: re-encode instead of copy,
+    then without BGM.
+    """
+    t0 = time.time()
+
+    video_urls, bgm_url = _timeline_media(timeline)
 
     if not video_urls:
         logger.error("[ffmpeg] No video clips to concatenate")
@@ -60,10 +267,7 @@ async def render_teaser(
         group_name, len(video_urls), bool(bgm_url), output_path,
     )
 
-    # Prepare work directory
-    safe_name = "".join(c if c.isalnum() or c in "-_ " else "" for c in group_name).strip().replace(" ", "_")
-    work_dir = ASSETS_ROOT / safe_name / "final"
-    work_dir.mkdir(parents=True, exist_ok=True)
+    work_dir = _work_dir(group_name)
 
     # Step 1: Download all clips
     clip_paths = []
@@ -95,103 +299,113 @@ async def render_teaser(
 
     logger.info("[ffmpeg] Downloaded %d/%d clips, bgm=%s", len(valid_clips), len(video_urls), has_bgm)
 
-    # Step 2: Create concat list file
+    # Step 2: Render plan — Veo clips normally share one format, so concat is a stream copy
+    probes = await asyncio.gather(*(_probe(p) for p in valid_clips))
+    copy = all(probes) and len({p["format"] for p in probes}) == 1
+    duration = sum(p["duration"] for p in probes) if all(probes) else None
+    logger.info("[ffmpeg] Plan: %s, duration=%s", "stream copy" if copy else "re-encode", duration)
+
     concat_file = work_dir / "concat.txt"
-    concat_content = "\n".join(f"file '{p.name}'" for p in valid_clips)
-    concat_file.write_text(concat_content)
+    concat_file.write_text("\n".join(f"file '{p.name}'" for p in valid_clips))
+
+    final_output = Path(output_path)
+    final_output.parent.mkdir(parents=True, exist_ok=True)
+    rendering = final_output.with_name(f".{final_output.stem}.rendering{final_output.suffix}")
+
+    attempts = [(copy, has_bgm)]
+    if copy:
+        attempts.append((False, has_bgm))
+    if has_bgm:
+        attempts.append((False, False))
 
-    # Step 3: Concatenate clips
-    concat_output = work_dir / "concat.mp4"
+    # Step 3: One ffmpeg pass (fallbacks only if it fails)
     try:
-        if len(valid_clips) == 1:
-            # Single clip — just copy
-            import shutil
-            shutil.copy2(valid_clips[0], concat_output)
-            logger.info("[ffmpeg] Single clip, copied directly")
-        else:
-            cmd = [
-                "ffmpeg", "-y",
-                "-f", "concat", "-safe", "0",
-                "-i", str(concat_file),
-                "-c", "copy",
-                str(concat_output),
-            ]
-            logger.info("[ffmpeg] Concat CMD: %s", " ".join(cmd))
-            proc = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=120)
-            if proc.returncode != 0:
-                logger.error("[ffmpeg] Concat failed: %s", stderr.decode()[-500:])
-                # Try re-encoding instead of stream copy
-                cmd_reencode = [
-                    "ffmpeg", "-y",
-                    "-f", "concat", "-safe", "0",
-                    "-i", str(concat_file),
-                    "-c:v", "libx264", "-preset", "fast",
-                    "-c:a", "aac",
-                    str(concat_output),
-                ]
-                logger.info("[ffmpeg] Retrying with re-encode...")
-                proc2 = await asyncio.create_subprocess_exec(
-                    *cmd_reencode,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
+        for stream_copy, with_bgm in attempts:
+            cmd = _render_cmd(concat_file, bgm_path if with_bgm else None, duration, rendering, stream_copy)
+            try:
+                returncode, stderr = await _run_ffmpeg(
+                    cmd, step="render_copy" if stream_copy else "render_reencode",
+                    timeout=120 if stream_copy else 300, clips=len(valid_clips), bgm=with_bgm,
                 )
-                stdout2, stderr2 = await asyncio.wait_for(proc2.communicate(), timeout=300)
-                if proc2.returncode != 0:
-                    logger.error("[ffmpeg] Re-encode concat also failed: %s", stderr2.decode()[-500:])
-                    return None
-
-        # Step 4: Mix BGM if available
-        final_output = Path(output_path)
-        final_output.parent.mkdir(parents=True, exist_ok=True)
-
-        if has_bgm:
-            cmd_mix = [
-                "ffmpeg", "-y",
-                "-i", str(concat_output),
-                "-i", str(bgm_path),
-                "-c:v", "copy",
-                "-c:a", "aac",
-                "-map", "0:v:0",
-                "-map", "1:a:0",
-                "-shortest",
-                str(final_output),
-            ]
-            logger.info("[ffmpeg] Mix BGM CMD: %s", " ".join(cmd_mix))
-            proc = await asyncio.create_subprocess_exec(
-                *cmd_mix,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+            except asyncio.TimeoutError:
+                returncode, stderr = None, "timed out"
+            if returncode == 0:
+                break
+            logger.warning(
+                "[ffmpeg] Render (%s, bgm=%s) failed: %s",
+                "copy" if stream_copy else "re-encode", with_bgm, stderr[-500:],
             )
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=120)
-            if proc.returncode != 0:
-                logger.warning("[ffmpeg] BGM mix failed, using video without BGM: %s", stderr.decode()[-300:])
-                import shutil
-                shutil.copy2(concat_output, final_output)
         else:
-            import shutil
-            shutil.copy2(concat_output, final_output)
+            logger.error("[ffmpeg] All render attempts failed")
+            return None
 
+        rendering.replace(final_output)
         elapsed = time.time() - t0
-        file_size = final_output.stat().st_size if final_output.exists() else 0
+        file_size = final_output.stat().st_size
         logger.info(
             "[ffmpeg] === RENDER COMPLETE === (%.1fs) file=%s size=%.1fMB clips=%d bgm=%s",
-            elapsed, final_output, file_size / (1024 * 1024), len(valid_clips), has_bgm,
+            elapsed, final_output, file_size / (1024 * 1024), len(valid_clips), with_bgm,
         )
 
         return _local_path_to_url(str(final_output))
 
-    except asyncio.TimeoutError:
-        logger.error("[ffmpeg] === RENDER TIMEOUT ===")
-        return None
     except Exception as e:
         elapsed = time.time() - t0
         logger.error("[ffmpeg] === RENDER ERROR === (%.1fs) %s: %s", elapsed, type(e).__name__, e)
         return None
+    finally:
+        rendering.unlink(missing_ok=True)
+
+
+def _render_cmd(concat_file: Path, bgm: Path | None, duration: float | None, output: Path, copy: bool) -> list[str]:
+    """concat demuxer (+ BGM cut to the video length) → output, in one ffmpeg process."""
+    cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_file)]
+    if bgm:
+        if duration:
+            cmd += ["-t", f"{duration:.3f}"]  # input option: read only as much BGM as needed
+        cmd += ["-i", str(bgm), "-map", "0:v:0", "-map", "1:a:0"]
+    else:
+        cmd += ["-map", "0:v:0", "-map", "0:a?"]
+    cmd += ["-c:v", "copy"] if copy else ["-c:v", "libx264", "-preset", "fast"]
+    if bgm:
+        cmd += ["-c:a", "aac", "-shortest"]
+    else:
+        cmd += ["-c:a", "copy" if copy else "aac"]
+    return cmd + [str(output)]
+
+
+async def _probe(path: Path) -> dict | None:
+    """Video stream format (codec, size, pixel format, frame rate) and duration of a clip."""
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=codec_name,width,height,pix_fmt,r_frame_rate:format=duration",
+        "-of", "json", str(path),
+    ]
+    try:
+        _, stdout, _ = await render_pool.run(cmd, timeout=30)  # cheap: no render slot
+        info = json.loads(stdout)
+        stream = info["streams"][0]
+        return {
+            "format": tuple(stream.get(k) for k in ("codec_name", "width", "height", "pix_fmt", "r_frame_rate")),
+            "duration": float(info["format"]["duration"]),
+        }
+    except (OSError, ValueError, KeyError, IndexError, asyncio.TimeoutError) as e:
+        logger.warning("[ffmpeg] probe failed for %s: %s", path.name, e)
+        return None
+
+
+async def _run_ffmpeg(cmd: list[str], step: str, timeout: float, **span_args) -> tuple[int, str]:
+    """Run one ffmpeg command in a render pool slot; returns (returncode, stderr).
+
+    The timeout covers the run, not the wait for a slot; on timeout ffmpeg is
+    killed and asyncio.TimeoutError raised.
+    """
+    async with render_pool.slot("ffmpeg") as threads:
+        cmd = [*cmd[:-1], "-threads", str(threads), cmd[-1]]  # output option, before the output path
+        logger.info("[ffmpeg] %s CMD: %s", step, " ".join(cmd))
+        with tracing.span(f"ffmpeg.{step}", cat="ffmpeg", **span_args), FFMPEG_STEP.time(step=step):
+            returncode, _, stderr = await render_pool.run(cmd, timeout=timeout)
+    return returncode, stderr.decode(errors="replace")
 
 
 def _local_path_to_url(local_path: str) -> str:
@@ -206,9 +420,4 @@ def _local_path_to_url(local_path: str) -> str:
 
 def get_output_path(group_name: str) -> str:
     """Get the output path for a group's final teaser."""
-    safe_name = "".join(
-        c if c.isalnum() or c in "-_ " else "" for c in group_name
-    ).strip().replace(" ", "_")
-    out_dir = ASSETS_ROOT / safe_name / "final"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    return str(out_dir / "teaser.mp4")
+    return str(_work_dir(group_name) / "teaser.mp4")
@@ -2,12 +2,17 @@
 Handles image generation (NanoBanana2) and image editing.
 Reference: letsur-dev/media-generator-hub patterns.
 
-Shares the singleton AsyncOpenAI client from llm_client.py.
+Shares the singleton AsyncOpenAI client (and its concurrency limiter) from llm_client.py.
+Images come in and go out as asset_store handles; they are inlined as data URIs
+only in the gateway request itself, downscaled and recompressed by image_prep.
 """
+import asyncio
 import logging
 import base64
 
-from src.services.llm_client import get_llm_client
+from src.services import asset_store, image_prep, media_cache
+from src.services.llm_client import chat_completion
+from src.services.hedging import HedgeBudget, hedged_call
 from src.config import settings
 
 logger = logging.getLogger(__name__)
@@ -85,6 +90,12 @@ def _extract_image_from_response(response) -> str | None:
         return None
 
 
+def _image_handle(response) -> str | None:
+    """Extract the image and store it; callers get a handle, not the base64 payload."""
+    data_uri = _extract_image_from_response(response)
+    return asset_store.save_image(data_uri) if data_uri else None
+
+
 # --- Image generation ---
 
 def _build_image_prompt(visual_description: str, unit_name: str, concept: str) -> str:
@@ -104,58 +115,80 @@ async def generate_image(
     unit_name: str,
     concept: str,
     reference_image_b64: str | None = None,
+    hedge_budget: HedgeBudget | None = None,
+    cache: bool = False,
 ) -> str | None:
     """Generate character image using NanoBanana2 (gemini-3-pro-image-preview).
 
     Args:
-        reference_image_b64: Optional profile image (data URI) to maintain character identity.
+        reference_image_b64: Optional profile image (handle or data URI) to maintain character identity.
             When provided, the model receives the reference image so the generated scene
             features the same character.
+        hedge_budget: Stage-wide hedge cap. When given (and HEDGE_ENABLED), a duplicate
+            request is sent if this one runs past the observed latency percentile and
+            the slower one is dropped.
+        cache: Reuse the image from an identical earlier request (same model, prompt
+            and reference image) via media_cache, and store new results there.
 
-    Returns base64 data URL or None on failure.
+    Returns an image handle (/api/assets/images/...) or None on failure.
     """
     prompt = _build_image_prompt(visual_description, unit_name, concept)
 
-    try:
-        if reference_image_b64:
-            # With reference image: send text + image so the model maintains character identity
-            img_url = reference_image_b64 if reference_image_b64.startswith("data:") else f"data:image/png;base64,{reference_image_b64}"
-            messages = [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": (
-                                f"Here is the reference photo of this K-pop idol character. "
-                                f"Generate a NEW scene image featuring this SAME character "
-                                f"(same face, same identity, same hair) but in a different pose and setting.\n\n"
-                                f"{prompt}"
-                            ),
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": img_url},
-                        },
-                    ],
-                }
-            ]
-        else:
-            # Without reference image: text-only prompt
-            messages = [
-                {"role": "system", "content": IMAGE_SYSTEM_PROMPT},
-                {"role": "user", "content": prompt},
-            ]
-
-        response = await get_llm_client().chat.completions.create(
-            model=settings.IMAGE_MODEL,
-            messages=messages,
-        )
+    if reference_image_b64:
+        # With reference image: send text + image so the model maintains character identity.
+        # Handles are content-addressed, so the cache key is taken before inlining the bytes.
+        img_url = reference_image_b64
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": (
+                            f"Here is the reference photo of this K-pop idol character. "
+                            f"Generate a NEW scene image featuring this SAME character "
+                            f"(same face, same identity, same hair) but in a different pose and setting.\n\n"
+                            f"{prompt}"
+                        ),
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": img_url},
+                    },
+                ],
+            }
+        ]
+    else:
+        # Without reference image: text-only prompt
+        messages = [
+            {"role": "system", "content": IMAGE_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+    key = media_cache.media_key(settings.IMAGE_MODEL, messages) if cache else None
+    if key:
+        cached = media_cache.get("image", key)
+        if cached:
+            return cached
+    if reference_image_b64:
+        messages[0]["content"][1]["image_url"]["url"] = await image_prep.reference_data_uri(reference_image_b64)
+
+    async def attempt(n: int) -> str | None:
+        try:
+            response = await chat_completion(
+                model=settings.IMAGE_MODEL,
+                messages=messages,
+            )
+            return _image_handle(response)
+        except Exception as e:
+            logger.error("Image generation failed: %s", e)
+            return None
 
-        return _extract_image_from_response(response)
-    except Exception as e:
-        logger.error("Image generation failed: %s", e)
-        return None
+    # The gateway has no cancel endpoint; dropping the losing task closes its connection
+    url = await hedged_call("image", attempt, budget=hedge_budget, label=unit_name)
+    if key and url:
+        media_cache.put("image", key, url)
+    return url
 
 
 async def generate_group_image(
@@ -171,13 +204,13 @@ async def generate_group_image(
     with all members together.
 
     Args:
-        member_images: List of member image data URIs (data:image/png;base64,...)
+        member_images: List of member image handles or data URIs
         unit_name: Group name
         concepts: Concept keywords
         art_style: "realistic" or "virtual"
         group_type: "girl" or "boy"
 
-    Returns base64 data URL or None on failure.
+    Returns an image handle or None on failure.
     """
     concept_str = ", ".join(concepts) if concepts else "K-pop"
     member_count = len(member_images)
@@ -194,11 +227,26 @@ async def generate_group_image(
             "magazine cover worthy."
         )
 
+    refs = None
+    if settings.GROUP_IMAGE_CONTACT_SHEET and member_count > 1:
+        try:
+            refs = [await image_prep.contact_sheet(member_images)]
+            references = (
+                "The reference image is a contact sheet with one photo per member "
+                "(left to right, top to bottom)"
+            )
+        except Exception as e:
+            # e.g. a member image that isn't local or can't be decoded
+            logger.warning("Group contact sheet failed, sending member photos instead: %s", e)
+    if refs is None:
+        refs = await asyncio.gather(*(image_prep.reference_data_uri(img) for img in member_images))
+        references = "These are reference photos of each member"
+
     prompt = (
         f"Generate a stunning K-pop {'girl' if group_type == 'girl' else 'boy'} group "
         f"debut concept photo featuring exactly {member_count} members together. "
         f"Group name: {unit_name}. Concept: {concept_str}. "
-        f"These are reference photos of each member — generate a NEW group shot "
+        f"{references} — generate a NEW group shot "
         f"with ALL {member_count} members together in the SAME frame, "
         f"maintaining each member's distinct appearance and identity. "
         f"Composition: center-aligned group formation, confident poses, "
@@ -210,12 +258,10 @@ async def generate_group_image(
     )
 
     content_parts: list[dict] = [{"type": "text", "text": prompt}]
-
-    for img in member_images:
-        img_url = img if img.startswith("data:") else f"data:image/png;base64,{img}"
+    for ref in refs:
         content_parts.append({
             "type": "image_url",
-            "image_url": {"url": img_url},
+            "image_url": {"url": ref},
         })
 
     payload_kb = sum(len(str(p)) for p in content_parts) / 1024
@@ -228,11 +274,11 @@ async def generate_group_image(
     last_error = None
     for attempt in range(2):
         try:
-            response = await get_llm_client().chat.completions.create(
+            response = await chat_completion(
                 model=settings.IMAGE_MODEL,
                 messages=[{"role": "user", "content": content_parts}],
             )
-            result = _extract_image_from_response(response)
+            result = _image_handle(response)
             if result is None:
                 logger.warning("Group image: response received but no image extracted (attempt %d)", attempt + 1)
                 continue
@@ -250,13 +296,9 @@ async def edit_image(reference_image_b64: str, edit_instructions: str) -> str |
     """Edit character image by sending text prompt first, then image.
     Pattern from media-generator-hub: text first, image second, no system prompt."""
     try:
-        # Ensure proper data URI format
-        if not reference_image_b64.startswith("data:"):
-            img_url = f"data:image/png;base64,{reference_image_b64}"
-        else:
-            img_url = reference_image_b64
+        img_url = await image_prep.reference_data_uri(reference_image_b64)
 
-        response = await get_llm_client().chat.completions.create(
+        response = await chat_completion(
             model=settings.IMAGE_MODEL,
             messages=[
                 {
@@ -279,7 +321,7 @@ async def edit_image(reference_image_b64: str, edit_instructions: str) -> str |
             ],
         )
 
-        return _extract_image_from_response(response)
+        return _image_handle(response)
     except Exception as e:
         logger.error("Image edit failed: %s", e)
         return None
@@ -296,17 +338,18 @@ async def inpaint_image(
     edit instructions. The model regenerates only the masked region.
 
     Args:
-        base_image_b64: Original image data URI
+        base_image_b64: Original image (handle or data URI)
         mask_image_b64: Mask image data URI (white=edit, black=keep)
         edit_instructions: What to change in the masked area
 
-    Returns base64 data URL or None on failure.
+    Returns an image handle or None on failure.
     """
-    base_url = base_image_b64 if base_image_b64.startswith("data:") else f"data:image/png;base64,{base_image_b64}"
-    mask_url = mask_image_b64 if mask_image_b64.startswith("data:") else f"data:image/png;base64,{mask_image_b64}"
-
     try:
-        response = await get_llm_client().chat.completions.create(
+        # Same max side for both so the mask stays aligned; the mask stays lossless
+        base_url = await image_prep.reference_data_uri(base_image_b64)
+        mask_url = await image_prep.reference_data_uri(mask_image_b64, fmt="png")
+
+        response = await chat_completion(
             model=settings.IMAGE_MODEL,
             messages=[
                 {
@@ -336,7 +379,7 @@ async def inpaint_image(
             ],
         )
 
-        return _extract_image_from_response(response)
+        return _image_handle(response)
     except Exception as e:
         logger.error("Inpaint failed: %s", e)
         return None
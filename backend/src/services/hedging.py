@@ -0,0 +1,156 @@
+"""Hedged provider requests to cut tail latency.
+
+If a job runs past a latency percentile observed for its kind (e.g. "veo",
+"image"), a duplicate is submitted. The first successful result wins and the
+loser is cancelled — locally (asyncio task) and, where the provider supports
+it, remotely (fal queue cancel).
+
+Hedges are capped per pipeline stage through a HedgeBudget so a slow provider
+can't double the whole stage's cost. Outcomes are counted per kind and exposed
+via get_stats().
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Kind → recent successful latencies (seconds)
+_latencies: dict[str, deque] = {}
+
+# Kind → outcome counters
+_stats: dict[str, dict[str, int]] = {}
+
+_LATENCY_WINDOW = 100
+
+
+class HedgeBudget:
+    """Caps how many hedges a single pipeline stage may fire."""
+
+    def __init__(self, max_hedges: int | None = None):
+        self.max_hedges = settings.HEDGE_MAX_PER_STAGE if max_hedges is None else max_hedges
+        self.used = 0
+
+    def try_acquire(self) -> bool:
+        if self.used >= self.max_hedges:
+            return False
+        self.used += 1
+        return True
+
+
+def record_latency(kind: str, seconds: float) -> None:
+    _latencies.setdefault(kind, deque(maxlen=_LATENCY_WINDOW)).append(seconds)
+
+
+def hedge_delay(kind: str) -> float:
+    """Seconds to wait before hedging: the configured percentile of recent
+    latencies, or the per-kind default until enough samples exist."""
+    samples = _latencies.get(kind)
+    if not samples or len(samples) < settings.HEDGE_MIN_SAMPLES:
+        return settings.HEDGE_DEFAULT_DELAYS.get(kind, 60.0)
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(settings.HEDGE_PERCENTILE * len(ordered)))
+    return ordered[idx]
+
+
+def _count(kind: str, key: str) -> None:
+    counters = _stats.setdefault(
+        kind, {"calls": 0, "hedged": 0, "hedge_wins": 0, "primary_wins": 0, "both_failed": 0},
+    )
+    counters[key] += 1
+
+
+def get_stats() -> dict:
+    """Hedging counters and current hedge delay per request kind."""
+    return {
+        kind: {
+            **counters,
+            "hedge_win_rate": round(counters["hedge_wins"] / counters["hedged"], 3) if counters["hedged"] else 0.0,
+            "hedge_delay_s": round(hedge_delay(kind), 1),
+            "samples": len(_latencies.get(kind, ())),
+        }
+        for kind, counters in _stats.items()
+    }
+
+
+async def hedged_call(
+    kind: str,
+    attempt: Callable[[int], Awaitable[Any]],
+    budget: HedgeBudget | None = None,
+    on_cancel: Callable[[int], Awaitable[None]] | None = None,
+    label: str = "",
+) -> Any:
+    """Run `attempt(0)`, hedging with `attempt(1)` if it runs past the hedge delay.
+
+    `attempt` returns a result or None on failure (the client convention).
+    `on_cancel(n)` is awaited for every attempt still running when the call
+    ends — the loser, or all of them if the caller is cancelled — so callers
+    can cancel the remote job. Without a budget (or with hedging disabled)
+    this is a timed pass-through that only feeds the latency tracker.
+    """
+    _count(kind, "calls")
+    t0 = time.time()
+    primary = asyncio.create_task(attempt(0))
+    tasks = {primary: 0}
+    try:
+        if budget is None or not settings.HEDGE_ENABLED:
+            result = await primary
+            if result is not None:
+                record_latency(kind, time.time() - t0)
+            return result
+
+        delay = hedge_delay(kind)
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            result = primary.result()
+            if result is not None:
+                record_latency(kind, time.time() - t0)
+            return result
+
+        if not budget.try_acquire():
+            logger.info("[hedge] %s %s: slow (>%.0fs) but stage hedge budget exhausted", kind, label, delay)
+            result = await primary
+            if result is not None:
+                record_latency(kind, time.time() - t0)
+            return result
+
+        logger.info("[hedge] %s %s: no result after %.0fs — submitting hedge", kind, label, delay)
+        _count(kind, "hedged")
+        tasks[asyncio.create_task(attempt(1))] = 1
+        pending = set(tasks)
+        winner = None
+        result = None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result() is not None:
+                    winner, result = tasks[task], task.result()
+                    break
+    finally:
+        # Cancel whatever is still running — the loser, or every attempt if we were cancelled
+        for task, n in tasks.items():
+            if task.done() and not task.cancelled():
+                continue
+            task.cancel()
+            if on_cancel:
+                try:
+                    await on_cancel(n)
+                except Exception as e:
+                    logger.warning("[hedge] %s %s: remote cancel of attempt %d failed: %s",
+                                   kind, label, n, e)
+
+    if winner is None:
+        _count(kind, "both_failed")
+        return None
+
+    # The hedge's own latency is the interesting sample, not primary+delay
+    record_latency(kind, time.time() - t0 - (delay if winner == 1 else 0))
+    _count(kind, "hedge_wins" if winner == 1 else "primary_wins")
+    logger.info("[hedge] %s %s: %s won (%.1fs)", kind, label,
+                "hedge" if winner == 1 else "primary", time.time() - t0)
+    return result
@@ -0,0 +1,122 @@
+"""Reference-image preprocessing for image-model requests.
+
+Generated images are stored as full-resolution PNGs (often 1-2 MB each), but
+the gateway model only looks at references at around 1K. Before a reference is
+inlined into a request it is downscaled to IMAGE_REF_MAX_SIDE and recompressed
+(IMAGE_REF_FORMAT / IMAGE_REF_QUALITY), which cuts the upload by roughly 10x.
+For group shots the member photos can instead be packed into one contact sheet
+(GROUP_IMAGE_CONTACT_SHEET).
+
+Results are memoised per (image, settings) — a member's profile image is the
+reference for several keyframes of the same production. Inline images are
+keyed by a digest, so the cache never holds on to the multi-MB originals.
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import logging
+import math
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from src.config import settings
+from src.services import asset_store
+
+logger = logging.getLogger(__name__)
+
+_MIME = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+# (image key, max_side, fmt, quality) → prepared data URI, least recently used first
+_prepared: OrderedDict[tuple, str] = OrderedDict()
+_PREPARED_MAX = 32
+_prepared_lock = threading.Lock()
+
+
+def _decode(image: str) -> Image.Image:
+    data_uri = asset_store.image_data_uri(image)
+    if not data_uri or not data_uri.startswith("data:"):
+        raise ValueError(f"not a local image: {str(image)[:80]}")
+    img = Image.open(io.BytesIO(base64.b64decode(data_uri.split(",", 1)[1])))
+    img.load()
+    return img
+
+
+def _encode(img: Image.Image, fmt: str, quality: int) -> str:
+    if fmt != "png" and img.mode != "RGB":
+        # JPEG has no alpha; flatten onto white like the studio backgrounds
+        background = Image.new("RGB", img.size, "white")
+        background.paste(img, mask=img.getchannel("A") if "A" in img.getbands() else None)
+        img = background
+    buf = io.BytesIO()
+    img.save(buf, format=fmt.upper(), quality=quality, optimize=True)
+    return f"data:{_MIME[fmt]};base64,{base64.b64encode(buf.getvalue()).decode()}"
+
+
+def _image_key(image: str) -> str:
+    """Cache key for an image: a handle as-is, inline data by its sha256."""
+    if image.startswith("/api/assets/"):
+        return image
+    return "sha256:" + hashlib.sha256(image.encode()).hexdigest()
+
+
+def _prepare(image: str, max_side: int, fmt: str, quality: int) -> str:
+    key = (_image_key(image), max_side, fmt, quality)
+    with _prepared_lock:
+        if key in _prepared:
+            _prepared.move_to_end(key)
+            return _prepared[key]
+    img = _decode(image)
+    original = img.size
+    if max_side and max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+    data_uri = _encode(img, fmt, quality)
+    logger.debug("[image_prep] %sx%s → %sx%s %s (%.0f KB)", *original, *img.size, fmt, len(data_uri) / 1024)
+    with _prepared_lock:
+        _prepared[key] = data_uri
+        while len(_prepared) > _PREPARED_MAX:
+            _prepared.popitem(last=False)
+    return data_uri
+
+
+async def reference_data_uri(image: str | None, fmt: str | None = None) -> str | None:
+    """Downscaled, recompressed data URI for a reference image (handle or data URI).
+
+    Remote URLs pass through; anything that fails to decode is sent unchanged.
+    fmt overrides IMAGE_REF_FORMAT (e.g. "png" for masks, which must stay lossless).
+    """
+    if not image or image.startswith(("http://", "https://")):
+        return image
+    fmt = (fmt or settings.IMAGE_REF_FORMAT).lower()
+    try:
+        return await asyncio.to_thread(
+            _prepare, image, settings.IMAGE_REF_MAX_SIDE, fmt, settings.IMAGE_REF_QUALITY,
+        )
+    except Exception as e:
+        logger.warning("[image_prep] preprocessing failed, sending original: %s", e)
+        return asset_store.image_data_uri(image)
+
+
+def _sheet(images: tuple[str, ...], max_side: int, fmt: str, quality: int) -> str:
+    cols = min(len(images), 3)
+    rows = math.ceil(len(images) / cols)
+    cell = min(max_side or 1024, 2048 // cols)
+    sheet = Image.new("RGB", (cell * cols, cell * rows), "white")
+    for i, image in enumerate(images):
+        img = _decode(image).convert("RGB")
+        img.thumbnail((cell, cell), Image.LANCZOS)
+        x = (i % cols) * cell + (cell - img.width) // 2
+        y = (i // cols) * cell + (cell - img.height) // 2
+        sheet.paste(img, (x, y))
+    return _encode(sheet, fmt, quality)
+
+
+async def contact_sheet(images: list[str]) -> str:
+    """Pack several reference images into one grid image (left→right, top→bottom)."""
+    return await asyncio.to_thread(
+        _sheet, tuple(images), settings.IMAGE_REF_MAX_SIDE,
+        settings.IMAGE_REF_FORMAT.lower(), settings.IMAGE_REF_QUALITY,
+    )
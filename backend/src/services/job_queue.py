@@ -0,0 +1,156 @@
+"""Bounded job queue with a fixed worker pool and round-robin fairness across sessions.
+
+Replaces bare `asyncio.create_task()` per request: at most `max_concurrent` jobs
+run at once per consuming process, at most `max_queued` wait, and waiting jobs
+are dispatched round-robin by session so one session can't starve the others.
+
+Jobs live in the shared state store as JSON payloads, so the process that
+submits a job (API) and the one that runs it (API or `python -m src.worker`)
+can differ. Running jobs heartbeat; a job whose worker stops heartbeating is
+reclaimed by another worker with `attempts` incremented.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable
+
+from src.config import settings
+from src.services.state_store import StateStore, get_state_store
+
+logger = logging.getLogger(__name__)
+
+JobRunner = Callable[[dict], Awaitable[None]]
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds `max_queued` waiting jobs."""
+
+
+class JobQueue:
+    def __init__(
+        self,
+        name: str,
+        runner: JobRunner,
+        max_concurrent: int,
+        max_queued: int,
+        store: StateStore | None = None,
+    ):
+        """`runner(job)` receives {"job_id", "session_id", "payload", "attempts"}."""
+        self.name = name
+        self.runner = runner
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._store = store
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._running: set[str] = set()
+        self._workers: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+
+    @property
+    def store(self) -> StateStore:
+        return self._store or get_state_store()
+
+    # ── Public API ──
+
+    def submit(self, job_id: str, session_id: str, payload: dict) -> int:
+        """Enqueue a job. Returns its queue position (0 = next to start).
+
+        Raises QueueFullError when the queue is at capacity.
+        """
+        if self.queued_count() >= self.max_queued:
+            raise QueueFullError(f"{self.name} queue is full ({self.max_queued} waiting)")
+        self.store.enqueue_job(self.name, job_id, session_id, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        position = self.position(job_id)
+        logger.info(
+            "[queue:%s] job %s queued (position=%s, running=%d, waiting=%d)",
+            self.name, job_id, position, self.store.running_count(self.name), self.queued_count(),
+        )
+        return position
+
+    def position(self, job_id: str) -> int | None:
+        """0-based position among waiting jobs, or None if not waiting."""
+        order = self.store.queued_jobs(self.name)
+        return order.index(job_id) if job_id in order else None
+
+    def is_running(self, job_id: str) -> bool:
+        """Whether this process is running the job."""
+        return job_id in self._running
+
+    def queued_count(self) -> int:
+        return len(self.store.queued_jobs(self.name))
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "running": self.store.running_count(self.name),
+            "running_here": len(self._running),
+            "queued": self.queued_count(),
+            "worker_id": self.worker_id if self._workers else None,
+        }
+
+    def start(self) -> None:
+        """Start consuming jobs in this process (idempotent; needs a running loop)."""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.max_concurrent:
+            idx = len(self._workers)
+            self._workers.append(asyncio.create_task(self._worker(idx), name=f"{self.name}-worker-{idx}"))
+        logger.info("[queue:%s] %d workers consuming as %s", self.name, len(self._workers), self.worker_id)
+
+    async def stop(self) -> None:
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # ── Internals ──
+
+    async def _worker(self, idx: int) -> None:
+        while True:
+            try:
+                job = self.store.claim_job(self.name, self.worker_id, settings.JOB_STALE_AFTER)
+            except Exception as e:
+                logger.warning("[queue:%s] claim failed in worker %d: %s", self.name, idx, e)
+                job = None
+            if job is None:
+                # Local submits wake us immediately; jobs from other processes are polled
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job, idx)
+
+    async def _run(self, job: dict, idx: int) -> None:
+        job_id = job["job_id"]
+        self._running.add(job_id)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        status = None
+        try:
+            await self.runner(job)
+            status = "done"
+        except Exception:
+            status = "failed"
+            logger.exception("[queue:%s] job %s crashed in worker %d", self.name, job_id, idx)
+        finally:
+            heartbeat.cancel()
+            self._running.discard(job_id)
+            # Cancelled (shutdown): leave it "running" so another worker reclaims it once stale
+            if status is not None:
+                self.store.finish_job(job_id, status)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            try:
+                self.store.heartbeat_job(job_id, self.worker_id)
+            except Exception as e:
+                logger.warning("[queue:%s] heartbeat for %s failed: %s", self.name, job_id, e)
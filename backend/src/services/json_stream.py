@@ -0,0 +1,118 @@
+"""Incremental scanner for a JSON object arriving as a token stream.
+
+Lets callers act on parts of a response as soon as they are complete instead
+of waiting for the whole completion:
+  - each element of a top-level array (e.g. `scenes[i]`, `members[i]`)
+  - each top-level field (e.g. the scenario's `music_direction`)
+
+Only the object itself is scanned — text before the first `{` (e.g. a stray
+code fence) is skipped; the final result should still be parsed from the full
+text.
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class JsonObjectStream:
+    """Feed chunks with `feed()`; get back the events completed by each chunk.
+
+    Events are (key, index, value) tuples, in stream order:
+      (key, i, item)     — element i of the top-level array `key`
+      (key, None, value) — the top-level field `key` (arrays too, after their items)
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._expect_key = False
+        self._key_start: int | None = None
+        self._key: str | None = None
+        self._value_start: int | None = None
+        # Top-level array being scanned: index / start of its current element
+        self._item_index: int | None = None
+        self._item_start = 0
+
+    def feed(self, text: str) -> list[tuple[str, int | None, object]]:
+        self._buf += text
+        events = []
+        buf = self._buf
+        for i in range(self._pos, len(buf)):
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+            if self._depth == 0:
+                break  # object closed; ignore trailing text
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = i
+                    self._expect_key = False
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._depth == 2 and self._value_start is not None \
+                        and not buf[self._value_start:i].strip():
+                    self._item_index = 0
+                    self._item_start = i + 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._item_index is not None:
+                    self._complete_item(buf[self._item_start:i], events)
+                    self._item_index = None
+                elif self._depth == 0:
+                    self._complete_field(buf[:i], events)
+            elif self._depth == 1:
+                if ch == ":":
+                    self._value_start = i + 1
+                elif ch == ",":
+                    self._complete_field(buf[:i], events)
+                    self._expect_key = True
+            elif self._depth == 2 and ch == "," and self._item_index is not None:
+                self._complete_item(buf[self._item_start:i], events)
+                self._item_start = i + 1
+        self._pos = len(buf)
+        return events
+
+    def _complete_item(self, raw: str, events: list) -> None:
+        raw = raw.strip()
+        if not raw:  # empty array
+            return
+        try:
+            events.append((self._key, self._item_index, json.loads(raw)))
+        except ValueError:
+            logger.debug("[json_stream] unparseable item %s[%d]: %s", self._key, self._item_index, raw[:80])
+        self._item_index += 1
+
+    def _complete_field(self, buf: str, events: list) -> None:
+        if self._key is None or self._value_start is None:
+            return
+        raw = buf[self._value_start:].strip()
+        try:
+            events.append((self._key, None, json.loads(raw)))
+        except ValueError:
+            logger.debug("[json_stream] unparseable value for '%s': %s", self._key, raw[:80])
+        self._key = None
+        self._value_start = None
@@ -0,0 +1,139 @@
+"""Persistent cache for agent LLM responses (opt-in).
+
+Identical blueprint / scenario / edit prompts otherwise hit the gateway every
+time (demos, retries, QA, load tests). Entries are keyed on model, system
+prompt, user prompt, temperature and json_mode and kept in a SQLite file
+shared by every process on the host, bounded by LLM_CACHE_MAX_MB (least
+recently used evicted first) and LLM_CACHE_TTL.
+
+Enable globally with LLM_CACHE_ENABLED=true, or per call via
+BaseAgent.call_llm(cache=True). bypass_cache=True skips the lookup and stores
+the fresh result — for when a new creative take is wanted.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.config import settings
+from src.services.metrics import LLM_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_lru ON llm_cache (accessed_at);
+"""
+
+
+def cache_key(model: str, system_prompt: str, user_prompt: str, temperature: float, json_mode: bool) -> str:
+    payload = json.dumps([model, system_prompt, user_prompt, temperature, json_mode], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed LRU + TTL cache of parsed LLM responses."""
+
+    def __init__(self, path: str, max_bytes: int, ttl: float):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        logger.info("[llm_cache] %s (max %.0f MB, ttl %.0fs)", path, max_bytes / 1e6, ttl)
+
+    def get(self, key: str, agent: str = "") -> dict | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,),
+            ).fetchone()
+            if row and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            if row:
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        if row is None:
+            self.misses += 1
+            LLM_CACHE_REQUESTS.inc(agent=agent, result="miss")
+            return None
+        self.hits += 1
+        LLM_CACHE_REQUESTS.inc(agent=agent, result="hit")
+        return json.loads(row[0])
+
+    def record_bypass(self, agent: str = "") -> None:
+        self.bypasses += 1
+        LLM_CACHE_REQUESTS.inc(agent=agent, result="bypass")
+
+    def put(self, key: str, value: dict) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until under the cap
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at"):
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+        logger.info("[llm_cache] evicted %d entries (%.1f MB)", len(doomed), freed / 1e6)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_cache: LLMCache | None = None
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        _cache = LLMCache(
+            settings.LLM_CACHE_PATH,
+            max_bytes=int(settings.LLM_CACHE_MAX_MB * 1e6),
+            ttl=settings.LLM_CACHE_TTL,
+        )
+    return _cache
@@ -2,11 +2,19 @@
 
 Used by both agents (base_agent.py) and services (gateway_client.py)
 to avoid duplicate client instances and circular imports.
+
+All chat completions should go through chat_completion() (or
+stream_chat_completion()) so they share the adaptive gateway concurrency
+limiter (see rate_limiter.py).
 """
 
+from typing import Callable
+
 from openai import AsyncOpenAI
 
 from src.config import settings
+from src.services import tracing
+from src.services.rate_limiter import call_with_limit
 
 _client: AsyncOpenAI | None = None
 
@@ -17,5 +25,51 @@ def get_llm_client() -> AsyncOpenAI:
         _client = AsyncOpenAI(
             base_url=settings.GATEWAY_BASE_URL,
             api_key=settings.GATEWAY_API_KEY,
+            # Retries (incl. 429 Retry-After) are handled by call_with_limit so the
+            # limiter sees every throttling signal
+            max_retries=0,
         )
     return _client
+
+
+async def chat_completion(**kwargs):
+    """chat.completions.create() under the per-provider/per-model limiter."""
+    client = get_llm_client()
+    model = kwargs.get("model", "")
+    with tracing.span("gateway.chat", cat="gateway", model=model):
+        return await call_with_limit(
+            "gateway", model,
+            lambda: client.chat.completions.create(**kwargs),
+        )
+
+
+async def stream_chat_completion(on_text: Callable[[str], None] | None = None, **kwargs) -> str:
+    """Streamed chat completion under the limiter; returns the full message content.
+
+    `on_text(delta)` is called for every content delta as it arrives. The slot is
+    held until the stream ends. Throttling is only retried before the first delta:
+    a partly consumed stream can't be replayed to the caller.
+    """
+    client = get_llm_client()
+    model = kwargs.get("model", "")
+
+    async def run() -> str:
+        parts: list[str] = []
+        try:
+            stream = await client.chat.completions.create(stream=True, **kwargs)
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    if on_text:
+                        on_text(delta)
+        except Exception as e:
+            if parts:
+                raise RuntimeError(f"LLM stream interrupted after {len(parts)} chunks: {e}") from e
+            raise
+        return "".join(parts)
+
+    with tracing.span("gateway.chat", cat="gateway", model=model, stream=True):
+        return await call_with_limit("gateway", model, run)
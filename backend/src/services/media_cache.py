@@ -0,0 +1,113 @@
+"""Content-addressed cache for generated media (keyframes, clips, BGM).
+
+Image, Veo and Suno calls are the slow and paid part of a teaser, yet a rerun
+of the same teaser (or a retry after a render failure) sends byte-identical
+requests. Results are keyed on the model plus the full request — prompt and
+reference / first / last frame included (content-addressed image handles, or
+data URIs) — and kept as files under assets/cache/{kind}/{key}.{ext}, so a hit
+costs a file read.
+
+Callers opt in per call (generate_image / generate_single_clip / generate_bgm
+with cache=True); MEDIA_CACHE_ENABLED switches it off globally. The directory
+is bounded by MEDIA_CACHE_MAX_GB, least recently used (file mtime) first.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from src.config import settings
+from src.services import asset_store
+from src.services.metrics import MEDIA_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+_EXTENSIONS = {"image": ".png", "clip": ".mp4", "bgm": ".mp3"}
+
+# Strong refs to background downloads (the loop only keeps weak ones)
+_pending: set[asyncio.Task] = set()
+
+
+def media_key(model: str, request) -> str:
+    """Hash of the model and the JSON-serialisable request (frames as handles or data URIs)."""
+    payload = json.dumps([model, request], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _path(kind: str, key: str) -> Path:
+    # ASSETS_ROOT is read per call (bench/ points it at a temp dir)
+    return asset_store.ASSETS_ROOT / "cache" / kind / f"{key}{_EXTENSIONS[kind]}"
+
+
+def get(kind: str, key: str) -> str | None:
+    """Cached result as the provider would return it, or None.
+
+    Images come back as an image handle, clips and BGM as an /api/assets/ URL.
+    """
+    if not settings.MEDIA_CACHE_ENABLED:
+        return None
+    path = _path(kind, key)
+    try:
+        os.utime(path)  # LRU clock
+        if kind == "image":
+            # A handle of its own, so evicting the cache entry can't break a session
+            value = asset_store.image_handle(path)
+            if value is None:
+                raise OSError(f"unreadable {path}")
+        else:
+            value = f"/api/assets/{asset_store.relative_asset_path(path)}"
+    except OSError:
+        MEDIA_CACHE_REQUESTS.inc(kind=kind, result="miss")
+        return None
+    MEDIA_CACHE_REQUESTS.inc(kind=kind, result="hit")
+    logger.info("[media_cache] %s hit %s", kind, key[:12])
+    return value
+
+
+def put(kind: str, key: str, value: str) -> None:
+    """Store a provider result. Local files are linked now; clips / BGM download in the background."""
+    if not settings.MEDIA_CACHE_ENABLED or not value:
+        return
+    path = _path(kind, key)
+    local = asset_store.local_path_for_url(value)
+    if local:
+        asset_store.link_file(local, path)
+        _evict()
+        return
+    task = asyncio.create_task(_download(value, path))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def _download(url: str, path: Path) -> None:
+    if await asset_store.download_and_save(url, path):
+        _evict()
+
+
+def _evict() -> None:
+    root = asset_store.ASSETS_ROOT / "cache"
+    max_bytes = settings.MEDIA_CACHE_MAX_GB * 1e9
+    files = []
+    for path in root.glob("*/*"):
+        if path.name.endswith(".tmp"):  # still being written
+            continue
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in files)
+    if total <= max_bytes:
+        return
+    freed, removed = 0, 0
+    for _, size, path in sorted(files):
+        if total - freed <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        freed += size
+        removed += 1
+    asset_store.gc_blobs()
+    logger.info("[media_cache] evicted %d files (%.1f MB)", removed, freed / 1e6)
@@ -0,0 +1,222 @@
+"""Minimal Prometheus metrics (text exposition format) for capacity planning.
+
+Served at GET /api/metrics. Metrics are per process: with several uvicorn /
+teaser worker processes, scrape each of them (or aggregate by instance).
+
+Series:
+  debut_provider_request_duration_seconds{provider,model,outcome}  histogram
+  debut_fal_queue_wait_seconds{model} / debut_fal_run_seconds{model} histograms
+  debut_suno_resolutions_total{via}                                  counter
+  debut_ffmpeg_render_duration_seconds{outcome}                      histogram
+  debut_ffmpeg_step_duration_seconds{step}                           histogram
+  debut_pipelines_in_flight                                          gauge
+  debut_teaser_queue_jobs{state}                                     gauge
+  debut_llm_cache_requests_total{agent,result}                       counter
+"""
+
+import math
+import time
+from contextlib import contextmanager
+
+_registry: list["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, doc, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, doc, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> list[str]:
+        values = self._values or ({(): 0.0} if not self.labelnames else {})
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        doc: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 180, 300, 600),
+    ):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label key → (per-bucket counts, sum, count)
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[0][i] += 1
+                break
+        entry[1] += value
+        entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of a block (also when it raises)."""
+        t0 = time.time()
+        try:
+            yield
+        finally:
+            self.observe(time.time() - t0, **labels)
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text exposition format."""
+    return "\n".join(m.render() for m in _registry) + "\n"
+
+
+# ── Metrics ──
+
+PROVIDER_LATENCY = Histogram(
+    "debut_provider_request_duration_seconds",
+    "Outbound provider call latency (slot held), by provider, model and outcome.",
+    ("provider", "model", "outcome"),
+)
+FAL_QUEUE_WAIT = Histogram(
+    "debut_fal_queue_wait_seconds",
+    "Time a fal job spent queued before it started running.",
+    ("model",),
+)
+FAL_RUN_TIME = Histogram(
+    "debut_fal_run_seconds",
+    "Time a fal job spent running (InProgress → result).",
+    ("model",),
+)
+SUNO_RESOLUTIONS = Counter(
+    "debut_suno_resolutions_total",
+    "How Suno BGM tasks were resolved (callback, stored_callback, poll, failed).",
+    ("via",),
+)
+FFMPEG_RENDER = Histogram(
+    "debut_ffmpeg_render_duration_seconds",
+    "Total teaser render time (downloads + ffmpeg), by outcome.",
+    ("outcome",),
+    buckets=(1, 2.5, 5, 10, 20, 30, 60, 120, 300),
+)
+FFMPEG_STEP = Histogram(
+    "debut_ffmpeg_step_duration_seconds",
+    "Duration of individual ffmpeg invocations.",
+    ("step",),
+    buckets=(0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300),
+)
+RENDER_POOL_JOBS = Gauge(
+    "debut_render_pool_jobs",
+    "Render subprocess jobs (ffmpeg, Remotion) in this process, by state (queued, running).",
+    ("state",),
+)
+RENDER_POOL_WAIT = Histogram(
+    "debut_render_pool_wait_seconds",
+    "Time a render job waited for a render pool slot, by kind (ffmpeg, remotion).",
+    ("kind",),
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+PIPELINES_IN_FLIGHT = Gauge(
+    "debut_pipelines_in_flight",
+    "Teaser pipelines currently running in this process.",
+)
+TEASER_QUEUE_JOBS = Gauge(
+    "debut_teaser_queue_jobs",
+    "Teaser jobs in the shared queue, by state (queued, running).",
+    ("state",),
+)
+LLM_CACHE_REQUESTS = Counter(
+    "debut_llm_cache_requests_total",
+    "Agent LLM response cache lookups, by agent and result (hit, miss, bypass).",
+    ("agent", "result"),
+)
+MEDIA_CACHE_REQUESTS = Counter(
+    "debut_media_cache_requests_total",
+    "Generated media cache lookups, by kind (image, clip, bgm) and result (hit, miss).",
+    ("kind", "result"),
+)
@@ -0,0 +1,260 @@
+"""Adaptive per-provider / per-model concurrency limiter (AIMD).
+
+Every outbound call to the AI Gateway, fal and Suno takes a slot from two
+limiters: one for the model ("gateway:gemini-3-pro-image-preview") and one for
+the provider ("gateway"). Each limiter adapts its concurrency limit:
+
+  - success at normal latency  → additive increase (+1 per ~limit successes)
+  - 429 / provider throttling  → multiplicative decrease (×0.5), and the
+                                  limiter is paused for Retry-After seconds
+  - timeout / latency spike     → gentle multiplicative decrease (×0.8)
+  - connection reset / refused  → no change (call_with_limit retries it)
+
+Usage:
+    async with limited("suno", settings.SUNO_MODEL) as slot:
+        resp = await client.post(...)
+        if body_says_rate_limited:
+            slot.throttled(retry_after=...)
+
+or, with retries on throttling / transient failures:
+    await call_with_limit("gateway", model, lambda: client.chat.completions.create(...))
+"""
+
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable
+
+import httpx
+import openai
+
+from src.config import settings
+from src.services.metrics import PROVIDER_LATENCY
+
+logger = logging.getLogger(__name__)
+
+OUTCOME_OK = "ok"
+OUTCOME_THROTTLED = "throttled"
+OUTCOME_OVERLOADED = "overloaded"  # timeouts, 5xx
+OUTCOME_CONNECTION = "connection"  # reset / refused before a response — retried, no signal
+OUTCOME_ERROR = "error"            # caller/validation errors — no signal
+_RETRYABLE = (OUTCOME_THROTTLED, OUTCOME_OVERLOADED, OUTCOME_CONNECTION)
+
+_LATENCY_SPIKE_FACTOR = 3.0
+_EWMA_ALPHA = 0.2
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter whose limit follows AIMD on throttling/latency signals."""
+
+    def __init__(self, name: str, initial: int, minimum: int, maximum: int):
+        self.name = name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.waiting = 0
+        self.blocked_until = 0.0
+        self.latency_ewma: float | None = None
+        self.throttle_count = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    pause = self.blocked_until - time.time()
+                    if pause > 0:
+                        # Retry-After: nobody starts until the pause expires
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), timeout=pause)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    if self.in_flight < max(1, int(self.limit)):
+                        break
+                    await self._cond.wait()
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self, outcome: str, latency: float, retry_after: float | None = None) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._adapt(outcome, latency, retry_after)
+            self._cond.notify_all()
+
+    def _adapt(self, outcome: str, latency: float, retry_after: float | None) -> None:
+        old = self.limit
+        if outcome == OUTCOME_THROTTLED:
+            self.throttle_count += 1
+            self.limit = max(self.minimum, self.limit * 0.5)
+            pause = retry_after if retry_after is not None else 1.0
+            self.blocked_until = max(self.blocked_until, time.time() + pause)
+        elif outcome == OUTCOME_OVERLOADED:
+            self.limit = max(self.minimum, self.limit * 0.8)
+        elif outcome == OUTCOME_OK:
+            spike = (
+                self.latency_ewma is not None
+                and latency > _LATENCY_SPIKE_FACTOR * self.latency_ewma
+            )
+            if spike:
+                self.limit = max(self.minimum, self.limit * 0.8)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+            self.latency_ewma = (
+                latency if self.latency_ewma is None
+                else (1 - _EWMA_ALPHA) * self.latency_ewma + _EWMA_ALPHA * latency
+            )
+        if int(old) != int(self.limit):
+            logger.info("[limiter] %s: limit %d → %d (%s)", self.name, int(old), int(self.limit), outcome)
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "throttled": self.throttle_count,
+            "paused_s": round(max(0.0, self.blocked_until - time.time()), 1),
+            "latency_ewma_s": round(self.latency_ewma, 2) if self.latency_ewma is not None else None,
+        }
+
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+
+
+def _get_limiter(key: str, provider: str) -> AdaptiveLimiter:
+    limiter = _limiters.get(key)
+    if limiter is None:
+        cfg = settings.CONCURRENCY_LIMITS.get(key) or settings.CONCURRENCY_LIMITS.get(provider, {})
+        limiter = AdaptiveLimiter(
+            key,
+            initial=cfg.get("initial", 8),
+            minimum=cfg.get("min", 1),
+            maximum=cfg.get("max", 32),
+        )
+        _limiters[key] = limiter
+    return limiter
+
+
+class Slot:
+    """Handle for an acquired slot; lets callers report throttling seen in a 200 body."""
+
+    def __init__(self):
+        self.outcome: str | None = None
+        self.retry_after: float | None = None
+
+    def throttled(self, retry_after: float | None = None) -> None:
+        self.outcome = OUTCOME_THROTTLED
+        self.retry_after = retry_after
+
+
+def _status_and_headers(exc: BaseException) -> tuple[int | None, Any]:
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    headers = getattr(response, "headers", None)
+    return status, headers
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After as seconds (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_exception(exc: BaseException) -> tuple[str, float | None]:
+    """Map a client exception to (outcome, retry_after)."""
+    status, headers = _status_and_headers(exc)
+    if status == 429:
+        retry_after = parse_retry_after(headers.get("retry-after")) if headers is not None else None
+        return OUTCOME_THROTTLED, retry_after
+    if isinstance(status, int) and status >= 500:
+        return OUTCOME_OVERLOADED, None
+    if isinstance(exc, asyncio.TimeoutError) or "timeout" in type(exc).__name__.lower():
+        return OUTCOME_OVERLOADED, None
+    if isinstance(exc, (httpx.TransportError, openai.APIConnectionError, ConnectionError)):
+        # What the OpenAI SDK's own retries covered before they were turned off
+        return OUTCOME_CONNECTION, None
+    return OUTCOME_ERROR, None
+
+
+@asynccontextmanager
+async def limited(provider: str, model: str = ""):
+    """Hold a provider (and model) concurrency slot for the duration of the block."""
+    limiters = []
+    if model:
+        limiters.append(_get_limiter(f"{provider}:{model}", provider))
+    limiters.append(_get_limiter(provider, provider))
+
+    # Narrower (model) slot first so a saturated model doesn't hog provider slots
+    acquired = []
+    try:
+        for limiter in limiters:
+            await limiter.acquire()
+            acquired.append(limiter)
+    except BaseException:
+        for limiter in acquired:
+            await limiter.release(OUTCOME_ERROR, 0.0)
+        raise
+
+    slot = Slot()
+    t0 = time.time()
+    outcome, retry_after = OUTCOME_OK, None
+    try:
+        yield slot
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            outcome = OUTCOME_ERROR
+        else:
+            outcome, retry_after = classify_exception(e)
+        raise
+    finally:
+        if slot.outcome:
+            outcome, retry_after = slot.outcome, slot.retry_after
+        latency = time.time() - t0
+        PROVIDER_LATENCY.observe(latency, provider=provider, model=model, outcome=outcome)
+        for limiter in acquired:
+            await limiter.release(outcome, latency, retry_after)
+
+
+async def call_with_limit(
+    provider: str,
+    model: str,
+    fn: Callable[[], Awaitable[Any]],
+    max_retries: int = 2,
+) -> Any:
+    """Run `fn()` under the limiter, retrying throttled/overloaded/connection failures with backoff.
+
+    Retry-After is honoured by the limiter pause; the slot is released while backing off.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            async with limited(provider, model):
+                return await fn()
+        except Exception as e:
+            outcome, retry_after = classify_exception(e)
+            if outcome not in _RETRYABLE or attempt == max_retries:
+                raise
+            backoff = retry_after if retry_after is not None else (0.5 * 2 ** attempt + random.random())
+            logger.warning(
+                "[limiter] %s:%s %s (attempt %d/%d) — retrying in %.1fs: %s",
+                provider, model, outcome, attempt + 1, max_retries + 1, backoff, e,
+            )
+            await asyncio.sleep(backoff)
+
+
+def get_stats() -> dict:
+    """Current limit / in-flight / queue depth for every limiter."""
+    return {key: limiter.snapshot() for key, limiter in sorted(_limiters.items())}
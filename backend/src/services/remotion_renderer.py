@@ -6,6 +6,8 @@ import logging
 import time
 from pathlib import Path
 
+from src.services import asset_store, render_pool
+
 logger = logging.getLogger(__name__)
 
 FRONTEND_DIR = Path(__file__).parent.parent.parent.parent / "frontend"
@@ -36,11 +38,11 @@ def _timeline_to_props(timeline: dict) -> dict:
         "bgmUrl": bgm_url,
         "opening": {
             "title": opening.get("title", ""),
-            "imageUrl": opening.get("image_url"),
+            "imageUrl": asset_store.image_data_uri(opening.get("image_url")),
         },
         "closing": {
             "title": closing.get("title", ""),
-            "imageUrl": closing.get("image_url"),
+            "imageUrl": asset_store.image_data_uri(closing.get("image_url")),
         },
     }
 
@@ -75,31 +77,28 @@ async def render_teaser(
     t0 = time.time()
 
     try:
-        cmd = [
-            "npx", "remotion", "render",
-            "MvTeaser",
-            output_path,
-            "--props", props_json,
-        ]
-        logger.info("[remotion] CMD: %s", " ".join(cmd[:5]) + " ...")
-
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            cwd=str(FRONTEND_DIR),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-
-        stdout, stderr = await asyncio.wait_for(
-            process.communicate(),
-            timeout=600,  # 10 min max
-        )
+        async with render_pool.slot("remotion") as threads:
+            cmd = [
+                "npx", "remotion", "render",
+                "MvTeaser",
+                output_path,
+                "--props", props_json,
+                "--concurrency", str(threads),
+            ]
+            logger.info("[remotion] CMD: %s", " ".join(cmd[:5]) + " ...")
+
+            t0 = time.time()  # render time, not the wait for a slot
+            returncode, stdout, stderr = await render_pool.run(
+                cmd,
+                timeout=600,  # 10 min max; killed (with its Chrome workers) past that
+                cwd=str(FRONTEND_DIR),
+            )
 
         elapsed = time.time() - t0
         stdout_text = stdout.decode() if stdout else ""
         stderr_text = stderr.decode() if stderr else ""
 
-        if process.returncode == 0:
+        if returncode == 0:
             # Check output file size
             out_file = Path(output_path)
             file_size = out_file.stat().st_size if out_file.exists() else 0
@@ -115,7 +114,7 @@ async def render_teaser(
         else:
             logger.error(
                 "[remotion] === RENDER FAILED === (%.1fs) exit_code=%d",
-                elapsed, process.returncode,
+                elapsed, returncode,
             )
             if stderr_text:
                 for line in stderr_text.strip().split("\n")[-20:]:
@@ -128,7 +127,6 @@ async def render_teaser(
     except asyncio.TimeoutError:
         elapsed = time.time() - t0
         logger.error("[remotion] === RENDER TIMEOUT === (%.1fs, limit=600s)", elapsed)
-        process.kill()
         return None
     except FileNotFoundError:
         logger.error("[remotion] 'npx' not found — Remotion CLI not installed or not in PATH")
@@ -0,0 +1,124 @@
+"""Bounded pool for render subprocesses (ffmpeg, Remotion).
+
+Encodes are CPU-bound and each one already uses several cores, so starting
+every pipeline's ffmpeg at once only makes all of them slower. A render job
+takes one of RENDER_MAX_PROCS slots (default: half the CPUs) and queues for a
+slot beyond that; each job is told to use threads_per_job() threads, so the
+running jobs share the CPUs instead of oversubscribing them.
+
+Every process runs in its own process group and is killed and reaped when it
+times out or its caller is cancelled, so no encoder outlives its request.
+
+Usage:
+    async with render_pool.slot("ffmpeg") as threads:
+        returncode, stdout, stderr = await render_pool.run([..., "-threads", str(threads), out], timeout=300)
+
+Light commands (ffprobe) call run() without a slot — supervised, not queued.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import time
+from contextlib import asynccontextmanager
+
+from src.config import settings
+from src.services.metrics import RENDER_POOL_JOBS, RENDER_POOL_WAIT
+
+logger = logging.getLogger(__name__)
+
+_running = 0
+_queued = 0
+_cond: asyncio.Condition | None = None
+
+
+def max_procs() -> int:
+    """Render processes allowed to run at once."""
+    return settings.RENDER_MAX_PROCS or max(1, (os.cpu_count() or 2) // 2)
+
+
+def threads_per_job() -> int:
+    """Encoder threads for one job, so that max_procs() jobs fill the CPUs."""
+    return settings.RENDER_THREADS or max(1, (os.cpu_count() or 1) // max_procs())
+
+
+def _update_gauges() -> None:
+    RENDER_POOL_JOBS.set(_running, state="running")
+    RENDER_POOL_JOBS.set(_queued, state="queued")
+
+
+@asynccontextmanager
+async def slot(kind: str):
+    """Hold a render slot for the block; yields the thread count the job should use."""
+    global _cond, _running, _queued
+    if _cond is None:
+        _cond = asyncio.Condition()
+    t0 = time.time()
+    async with _cond:
+        _queued += 1
+        _update_gauges()
+        try:
+            await _cond.wait_for(lambda: _running < max_procs())
+        except BaseException:
+            _cond.notify()  # pass on a wakeup this cancelled waiter may have taken
+            raise
+        finally:
+            _queued -= 1
+            _update_gauges()
+        _running += 1
+        _update_gauges()
+    waited = time.time() - t0
+    RENDER_POOL_WAIT.observe(waited, kind=kind)
+    if waited > 1:
+        logger.info("[render_pool] %s waited %.1fs for a slot (%d queued)", kind, waited, _queued)
+    try:
+        yield threads_per_job()
+    finally:
+        async with _cond:
+            _running -= 1
+            _update_gauges()
+            _cond.notify()
+
+
+async def run(cmd: list[str], timeout: float, cwd: str | None = None) -> tuple[int, bytes, bytes]:
+    """Run a command to completion; returns (returncode, stdout, stderr).
+
+    On timeout (asyncio.TimeoutError) or cancellation the process group is
+    killed and reaped before the exception propagates.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,  # own process group: npx → node → chrome go with it
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except BaseException as e:
+        await _kill(proc, cmd[0], type(e).__name__)
+        raise
+    return proc.returncode, stdout, stderr
+
+
+async def _kill(proc: asyncio.subprocess.Process, name: str, reason: str) -> None:
+    if proc.returncode is not None:
+        return
+    logger.warning("[render_pool] killing %s (pid %d): %s", name, proc.pid, reason)
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    # Reap even while our caller is being cancelled, so no zombie is left behind
+    await asyncio.shield(proc.wait())
+
+
+def get_stats() -> dict:
+    """Slots, per-job threads, running and queued render jobs (this process)."""
+    return {
+        "max_procs": max_procs(),
+        "threads_per_job": threads_per_job(),
+        "running": _running,
+        "queued": _queued,
+    }
@@ -1,28 +1,37 @@
-"""In-memory session store for hackathon. Replace with Firestore for production."""
+"""Session store backed by the shared state store (in-memory by default).
+
+With STATE_STORE_URL=sqlite:///... sessions are shared across processes; callers
+that mutate a session object must write it back with update_session().
+"""
 import uuid
 from datetime import datetime
 
 from src.models.session import Session
-
-_sessions: dict[str, Session] = {}
+from src.services.state_store import get_state_store
 
 
 def create_session() -> Session:
     session_id = str(uuid.uuid4())[:8]
     session = Session(session_id=session_id, created_at=datetime.now())
-    _sessions[session_id] = session
+    get_state_store().save_session(session)
     return session
 
 
 def get_session(session_id: str) -> Session | None:
-    return _sessions.get(session_id)
+    return get_state_store().load_session(session_id)
 
 
 def update_session(session_id: str, **kwargs) -> Session | None:
-    session = _sessions.get(session_id)
+    """Write only the given fields; other fields keep whatever another process stored."""
+    return get_state_store().update_session(session_id, **kwargs)
+
+
+def restore_session(session_id: str) -> Session:
+    """Get a session, recreating it under the same ID if the store doesn't know it
+    (e.g. resuming a checkpointed teaser after a restart)."""
+    store = get_state_store()
+    session = store.load_session(session_id)
     if session is None:
-        return None
-    for key, value in kwargs.items():
-        if hasattr(session, key):
-            setattr(session, key, value)
+        session = Session(session_id=session_id, created_at=datetime.now())
+        store.save_session(session)
     return session
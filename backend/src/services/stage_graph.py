@@ -0,0 +1,107 @@
+"""Dependency-driven stage scheduler for pipeline orchestration.
+
+Each stage is an async callable registered with the names of the stages it
+depends on. A stage starts as soon as all of its dependencies have finished,
+so independent branches (e.g. BGM vs. keyframes → Veo clips) overlap instead
+of waiting on a single gather barrier. Each stage runs inside a "stage" trace
+span carrying its dependencies (see tracing.py, critical path).
+
+Failure semantics mirror `asyncio.gather(..., return_exceptions=True)` as used
+by the director: a stage that raises is recorded in `errors` and its dependents
+receive `None` for that input, so they can degrade gracefully.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from src.services import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class StageGraph:
+    """A small DAG of named asyncio stages."""
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.t0 = time.time()
+        self._tasks: dict[str, asyncio.Task] = {}
+        # stage name → (start offset, end offset) in seconds since t0
+        self.timings: dict[str, tuple[float, float]] = {}
+        self.errors: dict[str, BaseException] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable[Any]],
+        deps: list[str] | tuple[str, ...] = (),
+    ) -> asyncio.Task:
+        """Register a stage. `fn` is called with the results of `deps` in order.
+
+        Dependencies must be registered before their dependents.
+        """
+        if name in self._tasks:
+            raise ValueError(f"Stage '{name}' already registered")
+        missing = [d for d in deps if d not in self._tasks]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+
+        dep_tasks = [self._tasks[d] for d in deps]
+
+        async def runner():
+            inputs = []
+            for dep_name, dep_task in zip(deps, dep_tasks):
+                try:
+                    inputs.append(await asyncio.shield(dep_task))
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    # Already recorded by the failing stage
+                    inputs.append(None)
+            start = time.time() - self.t0
+            try:
+                with tracing.span(name, cat="stage", deps=list(deps)):
+                    return await fn(*inputs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors[name] = e
+                logger.warning("[%s] stage '%s' failed: %s", self.name, name, e)
+                raise
+            finally:
+                self.timings[name] = (start, time.time() - self.t0)
+
+        task = asyncio.create_task(runner(), name=f"{self.name}:{name}")
+        # Failures are surfaced via `errors`/`result()`; avoid "never retrieved" warnings
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._tasks[name] = task
+        return task
+
+    async def result(self, name: str) -> Any:
+        """Wait for a stage and return its result, or None if it failed."""
+        try:
+            return await self._tasks[name]
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return None
+
+    async def wait_all(self) -> None:
+        """Wait for every registered stage to settle."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def cancel(self) -> None:
+        """Cancel all stages that are still running."""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+    def span(self, *names: str) -> float:
+        """Wall time covered by the given stages (first start → last end)."""
+        spans = [self.timings[n] for n in names if n in self.timings]
+        if not spans:
+            return 0.0
+        return max(end for _, end in spans) - min(start for start, _ in spans)
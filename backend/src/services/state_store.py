@@ -0,0 +1,441 @@
+"""Pluggable shared state for sessions, operations, teaser jobs and Suno callbacks.
+
+The default "memory" store keeps everything in this process (the original
+hackathon behaviour). The "sqlite" store keeps it in a SQLite file so several
+uvicorn workers and standalone teaser workers (`python -m src.worker`) on one
+host share sessions, operation status, the job queue and Suno callback results.
+
+Select with STATE_STORE_URL:
+    memory                     (default)
+    sqlite:///abs/path/debut.db
+
+A network-backed store (Redis, Postgres, Firestore...) only needs to implement
+StateStore.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from src.config import settings
+from src.models.session import Session
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+
+# Unclaimed Suno callback results (e.g. the late "complete" after a waiter resolved on "first")
+SUNO_RESULT_TTL = 24 * 3600
+
+
+class StateStore(ABC):
+    """Interface every shared-state backend implements."""
+
+    # ── Sessions ──
+
+    @abstractmethod
+    def load_session(self, session_id: str) -> Session | None: ...
+
+    @abstractmethod
+    def save_session(self, session: Session) -> None: ...
+
+    def update_session(self, session_id: str, **fields) -> Session | None:
+        """Set only `fields` on the stored session; returns it, or None if unknown."""
+        session = self.load_session(session_id)
+        if session is None:
+            return None
+        for key, value in fields.items():
+            if hasattr(session, key):
+                setattr(session, key, value)
+        self.save_session(session)
+        return session
+
+    # ── Operations (teaser status records) ──
+
+    @abstractmethod
+    def get_operation(self, op_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def put_operation(self, op_id: str, data: dict) -> None: ...
+
+    def update_operation(self, op_id: str, **fields) -> None:
+        data = self.get_operation(op_id)
+        if data is None:
+            return
+        data.update(fields)
+        self.put_operation(op_id, data)
+
+    # ── Job queue ──
+
+    @abstractmethod
+    def enqueue_job(self, queue: str, job_id: str, session_id: str, payload: dict) -> None: ...
+
+    @abstractmethod
+    def claim_job(self, queue: str, worker_id: str, stale_after: float) -> dict | None:
+        """Atomically take the next job (round-robin by session).
+
+        Running jobs whose heartbeat is older than `stale_after` seconds are
+        reclaimed first (their worker died); `attempts` is incremented.
+        Returns {"job_id", "session_id", "payload", "attempts"} or None.
+        """
+
+    @abstractmethod
+    def heartbeat_job(self, job_id: str, worker_id: str) -> None: ...
+
+    @abstractmethod
+    def finish_job(self, job_id: str, status: str) -> None: ...
+
+    @abstractmethod
+    def queued_jobs(self, queue: str) -> list[str]:
+        """IDs of waiting jobs in dispatch order."""
+
+    @abstractmethod
+    def running_count(self, queue: str) -> int: ...
+
+    # ── Suno callback results (callback may land in a different process) ──
+
+    @abstractmethod
+    def put_suno_result(self, task_id: str, audio_url: str | None) -> None:
+        """Store a callback result; results older than SUNO_RESULT_TTL are dropped."""
+
+    @abstractmethod
+    def take_suno_result(self, task_id: str) -> tuple[bool, str | None]:
+        """(found, audio_url); removes the entry when found."""
+
+
+def _dispatch_order(jobs: list[tuple[str, str]], served: dict[str, float]) -> list[str]:
+    """Round-robin dispatch order.
+
+    `jobs` are (job_id, session_id) in enqueue order; `served` maps session → last
+    time a job of that session was dispatched. The least recently served session
+    goes next; within a session jobs stay FIFO.
+    """
+    per_session: dict[str, list[str]] = {}
+    for job_id, session_id in jobs:
+        per_session.setdefault(session_id, []).append(job_id)
+    # Sessions never served go first, in order of their oldest job
+    first_seen = {sid: i for i, (_, sid) in reversed(list(enumerate(jobs)))}
+    rank = {sid: (served.get(sid, float("-inf")), first_seen[sid]) for sid in per_session}
+
+    order = []
+    tick = time.time()
+    while per_session:
+        sid = min(per_session, key=lambda s: rank[s])
+        order.append(per_session[sid].pop(0))
+        if not per_session[sid]:
+            del per_session[sid]
+        tick += 1
+        rank[sid] = (tick, rank[sid][1])
+    return order
+
+
+class MemoryStateStore(StateStore):
+    """Process-local store. Sessions are kept as live objects (no serialization)."""
+
+    def __init__(self):
+        self._sessions: dict[str, Session] = {}
+        self._operations: dict[str, dict] = {}
+        self._jobs: dict[str, dict] = {}
+        self._served: dict[str, dict[str, float]] = {}
+        self._suno: dict[str, tuple[str | None, float]] = {}  # task_id → (audio_url, stored at)
+
+    def load_session(self, session_id: str) -> Session | None:
+        return self._sessions.get(session_id)
+
+    def save_session(self, session: Session) -> None:
+        self._sessions[session.session_id] = session
+
+    def get_operation(self, op_id: str) -> dict | None:
+        op = self._operations.get(op_id)
+        return dict(op) if op is not None else None
+
+    def put_operation(self, op_id: str, data: dict) -> None:
+        self._operations[op_id] = dict(data)
+
+    def enqueue_job(self, queue: str, job_id: str, session_id: str, payload: dict) -> None:
+        self._jobs[job_id] = {
+            "job_id": job_id, "queue": queue, "session_id": session_id, "payload": payload,
+            "status": JOB_QUEUED, "attempts": 0, "enqueued_at": time.time(),
+            "heartbeat_at": None, "worker_id": None,
+        }
+
+    def claim_job(self, queue: str, worker_id: str, stale_after: float) -> dict | None:
+        now = time.time()
+        job = next(
+            (j for j in self._jobs.values()
+             if j["queue"] == queue and j["status"] == JOB_RUNNING
+             and (j["heartbeat_at"] or 0) < now - stale_after),
+            None,
+        )
+        if job is None:
+            order = self.queued_jobs(queue)
+            if not order:
+                return None
+            job = self._jobs[order[0]]
+        job.update(status=JOB_RUNNING, worker_id=worker_id, heartbeat_at=now, attempts=job["attempts"] + 1)
+        self._served.setdefault(queue, {})[job["session_id"]] = now
+        return {k: job[k] for k in ("job_id", "session_id", "payload", "attempts")}
+
+    def heartbeat_job(self, job_id: str, worker_id: str) -> None:
+        job = self._jobs.get(job_id)
+        if job and job["worker_id"] == worker_id:
+            job["heartbeat_at"] = time.time()
+
+    def finish_job(self, job_id: str, status: str) -> None:
+        # Finished jobs carry no state worth keeping in memory
+        self._jobs.pop(job_id, None)
+
+    def queued_jobs(self, queue: str) -> list[str]:
+        waiting = sorted(
+            (j for j in self._jobs.values() if j["queue"] == queue and j["status"] == JOB_QUEUED),
+            key=lambda j: j["enqueued_at"],
+        )
+        return _dispatch_order([(j["job_id"], j["session_id"]) for j in waiting], self._served.get(queue, {}))
+
+    def running_count(self, queue: str) -> int:
+        return sum(1 for j in self._jobs.values() if j["queue"] == queue and j["status"] == JOB_RUNNING)
+
+    def put_suno_result(self, task_id: str, audio_url: str | None) -> None:
+        now = time.time()
+        for stale in [t for t, (_, at) in self._suno.items() if at < now - SUNO_RESULT_TTL]:
+            del self._suno[stale]
+        self._suno[task_id] = (audio_url, now)
+
+    def take_suno_result(self, task_id: str) -> tuple[bool, str | None]:
+        if task_id not in self._suno:
+            return False, None
+        return True, self._suno.pop(task_id)[0]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS operations (
+    op_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY, queue TEXT NOT NULL, session_id TEXT NOT NULL,
+    payload TEXT NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL, heartbeat_at REAL, worker_id TEXT, finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue_status ON jobs (queue, status, enqueued_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+CREATE TABLE IF NOT EXISTS queue_served (
+    queue TEXT NOT NULL, session_id TEXT NOT NULL, served_at REAL NOT NULL,
+    PRIMARY KEY (queue, session_id)
+);
+CREATE TABLE IF NOT EXISTS suno_results (
+    task_id TEXT PRIMARY KEY, audio_url TEXT, created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS suno_results_created ON suno_results (created_at);
+"""
+
+
+class SQLiteStateStore(StateStore):
+    """Single-host shared store. Every process opens the same database file.
+
+    Calls are short synchronous transactions (WAL mode), cheap enough to run on
+    the event loop.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        logger.info("[state] SQLite state store at %s", path)
+
+    def _exec(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def load_session(self, session_id: str) -> Session | None:
+        row = self._exec("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return Session.model_validate_json(row["data"]) if row else None
+
+    def save_session(self, session: Session) -> None:
+        self._exec(
+            "INSERT OR REPLACE INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+            (session.session_id, session.model_dump_json(), time.time()),
+        )
+
+    def update_session(self, session_id: str, **fields) -> Session | None:
+        # API (blueprint edits, teaser submit) and workers (progress, result) both write
+        # sessions: merge the fields into the current row inside one transaction
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+                session = Session.model_validate_json(row["data"]) if row else None
+                if session is not None:
+                    for key, value in fields.items():
+                        if hasattr(session, key):
+                            setattr(session, key, value)
+                    self._conn.execute(
+                        "UPDATE sessions SET data = ?, updated_at = ? WHERE session_id = ?",
+                        (session.model_dump_json(), time.time(), session_id),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return session
+
+    def get_operation(self, op_id: str) -> dict | None:
+        row = self._exec("SELECT data FROM operations WHERE op_id = ?", (op_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def put_operation(self, op_id: str, data: dict) -> None:
+        self._exec(
+            "INSERT OR REPLACE INTO operations (op_id, data, updated_at) VALUES (?, ?, ?)",
+            (op_id, json.dumps(data, ensure_ascii=False), time.time()),
+        )
+
+    def update_operation(self, op_id: str, **fields) -> None:
+        # Read-modify-write inside one transaction so concurrent writers don't clobber
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT data FROM operations WHERE op_id = ?", (op_id,)).fetchone()
+                if row:
+                    data = json.loads(row["data"])
+                    data.update(fields)
+                    self._conn.execute(
+                        "UPDATE operations SET data = ?, updated_at = ? WHERE op_id = ?",
+                        (json.dumps(data, ensure_ascii=False), time.time(), op_id),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def enqueue_job(self, queue: str, job_id: str, session_id: str, payload: dict) -> None:
+        self._exec(
+            "INSERT OR REPLACE INTO jobs (job_id, queue, session_id, payload, status, attempts, enqueued_at) "
+            "VALUES (?, ?, ?, ?, ?, 0, ?)",
+            (job_id, queue, session_id, json.dumps(payload, ensure_ascii=False), JOB_QUEUED, time.time()),
+        )
+
+    def claim_job(self, queue: str, worker_id: str, stale_after: float) -> dict | None:
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front: two workers can't claim the same job
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE queue = ? AND status = ? AND heartbeat_at < ? "
+                    "ORDER BY enqueued_at LIMIT 1",
+                    (queue, JOB_RUNNING, now - stale_after),
+                ).fetchone()
+                job_id = row["job_id"] if row else None
+                if job_id is None:
+                    order = self._queued_jobs_locked(queue)
+                    job_id = order[0] if order else None
+                if job_id is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = ?, heartbeat_at = ?, attempts = attempts + 1 "
+                    "WHERE job_id = ?",
+                    (JOB_RUNNING, worker_id, now, job_id),
+                )
+                job = self._conn.execute(
+                    "SELECT job_id, session_id, payload, attempts FROM jobs WHERE job_id = ?", (job_id,),
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO queue_served (queue, session_id, served_at) VALUES (?, ?, ?)",
+                    (queue, job["session_id"], now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {
+            "job_id": job["job_id"],
+            "session_id": job["session_id"],
+            "payload": json.loads(job["payload"]),
+            "attempts": job["attempts"],
+        }
+
+    def heartbeat_job(self, job_id: str, worker_id: str) -> None:
+        self._exec(
+            "UPDATE jobs SET heartbeat_at = ? WHERE job_id = ? AND worker_id = ?",
+            (time.time(), job_id, worker_id),
+        )
+
+    def finish_job(self, job_id: str, status: str) -> None:
+        now = time.time()
+        cutoff = now - settings.JOB_RETENTION
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ?",
+                (status, now, job_id),
+            )
+            # Terminal jobs are only kept for inspection; prune so the queue scans stay small
+            self._conn.execute("DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+            self._conn.execute("DELETE FROM queue_served WHERE served_at < ?", (cutoff,))
+
+    def _queued_jobs_locked(self, queue: str) -> list[str]:
+        rows = self._conn.execute(
+            "SELECT job_id, session_id FROM jobs WHERE queue = ? AND status = ? ORDER BY enqueued_at",
+            (queue, JOB_QUEUED),
+        ).fetchall()
+        served = {
+            r["session_id"]: r["served_at"]
+            for r in self._conn.execute("SELECT session_id, served_at FROM queue_served WHERE queue = ?", (queue,))
+        }
+        return _dispatch_order([(r["job_id"], r["session_id"]) for r in rows], served)
+
+    def queued_jobs(self, queue: str) -> list[str]:
+        with self._lock:
+            return self._queued_jobs_locked(queue)
+
+    def running_count(self, queue: str) -> int:
+        row = self._exec(
+            "SELECT COUNT(*) AS n FROM jobs WHERE queue = ? AND status = ?", (queue, JOB_RUNNING),
+        ).fetchone()
+        return row["n"]
+
+    def put_suno_result(self, task_id: str, audio_url: str | None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM suno_results WHERE created_at < ?", (now - SUNO_RESULT_TTL,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO suno_results (task_id, audio_url, created_at) VALUES (?, ?, ?)",
+                (task_id, audio_url, now),
+            )
+
+    def take_suno_result(self, task_id: str) -> tuple[bool, str | None]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT audio_url FROM suno_results WHERE task_id = ?", (task_id,),
+            ).fetchone()
+            if row is None:
+                return False, None
+            self._conn.execute("DELETE FROM suno_results WHERE task_id = ?", (task_id,))
+        return True, row["audio_url"]
+
+
+_store: StateStore | None = None
+
+
+def get_state_store() -> StateStore:
+    global _store
+    if _store is None:
+        url = settings.STATE_STORE_URL
+        if url.startswith("sqlite:///"):
+            _store = SQLiteStateStore(url[len("sqlite:///"):])
+        elif url == "memory":
+            _store = MemoryStateStore()
+        else:
+            raise ValueError(f"Unsupported STATE_STORE_URL: {url}")
+    return _store
@@ -20,10 +20,15 @@ Callback stages: text → first → complete (only "complete" has final audio UR
 import asyncio
 import logging
 import os
+import time
 
 import httpx
 
 from src.config import settings
+from src.services import media_cache, tracing
+from src.services.metrics import SUNO_RESOLUTIONS
+from src.services.rate_limiter import limited, parse_retry_after
+from src.services.state_store import get_state_store
 
 logger = logging.getLogger(__name__)
 
@@ -33,8 +38,12 @@ SUNO_BASE = settings.SUNO_API_BASE
 _suno_client: httpx.AsyncClient | None = None
 
 # Pending callback results: task_id → {"event": asyncio.Event, "audio_url": str | None}
+# Callbacks for tasks waited on in another process go through the shared state store.
 _pending_callbacks: dict[str, dict] = {}
 
+_CALLBACK_WAIT = 180.0
+_STORE_CHECK_INTERVAL = 3.0
+
 
 def _get_client() -> httpx.AsyncClient:
     global _suno_client
@@ -109,15 +118,19 @@ def handle_suno_callback(body: dict) -> None:
     if isinstance(songs, list) and songs:
         audio_url = _extract_audio_url(songs)
 
+    # Only update if we got a URL, or if this is "complete" (final stage)
+    if not (audio_url or callback_type == "complete"):
+        return
+
     pending = _pending_callbacks.get(task_id)
     if pending:
-        # Only update if we got a URL, or if this is "complete" (final stage)
-        if audio_url or callback_type == "complete":
-            pending["audio_url"] = audio_url
-            pending["event"].set()
-            logger.info("Suno callback resolved for task %s: %s", task_id, audio_url)
+        pending["audio_url"] = audio_url
+        pending["event"].set()
+        logger.info("Suno callback resolved for task %s: %s", task_id, audio_url)
     else:
-        logger.warning("Suno callback for unknown/expired task: %s (url=%s)", task_id, audio_url)
+        # Waiter lives in another process (or a resumed pipeline will ask later)
+        get_state_store().put_suno_result(task_id, audio_url)
+        logger.info("Suno callback stored for task %s (no local waiter): %s", task_id, audio_url)
 
 
 def _build_teaser_prompt(
@@ -169,11 +182,19 @@ async def generate_bgm(
     mood_keywords: list[str],
     lyrics_hint: str = "",
     instrumental_style: str = "",
+    on_submitted=None,
+    cache: bool = False,
 ) -> str | None:
     """Generate BGM using Suno API.
     Returns audio URL or None on failure.
 
     Flow: POST /api/v1/generate → get taskId → wait for callback → fallback to polling.
+
+    Args:
+        on_submitted: Optional callable(task_id) invoked once Suno accepts the task,
+            so callers can checkpoint the task ID and reattach via resume_bgm().
+        cache: Reuse the track of an identical earlier request (same prompt, style,
+            title and model) via media_cache; nothing is submitted on a hit.
     """
     mood_str = ", ".join(mood_keywords)
     style_desc = f"{genre}, {instrumental_style}, {mood_str}".strip(", ")
@@ -191,17 +212,38 @@ async def generate_bgm(
         "callBackUrl": callback_url,
     }
 
+    key = None
+    if cache:
+        key = media_cache.media_key(settings.SUNO_MODEL, {k: v for k, v in payload.items() if k != "callBackUrl"})
+        cached = media_cache.get("bgm", key)
+        if cached:
+            return cached
+
+    audio_url = await _run_bgm(payload, on_submitted)
+    if key and audio_url:
+        media_cache.put("bgm", key, audio_url)
+    return audio_url
+
+
+async def _run_bgm(payload: dict, on_submitted) -> str | None:
+    """Submit one Suno task and wait for its audio URL (callback, then polling)."""
+    title, callback_url = payload["title"], payload["callBackUrl"]
     client = _get_client()
 
     try:
         logger.info("Submitting to Suno API: %s (callback=%s)", title, callback_url)
-        resp = await client.post(
-            f"{SUNO_BASE}/api/v1/generate",
-            json=payload,
-            headers=_headers(),
-        )
-        resp.raise_for_status()
-        result = resp.json()
+        with tracing.span("suno.submit", cat="suno", model=settings.SUNO_MODEL):
+            async with limited("suno", settings.SUNO_MODEL) as slot:
+                resp = await client.post(
+                    f"{SUNO_BASE}/api/v1/generate",
+                    json=payload,
+                    headers=_headers(),
+                )
+                resp.raise_for_status()
+                result = resp.json()
+                # Suno may report rate limiting inside a 200 body
+                if result.get("code") == 429:
+                    slot.throttled(parse_retry_after(resp.headers.get("retry-after")))
 
         # API response: {"code": 200, "msg": "success", "data": {"taskId": "..."}}
         code = result.get("code", 0)
@@ -217,6 +259,8 @@ async def generate_bgm(
             return None
 
         logger.info("Suno task submitted: %s", task_id)
+        if on_submitted:
+            on_submitted(task_id)
 
         # Register pending callback and wait
         event = asyncio.Event()
@@ -224,25 +268,65 @@ async def generate_bgm(
 
         try:
             # Wait up to 180s for callback (Suno can take 30-120s)
-            await asyncio.wait_for(event.wait(), timeout=180)
-            pending = _pending_callbacks.get(task_id, {})
-            audio_url = pending.get("audio_url")
-            if audio_url:
-                logger.info("Suno BGM ready (callback): %s", audio_url)
-                return audio_url
-            logger.warning("Suno callback resolved but no audio_url, falling back to poll")
-        except asyncio.TimeoutError:
-            logger.warning("Suno callback timeout (180s), falling back to poll")
+            with tracing.span("suno.wait_callback", cat="suno", task_id=task_id):
+                resolved = await _wait_for_callback(task_id, event)
+            if resolved:
+                audio_url = _pending_callbacks.get(task_id, {}).get("audio_url")
+                if audio_url:
+                    logger.info("Suno BGM ready (callback): %s", audio_url)
+                    SUNO_RESOLUTIONS.inc(via="callback")
+                    return audio_url
+                logger.warning("Suno callback resolved but no audio_url, falling back to poll")
+            else:
+                logger.warning("Suno callback timeout (%.0fs), falling back to poll", _CALLBACK_WAIT)
         finally:
             _pending_callbacks.pop(task_id, None)
 
-        return await _poll_suno_task(task_id)
+        with tracing.span("suno.poll", cat="suno", task_id=task_id):
+            return await _poll_suno_task(task_id)
 
     except Exception as e:
         logger.error("Suno BGM generation failed: %s", e)
         return None
 
 
+async def _wait_for_callback(task_id: str, event: asyncio.Event) -> bool:
+    """Wait for the callback, whichever process it lands in. False on timeout."""
+    deadline = time.time() + _CALLBACK_WAIT
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        try:
+            await asyncio.wait_for(event.wait(), timeout=min(_STORE_CHECK_INTERVAL, remaining))
+            return True
+        except asyncio.TimeoutError:
+            found, audio_url = get_state_store().take_suno_result(task_id)
+            if found:
+                _pending_callbacks[task_id]["audio_url"] = audio_url
+                return True
+
+
+async def resume_bgm(task_id: str) -> str | None:
+    """Reattach to a previously submitted Suno task (e.g. after a restart).
+
+    The original callback has most likely already fired into a dead process,
+    so go straight to polling record-info.
+    """
+    logger.info("Resuming Suno task: %s", task_id)
+    found, audio_url = get_state_store().take_suno_result(task_id)
+    if found and audio_url:
+        logger.info("Suno BGM ready (stored callback): %s", audio_url)
+        SUNO_RESOLUTIONS.inc(via="stored_callback")
+        return audio_url
+    try:
+        with tracing.span("suno.poll", cat="suno", task_id=task_id, resumed=True):
+            return await _poll_suno_task(task_id)
+    except Exception as e:
+        logger.error("Suno BGM resume failed: %s", e)
+        return None
+
+
 async def _poll_suno_task(task_id: str, max_attempts: int = 60) -> str | None:
     """Poll Suno API for task completion.
 
@@ -255,13 +339,16 @@ async def _poll_suno_task(task_id: str, max_attempts: int = 60) -> str | None:
     for i in range(max_attempts):
         await asyncio.sleep(5)
         try:
-            resp = await client.get(
-                f"{SUNO_BASE}/api/v1/generate/record-info",
-                params={"taskId": task_id},
-                headers=_headers(),
-            )
-            resp.raise_for_status()
-            result = resp.json()
+            async with limited("suno", settings.SUNO_MODEL) as slot:
+                resp = await client.get(
+                    f"{SUNO_BASE}/api/v1/generate/record-info",
+                    params={"taskId": task_id},
+                    headers=_headers(),
+                )
+                resp.raise_for_status()
+                result = resp.json()
+                if result.get("code") == 429:
+                    slot.throttled(parse_retry_after(resp.headers.get("retry-after")))
 
             data = result.get("data", {})
             if not isinstance(data, dict):
@@ -284,8 +371,10 @@ async def _poll_suno_task(task_id: str, max_attempts: int = 60) -> str | None:
                     audio_url = _extract_audio_url(songs)
                     if audio_url:
                         logger.info("Suno BGM ready (polled): %s", audio_url)
+                        SUNO_RESOLUTIONS.inc(via="poll")
                         return audio_url
                 logger.warning("Suno SUCCESS but no audio URL in response: %s", data)
+                SUNO_RESOLUTIONS.inc(via="failed")
                 return None
 
             elif status == "FIRST_SUCCESS":
@@ -303,11 +392,13 @@ async def _poll_suno_task(task_id: str, max_attempts: int = 60) -> str | None:
                     audio_url = _extract_audio_url(songs)
                     if audio_url:
                         logger.info("Suno BGM ready (first_success): %s", audio_url)
+                        SUNO_RESOLUTIONS.inc(via="poll")
                         return audio_url
 
             elif status in ("CREATE_TASK_FAILED", "GENERATE_AUDIO_FAILED", "SENSITIVE_WORD_ERROR", "CALLBACK_EXCEPTION"):
                 error_msg = data.get("errorMessage", status)
                 logger.error("Suno task failed: %s — %s", status, error_msg)
+                SUNO_RESOLUTIONS.inc(via="failed")
                 return None
 
             logger.debug("Suno poll [%d/%d]: %s", i + 1, max_attempts, status)
@@ -317,4 +408,5 @@ async def _poll_suno_task(task_id: str, max_attempts: int = 60) -> str | None:
             continue
 
     logger.error("Suno task timed out: %s", task_id)
+    SUNO_RESOLUTIONS.inc(via="failed")
     return None
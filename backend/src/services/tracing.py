@@ -0,0 +1,248 @@
+"""Span tracing for teaser pipelines, exportable as Chrome trace / Perfetto JSON.
+
+A trace is opened per pipeline run (`pipeline_trace(session_id, unit_name)`),
+and any code running inside it — directly or in asyncio tasks created from it,
+since contextvars are copied into tasks — can open nested spans:
+
+    with tracing.span("veo.clip", cat="fal", scene=3) as s:
+        ...
+        if s: s.args["request_id"] = request_id
+
+Outside a trace `span()` is a no-op yielding None, so services can be
+instrumented unconditionally. Phases only known after the fact (e.g. fal
+queue-wait vs. run) are added with `record()`.
+
+Stage spans (cat="stage") carry their dependency names; `critical_path()`
+walks back from the last stage to finish through the dependency that finished
+latest, i.e. the chain of stages that actually bounded the run.
+
+Traces of recent runs are kept in memory; finished traces are also written to
+the group's asset folder (trace.json) so another process can serve them.
+"""
+
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+_MAX_TRACES = 50
+_MAX_SPANS = 5000
+
+_ids = itertools.count(1)
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "cat", "start", "end", "lane", "args")
+
+    def __init__(self, name: str, cat: str, parent_id: int | None, start: float, args: dict):
+        self.span_id = next(_ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.cat = cat
+        self.start = start
+        self.end: float | None = None
+        self.lane = 0
+        self.args = args
+
+
+class Trace:
+    def __init__(self, session_id: str, unit_name: str = ""):
+        self.session_id = session_id
+        self.unit_name = unit_name
+        self.t0 = time.time()
+        self.spans: list[Span] = []
+        # lane → stack of open spans; a child shares its parent's lane only if it
+        # nests cleanly there, otherwise it takes a free lane (concurrent siblings)
+        self._lanes: dict[int, list[Span]] = {}
+
+    def _open(self, name: str, cat: str, parent: Span | None, args: dict) -> Span | None:
+        if len(self.spans) >= _MAX_SPANS:
+            return None
+        span = Span(name, cat, parent.span_id if parent else None, time.time(), args)
+        if parent is not None and self._lanes.get(parent.lane, [None])[-1] is parent:
+            span.lane = parent.lane
+        else:
+            span.lane = next(lane for lane in itertools.count(1) if not self._lanes.get(lane))
+        self._lanes.setdefault(span.lane, []).append(span)
+        self.spans.append(span)
+        return span
+
+    def _close(self, span: Span) -> None:
+        span.end = time.time()
+        stack = self._lanes.get(span.lane, [])
+        if span in stack:
+            stack.remove(span)
+
+    def critical_path(self) -> list[dict]:
+        """Chain of stages that bounded the run, first to last.
+
+        `wait_s` is the gap between the blocking dependency finishing and the
+        stage starting; `longest_child` names what dominated the stage.
+        """
+        now = time.time()
+        stages = {s.name: s for s in self.spans if s.cat == "stage"}
+        if not stages:
+            return []
+
+        def end(s: Span) -> float:
+            return s.end if s.end is not None else now
+
+        path = [max(stages.values(), key=end)]
+        while True:
+            deps = [stages[d] for d in path[-1].args.get("deps", ()) if d in stages]
+            if not deps:
+                break
+            path.append(max(deps, key=end))
+        path.reverse()
+
+        result = []
+        prev_end = self.t0
+        for s in path:
+            children = [c for c in self.spans if c.parent_id == s.span_id]
+            longest = max(children, key=lambda c: end(c) - c.start, default=None)
+            result.append({
+                "stage": s.name,
+                "start_s": round(s.start - self.t0, 3),
+                "end_s": round(end(s) - self.t0, 3),
+                "duration_s": round(end(s) - s.start, 3),
+                "wait_s": round(max(0.0, s.start - prev_end), 3),
+                "longest_child": (
+                    {"name": longest.name, "duration_s": round(end(longest) - longest.start, 3)}
+                    if longest else None
+                ),
+            })
+            prev_end = end(s)
+        return result
+
+    def to_chrome(self) -> dict:
+        """Chrome trace event format (chrome://tracing, ui.perfetto.dev)."""
+        now = time.time()
+        label = f"teaser {self.unit_name} ({self.session_id})" if self.unit_name else f"teaser {self.session_id}"
+        events = [
+            {"ph": "M", "name": "process_name", "pid": 1, "tid": 0, "args": {"name": label}},
+            {"ph": "M", "name": "thread_name", "pid": 1, "tid": 0, "args": {"name": "critical path"}},
+        ]
+        for lane in sorted({s.lane for s in self.spans}):
+            events.append({"ph": "M", "name": "thread_name", "pid": 1, "tid": lane, "args": {"name": f"lane {lane}"}})
+
+        for s in self.spans:
+            end = s.end if s.end is not None else now
+            args = {k: v for k, v in s.args.items() if v is not None}
+            if s.end is None:
+                args["running"] = True
+            events.append({
+                "name": s.name, "cat": s.cat or "span", "ph": "X", "pid": 1, "tid": s.lane,
+                "ts": round((s.start - self.t0) * 1e6), "dur": round((end - s.start) * 1e6),
+                "args": args,
+            })
+
+        critical = self.critical_path()
+        for step in critical:
+            events.append({
+                "name": step["stage"], "cat": "critical", "ph": "X", "pid": 1, "tid": 0,
+                "ts": round(step["start_s"] * 1e6), "dur": round(step["duration_s"] * 1e6),
+                "args": {"wait_s": step["wait_s"], "longest_child": step["longest_child"]},
+            })
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "session_id": self.session_id,
+                "unit_name": self.unit_name,
+                "started_at": self.t0,
+                "critical_path": critical,
+            },
+        }
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("span", default=None)
+
+# session_id → most recent trace (in-process)
+_traces: OrderedDict[str, Trace] = OrderedDict()
+
+
+@contextmanager
+def pipeline_trace(session_id: str, unit_name: str = ""):
+    """Open a trace for a pipeline run (no-op if one is already active).
+
+    On exit the trace is written to the group's trace.json.
+    """
+    active = _current_trace.get()
+    if active is not None:
+        yield active
+        return
+
+    trace = Trace(session_id, unit_name)
+    _traces[session_id] = trace
+    _traces.move_to_end(session_id)
+    while len(_traces) > _MAX_TRACES:
+        _traces.popitem(last=False)
+
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        with span("pipeline", cat="pipeline", session_id=session_id, unit_name=unit_name):
+            yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        if unit_name:
+            _persist(trace)
+
+
+@contextmanager
+def span(name: str, cat: str = "", **args):
+    """Time a block as a child of the current span. Yields the Span, or None outside a trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    s = trace._open(name, cat, _current_span.get(), args)
+    if s is None:
+        yield None
+        return
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.args["error"] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        _current_span.reset(token)
+        trace._close(s)
+
+
+def record(name: str, start: float, end: float, cat: str = "", **args) -> None:
+    """Add an already-finished child span (epoch seconds) under the current span."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    s = trace._open(name, cat, _current_span.get(), args)
+    if s is None:
+        return
+    s.start = start
+    trace._close(s)
+    s.end = end
+
+
+def get_trace(session_id: str) -> dict | None:
+    """Chrome trace JSON for the session's latest run (live if still running here)."""
+    trace = _traces.get(session_id)
+    if trace is not None:
+        return trace.to_chrome()
+    from src.services import asset_store
+    return asset_store.find_trace(session_id)
+
+
+def _persist(trace: Trace) -> None:
+    from src.services import asset_store
+    try:
+        asset_store.save_trace(trace.unit_name, trace.to_chrome())
+    except Exception as e:
+        logger.warning("[trace] failed to save trace for %s: %s", trace.session_id, e)
@@ -2,8 +2,14 @@
 Uses first-last-frame-to-video endpoint for image-to-video teaser generation.
 
 Uses the official fal_client library for correct queue handling
-(submit → poll → result) instead of raw httpx calls.
+(submit → poll → result) instead of raw httpx calls. The queue request_id is
+exposed to callers so in-flight jobs can be checkpointed and resumed.
+
+Keyframes are uploaded to fal storage once (start_frame_upload, as soon as the
+keyframe exists) and submitted by URL; an interior keyframe is both scene N's
+last frame and scene N+1's first, and shares the one upload.
 """
+import asyncio
 import logging
 import os
 import time
@@ -11,6 +17,10 @@ import time
 import fal_client
 
 from src.config import settings
+from src.services import asset_store, media_cache, tracing
+from src.services.hedging import HedgeBudget, hedged_call
+from src.services.metrics import FAL_QUEUE_WAIT, FAL_RUN_TIME
+from src.services.rate_limiter import limited
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +29,48 @@ FAL_MODEL = "fal-ai/veo3.1/fast/first-last-frame-to-video"
 # Set FAL_KEY env var for fal_client authentication
 os.environ.setdefault("FAL_KEY", settings.FAL_API_KEY)
 
+# Image handle → task uploading it to fal storage (handles are content-addressed)
+_uploads: dict[str, asyncio.Task] = {}
+_MAX_UPLOADS = 256
+
+
+def start_frame_upload(image: str | None) -> None:
+    """Begin uploading a keyframe (image handle) to fal storage in the background."""
+    if image and asset_store.local_path_for_url(image):
+        _upload_task(image)
+
+
+def _upload_task(image: str) -> asyncio.Task:
+    task = _uploads.get(image)
+    if task is None or (task.done() and (task.cancelled() or task.exception())):
+        task = _uploads[image] = asyncio.create_task(_upload(image))
+        if len(_uploads) > _MAX_UPLOADS:
+            for old in [k for k, t in _uploads.items() if t.done()][:len(_uploads) - _MAX_UPLOADS]:
+                del _uploads[old]
+    return task
+
+
+async def _upload(image: str) -> str:
+    path = asset_store.local_path_for_url(image)
+    if path is None:
+        raise FileNotFoundError(image)
+    data = await asyncio.to_thread(path.read_bytes)
+    with tracing.span("fal.upload", cat="fal", bytes=len(data)):
+        url = await fal_client.upload_async(data, "image/png", file_name=path.name)
+    logger.info("[veo] uploaded frame %s (%.0f KB) → %s", path.name[:12], len(data) / 1024, url)
+    return url
+
+
+async def frame_url(image: str | None) -> str | None:
+    """fal-hosted URL for a frame, uploading it once; inline data URI if that fails."""
+    if not image or not asset_store.local_path_for_url(image):
+        return asset_store.image_data_uri(image)
+    try:
+        return await asyncio.shield(_upload_task(image))
+    except Exception as e:
+        logger.warning("[veo] frame upload failed, sending inline: %s", e)
+        return asset_store.image_data_uri(image)
+
 
 async def generate_single_clip(
     prompt: str,
@@ -26,11 +78,26 @@ async def generate_single_clip(
     scene_number: int,
     first_frame_url: str | None = None,
     last_frame_url: str | None = None,
+    on_submitted=None,
+    hedge_budget: HedgeBudget | None = None,
+    cache: bool = False,
 ) -> str | None:
-    """Generate a single 8-second video clip using fal_client.subscribe_async().
+    """Generate a single 8-second video clip via fal's queue (submit → events → result).
 
     For seamless scene chaining, provide both first_frame_url and last_frame_url.
-    Scene N's last_frame should be Scene N+1's first_frame.
+    Scene N's last_frame should be Scene N+1's first_frame. Frames may be image
+    handles; they are submitted as fal storage URLs (see frame_url).
+
+    Args:
+        on_submitted: Optional callable(request_id) invoked once fal has queued the
+            job, so callers can checkpoint it and reattach via resume_clip(). With a
+            hedge it always names the job to resume: the primary's, or the hedge's
+            once the primary has failed.
+        hedge_budget: Stage-wide hedge cap. When given (and HEDGE_ENABLED), a duplicate
+            job is submitted if this one runs past the observed latency percentile;
+            the slower job is cancelled through fal's queue cancel API.
+        cache: Reuse the clip of an identical earlier job (same prompt and frames) via
+            media_cache — on a hit nothing is submitted and on_submitted isn't called.
 
     Returns video URL or None on failure.
     """
@@ -51,39 +118,127 @@ async def generate_single_clip(
         # If only first_frame provided, use same image for last_frame
         payload["last_frame_url"] = first_frame_url
 
+    # Handles are content-addressed, so the cache key is taken before inlining the bytes
+    key = media_cache.media_key(FAL_MODEL, payload) if cache else None
+    if key:
+        cached = media_cache.get("clip", key)
+        if cached:
+            return cached
+    fields = [f for f in ("first_frame_url", "last_frame_url") if f in payload]
+    urls = await asyncio.gather(*(frame_url(payload[f]) for f in fields))
+    payload.update(zip(fields, urls))
+
+    # attempt number → fal request_id (attempt 1 is the hedge, if any)
+    request_ids: dict[int, str] = {}
+    running: set[int] = set()
+
+    def record_resumable() -> None:
+        # Only the oldest attempt still running is checkpointed: a hedge doesn't replace
+        # the primary's id, and a failed attempt hands over to the other one
+        live = sorted(n for n in running if n in request_ids)
+        if on_submitted and live:
+            on_submitted(request_ids[live[0]])
+
+    async def attempt(n: int) -> str | None:
+        def submitted(request_id: str):
+            request_ids[n] = request_id
+            if n == min(running):
+                record_resumable()
+        running.add(n)
+        try:
+            result = await _run_clip(payload, scene_number, submitted, hedge=bool(n))
+        finally:
+            running.discard(n)
+        if result is None:
+            record_resumable()
+        return result
+
+    async def cancel(n: int) -> None:
+        request_id = request_ids.get(n)
+        if request_id:
+            logger.info("[veo] clip %d: cancelling losing request %s", scene_number, request_id)
+            await fal_client.cancel_async(FAL_MODEL, request_id)
+
+    url = await hedged_call(
+        "veo", attempt, budget=hedge_budget, on_cancel=cancel, label=f"clip {scene_number}",
+    )
+    if key and url:
+        media_cache.put("clip", key, url)
+    return url
+
+
+async def _run_clip(payload: dict, scene_number: int, on_submitted, hedge: bool = False) -> str | None:
+    """Submit one fal queue job, follow its status events and return the video URL."""
+    t0 = time.time()
     try:
         has_first = bool(payload.get("first_frame_url"))
         has_last = bool(payload.get("last_frame_url"))
         logger.info(
-            "[veo] clip %d: submitting (first_frame=%s, last_frame=%s, prompt=%s...)",
-            scene_number, has_first, has_last, prompt[:80],
-        )
-        t0 = time.time()
-
-        def on_queue_update(update):
-            status = getattr(update, "status", str(update))
-            elapsed = time.time() - t0
-            logger.info("[veo] clip %d: [%.0fs] queue=%s", scene_number, elapsed, status)
-
-        result = await fal_client.subscribe_async(
-            FAL_MODEL,
-            arguments=payload,
-            with_logs=True,
-            on_queue_update=on_queue_update,
+            "[veo] clip %d: submitting%s (first_frame=%s, last_frame=%s, prompt=%s...)",
+            scene_number, " HEDGE" if hedge else "", has_first, has_last, payload["prompt"][:80],
         )
 
+        # The slot is held for the job's lifetime: fal throttles on running jobs, not requests
+        with tracing.span("veo.clip", cat="fal", scene=scene_number, hedge=hedge) as span:
+            async with limited("fal", FAL_MODEL):
+                handle = await fal_client.submit_async(FAL_MODEL, arguments=payload)
+                logger.info("[veo] clip %d: queued request_id=%s", scene_number, handle.request_id)
+                on_submitted(handle.request_id)
+                if span:
+                    span.args["request_id"] = handle.request_id
+
+                submitted_at = time.time()
+                started_at = None
+                async for update in handle.iter_events(with_logs=True):
+                    status = getattr(update, "status", type(update).__name__)
+                    if started_at is None and isinstance(update, fal_client.InProgress):
+                        started_at = time.time()
+                    elapsed = time.time() - t0
+                    logger.info("[veo] clip %d: [%.0fs] queue=%s", scene_number, elapsed, status)
+
+                result = await handle.get()
+                _record_phases(submitted_at, started_at, time.time())
+        return _extract_video_url(result, scene_number, t0)
+
+    except Exception as e:
         elapsed = time.time() - t0
-        video = result.get("video", {})
-        video_url = video.get("url") if isinstance(video, dict) else None
+        logger.error("[veo] clip %d ERROR (%.1fs): %s", scene_number, elapsed, e)
+        return None
+
 
-        if video_url:
-            logger.info("[veo] clip %d DONE (%.1fs): %s", scene_number, elapsed, video_url)
-            return video_url
-        else:
-            logger.error("[veo] clip %d FAIL (%.1fs): no video in result: %s", scene_number, elapsed, result)
-            return None
+def _record_phases(submitted_at: float, started_at: float | None, done_at: float) -> None:
+    """Split a fal job into queue-wait and run time (from its status events)."""
+    if started_at is None:
+        # Never saw InProgress (e.g. finished between polls): attribute all to run
+        started_at = submitted_at
+    tracing.record("fal.queue", submitted_at, started_at, cat="fal")
+    tracing.record("fal.run", started_at, done_at, cat="fal")
+    FAL_QUEUE_WAIT.observe(started_at - submitted_at, model=FAL_MODEL)
+    FAL_RUN_TIME.observe(done_at - started_at, model=FAL_MODEL)
 
+
+async def resume_clip(request_id: str, scene_number: int) -> str | None:
+    """Reattach to a fal request submitted before a restart and wait for its result."""
+    t0 = time.time()
+    try:
+        logger.info("[veo] clip %d: resuming request_id=%s", scene_number, request_id)
+        with tracing.span("veo.resume", cat="fal", scene=scene_number, request_id=request_id):
+            async with limited("fal", FAL_MODEL):
+                result = await fal_client.result_async(FAL_MODEL, request_id)
+        return _extract_video_url(result, scene_number, t0)
     except Exception as e:
         elapsed = time.time() - t0
-        logger.error("[veo] clip %d ERROR (%.1fs): %s", scene_number, elapsed, e)
+        logger.error("[veo] clip %d RESUME ERROR (%.1fs): %s", scene_number, elapsed, e)
         return None
+
+
+def _extract_video_url(result: dict, scene_number: int, t0: float) -> str | None:
+    elapsed = time.time() - t0
+    video = result.get("video", {})
+    video_url = video.get("url") if isinstance(video, dict) else None
+
+    if video_url:
+        logger.info("[veo] clip %d DONE (%.1fs): %s", scene_number, elapsed, video_url)
+        return video_url
+    logger.error("[veo] clip %d FAIL (%.1fs): no video in result: %s", scene_number, elapsed, result)
+    return None
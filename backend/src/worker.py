@@ -0,0 +1,182 @@
+"""Teaser pipeline jobs and the standalone worker entry point.
+
+The API enqueues teaser jobs (generate / resume / regenerate_scene) into the
+shared state store; `teaser_queue` workers claim and run them. Workers run
+inside the API process by default (TEASER_INPROCESS_WORKERS=true) and/or as
+separate processes sharing a SQLite store:
+
+    STATE_STORE_URL=sqlite:////var/lib/debut/state.db python -m src.worker
+"""
+
+import asyncio
+import logging
+import signal
+import time
+
+from src.agents.director_agent import DirectorAgent
+from src.config import settings
+from src.models.session import Blueprint
+from src.services import asset_store, metrics
+from src.services.checkpoint import TeaserCheckpoint
+from src.services.job_queue import JobQueue
+from src.services.metrics import PIPELINES_IN_FLIGHT
+from src.services.session_store import restore_session, update_session
+from src.services.state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+_director = DirectorAgent()
+
+
+def _load_blueprint(session_id: str) -> dict:
+    session = restore_session(session_id)
+    if session.blueprint is not None:
+        return session.blueprint.model_dump()
+    checkpoint = TeaserCheckpoint.find(session_id)
+    blueprint_dict = asset_store.load_blueprint(checkpoint.unit_name) if checkpoint else None
+    if not blueprint_dict:
+        raise RuntimeError(f"No blueprint for session {session_id}")
+    update_session(session_id, blueprint=Blueprint(**blueprint_dict))
+    return blueprint_dict
+
+
+def _build_production(job: dict):
+    """Map a serialized job payload onto a director coroutine factory."""
+    payload = job["payload"]
+    session_id = job["session_id"]
+    kind = payload["kind"]
+    blueprint_dict = _load_blueprint(session_id)
+
+    if kind == "regenerate_scene":
+        # Idempotent per regen_id: a reclaimed job resumes instead of rewriting again
+        return lambda progress_callback: _director.regenerate_scene(
+            blueprint_dict, session_id, payload["scene_number"],
+            instructions=payload.get("instructions", ""), progress_callback=progress_callback,
+            regen_id=payload.get("regen_id"),
+        )
+
+    checkpoint = None
+    if kind == "resume" or job["attempts"] > 1:
+        # Explicit resume, or a job reclaimed from a dead worker: pick up its checkpoint
+        checkpoint = TeaserCheckpoint.find(session_id)
+        if checkpoint is None and kind == "resume":
+            raise RuntimeError(f"No checkpoint for session {session_id}")
+    if checkpoint is not None:
+        logger.info("[worker] %s: resuming from checkpoint (attempt %d)", job["job_id"], job["attempts"])
+    return lambda progress_callback: _director.produce_teaser(
+        blueprint_dict, session_id, progress_callback=progress_callback, checkpoint=checkpoint,
+    )
+
+
+async def run_teaser_job(job: dict) -> None:
+    """Queue worker job: run a Director Agent production (full, resumed or single-scene).
+
+    Failures are recorded on the operation and session, then re-raised so the
+    queue marks the job failed.
+    """
+    store = get_state_store()
+    operation_id = job["job_id"]
+    session_id = job["session_id"]
+
+    async def progress_callback(step: str, detail: str):
+        store.update_operation(operation_id, progress=f"{step}: {detail}")
+        update_session(session_id, teaser_progress=f"{step}: {detail}")
+
+    store.update_operation(operation_id, status="processing")
+    PIPELINES_IN_FLIGHT.inc()
+    t0 = time.time()
+    logger.info("[teaser] === PIPELINE START === op=%s session=%s", operation_id, session_id)
+    try:
+        produce = _build_production(job)
+        result = await produce(progress_callback=progress_callback)
+
+        # Use Remotion-rendered teaser_url if available, otherwise fallback to first clip
+        teaser_url = result.get("teaser_url")
+        if not teaser_url:
+            video_urls = [s.get("video_url") for s in result.get("scenes", []) if s.get("video_url")]
+            teaser_url = video_urls[0] if video_urls else None
+
+        elapsed = time.time() - t0
+        logger.info(
+            "[teaser] === PIPELINE COMPLETE === (%.1fs) teaser_url=%s scenes=%d bgm=%s",
+            elapsed, teaser_url, len(result.get("scenes", [])), bool(result.get("bgm_url")),
+        )
+
+        # Update session with all results (session is the source of truth)
+        update_session(
+            session_id,
+            scenario=result.get("scenario"),
+            teaser_scenes=result.get("scenes", []),
+            bgm_url=result.get("bgm_url"),
+            timeline=result.get("timeline"),
+            teaser_url=teaser_url,
+            status="completed",
+        )
+
+        store.update_operation(operation_id, status="completed")
+
+    except Exception as e:
+        elapsed = time.time() - t0
+        logger.error("[teaser] === PIPELINE FAILED === (%.1fs) %s", elapsed, e)
+        store.update_operation(operation_id, status="error", error=str(e))
+        update_session(session_id, teaser_progress=f"error: {e}")
+        raise  # the queue records the job as failed (and logs the traceback)
+    finally:
+        PIPELINES_IN_FLIGHT.dec()
+
+
+# Bounded worker pool for director pipelines (round-robin across sessions)
+teaser_queue = JobQueue(
+    "teaser",
+    run_teaser_job,
+    max_concurrent=settings.TEASER_MAX_CONCURRENT,
+    max_queued=settings.TEASER_MAX_QUEUED,
+)
+
+
+async def _serve_metrics(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Bare-bones HTTP responder so Prometheus can scrape a standalone worker."""
+    try:
+        await reader.readline()  # request line; every path returns metrics
+        stats = teaser_queue.stats()
+        metrics.TEASER_QUEUE_JOBS.set(stats["queued"], state="queued")
+        metrics.TEASER_QUEUE_JOBS.set(stats["running"], state="running")
+        body = metrics.render().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def main() -> None:
+    if settings.STATE_STORE_URL == "memory":
+        logger.warning("[worker] STATE_STORE_URL=memory — this worker only sees its own jobs")
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = None
+    if settings.WORKER_METRICS_PORT:
+        server = await asyncio.start_server(_serve_metrics, port=settings.WORKER_METRICS_PORT)
+        logger.info("[worker] metrics on :%d", settings.WORKER_METRICS_PORT)
+
+    teaser_queue.start()
+    await stop.wait()
+    if server:
+        server.close()
+    logger.info("[worker] shutting down; running jobs will be reclaimed by other workers")
+    await teaser_queue.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    asyncio.run(main())
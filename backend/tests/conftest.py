@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Tests import the app as `src.*`, like uvicorn/src.worker do from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def assets_root(tmp_path, monkeypatch):
+    """Point asset storage (and the renderer's work dirs) at a temp directory."""
+    from src.services import asset_store, ffmpeg_renderer
+
+    monkeypatch.setattr(asset_store, "ASSETS_ROOT", tmp_path)
+    monkeypatch.setattr(ffmpeg_renderer, "ASSETS_ROOT", tmp_path)
+    return tmp_path
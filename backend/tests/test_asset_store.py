@@ -0,0 +1,32 @@
+import os
+import time
+
+from src.services import asset_store
+
+
+def _aged_blob(data: bytes):
+    blob = asset_store.store_blob(data, ".mp4")
+    old = time.time() - 3600
+    os.utime(blob, (old, old))
+    return blob
+
+
+def test_gc_blobs_frees_blobs_only_the_url_map_remembers(assets_root, monkeypatch):
+    monkeypatch.setattr(asset_store, "_url_blobs", type(asset_store._url_blobs)())
+    monkeypatch.setattr(asset_store, "_hardlinks", None)
+    recent, stale, linked = _aged_blob(b"recent"), _aged_blob(b"stale"), _aged_blob(b"linked")
+    asset_store._remember_blob("https://cdn/recent.mp4", recent)
+    asset_store._remember_blob("https://cdn/stale.mp4", stale)
+    asset_store._url_blobs["https://cdn/stale.mp4"] = (stale, time.time() - 2 * asset_store._URL_BLOB_PIN)
+    asset_store.link_file(linked, assets_root / "G" / "final" / "clip_0.mp4")
+
+    assert asset_store.gc_blobs() == 1
+    assert recent.exists() and linked.exists() and not stale.exists()
+
+
+def test_url_blob_map_is_bounded(assets_root, monkeypatch):
+    monkeypatch.setattr(asset_store, "_url_blobs", type(asset_store._url_blobs)())
+    monkeypatch.setattr(asset_store, "_URL_BLOBS_MAX", 2)
+    for i in range(3):
+        asset_store._remember_blob(f"https://cdn/{i}.mp4", assets_root / f"{i}.mp4")
+    assert list(asset_store._url_blobs) == ["https://cdn/1.mp4", "https://cdn/2.mp4"]
@@ -0,0 +1,68 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents import base_agent
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+    def __init__(self, message: str, param: str | None = None):
+        super().__init__(message)
+        self.message = message
+        self.param = param
+
+
+class Agent(base_agent.BaseAgent):
+    name = "test"
+
+    def system_prompt(self) -> str:
+        return "test"
+
+
+def _response(k: int):
+    return SimpleNamespace(choices=[
+        SimpleNamespace(index=i, message=SimpleNamespace(content=json.dumps({"i": i}))) for i in range(k)
+    ])
+
+
+def _install(monkeypatch, error: Exception) -> list:
+    calls = []
+
+    async def chat_completion(n: int = 1, **kwargs):
+        calls.append(n)
+        if n > 1:
+            raise error
+        return _response(1)
+
+    monkeypatch.setattr(base_agent, "chat_completion", chat_completion)
+    monkeypatch.setattr(base_agent, "_N_UNSUPPORTED", set())
+    return calls
+
+
+@pytest.mark.parametrize("error", [
+    BadRequest("Invalid value for 'n': must be 1", param=None),
+    BadRequest("unsupported parameter", param="n"),
+    BadRequest("n must be 1 for this model"),
+])
+def test_n_rejection_falls_back_and_is_remembered(monkeypatch, error):
+    calls = _install(monkeypatch, error)
+    agent = Agent()
+    assert len(asyncio.run(agent.call_llm_variants("prompt", 3))) == 3
+    assert agent.model in base_agent._N_UNSUPPORTED
+    assert calls == [3, 1, 1, 1]
+
+
+@pytest.mark.parametrize("error", [
+    BadRequest("This model's maximum context length is 8192 tokens", param="messages"),
+    BadRequest("Invalid value for 'temperature'", param="temperature"),
+])
+def test_other_bad_requests_do_not_disable_n(monkeypatch, error):
+    _install(monkeypatch, error)
+    agent = Agent()
+    with pytest.raises(BadRequest):
+        asyncio.run(agent.call_llm_variants("prompt", 3))
+    assert agent.model not in base_agent._N_UNSUPPORTED
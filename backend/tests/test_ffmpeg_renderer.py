@@ -0,0 +1,60 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.services import ffmpeg_renderer
+
+TIMELINE = {"clips": [
+    {"type": "video", "data": {"src": f"https://cdn/clip_{i}.mp4"}} for i in range(4)
+] + [{"type": "audio", "data": {"src": "https://cdn/bgm.mp3"}}]}
+
+
+def _install(monkeypatch, outcomes: list) -> list:
+    """Fake downloads/probes; each ffmpeg run takes the next outcome (returncode or exception)."""
+    runs = []
+
+    async def download(url: str, dest: Path) -> bool:
+        dest.write_bytes(b"media")
+        return True
+
+    async def probe(path: Path) -> dict:
+        return {"format": ("h264", 720, 1280, "yuv420p", "24/1"), "duration": 8.0}
+
+    async def run_ffmpeg(cmd: list[str], step: str, timeout: float, **span_args) -> tuple[int, str]:
+        runs.append((step, span_args["bgm"]))
+        outcome = outcomes[len(runs) - 1]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if outcome == 0:
+            Path(cmd[-1]).write_bytes(b"teaser")
+        return outcome, "error"
+
+    monkeypatch.setattr(ffmpeg_renderer, "_download", download)
+    monkeypatch.setattr(ffmpeg_renderer, "_probe", probe)
+    monkeypatch.setattr(ffmpeg_renderer, "_run_ffmpeg", run_ffmpeg)
+    return runs
+
+
+def _render(assets_root) -> str | None:
+    output = assets_root / "Unit" / "final" / "teaser.mp4"
+    return asyncio.run(ffmpeg_renderer._render_teaser(TIMELINE, str(output), "Unit"))
+
+
+@pytest.mark.parametrize("outcomes, expected_runs", [
+    ([0], [("render_copy", True)]),
+    ([asyncio.TimeoutError(), 0], [("render_copy", True), ("render_reencode", True)]),
+    ([1, asyncio.TimeoutError(), 0], [("render_copy", True), ("render_reencode", True), ("render_reencode", False)]),
+])
+def test_render_falls_back_after_failure_or_timeout(assets_root, monkeypatch, outcomes, expected_runs):
+    runs = _install(monkeypatch, outcomes)
+    assert _render(assets_root) == "/api/assets/Unit/final/teaser.mp4"
+    assert runs == expected_runs
+    assert (assets_root / "Unit" / "final" / "teaser.mp4").read_bytes() == b"teaser"
+
+
+def test_render_gives_up_when_every_attempt_times_out(assets_root, monkeypatch):
+    runs = _install(monkeypatch, [asyncio.TimeoutError()] * 3)
+    assert _render(assets_root) is None
+    assert len(runs) == 3
+    assert not list((assets_root / "Unit" / "final").glob(".*rendering*"))
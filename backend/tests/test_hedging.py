@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from src.config import settings
+from src.services import hedging
+
+
+@pytest.fixture
+def hedging_on(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(hedging, "hedge_delay", lambda kind: 0.05)
+
+
+def _slow_attempts(started: list, cancelled: list):
+    async def attempt(n: int):
+        started.append(n)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return "late"
+    return attempt
+
+
+@pytest.mark.parametrize("budget, cancel_after, attempts", [
+    (hedging.HedgeBudget(max_hedges=1), 0.01, [0]),     # cancelled while waiting out the hedge delay
+    (hedging.HedgeBudget(max_hedges=0), 0.1, [0]),      # cancelled while awaiting the primary (no budget)
+    (hedging.HedgeBudget(max_hedges=1), 0.1, [0, 1]),   # cancelled while primary and hedge race
+])
+def test_cancelled_caller_cancels_running_attempts(hedging_on, budget, cancel_after, attempts):
+    started, cancelled, remote_cancels = [], [], []
+
+    async def on_cancel(n: int):
+        remote_cancels.append(n)
+
+    async def run():
+        call = asyncio.create_task(hedging.hedged_call(
+            "test", _slow_attempts(started, cancelled), budget=budget, on_cancel=on_cancel,
+        ))
+        await asyncio.sleep(cancel_after)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert started == attempts
+    assert sorted(cancelled) == attempts
+    assert sorted(remote_cancels) == attempts
+
+
+def test_loser_is_cancelled_when_the_hedge_wins(hedging_on):
+    remote_cancels = []
+
+    async def attempt(n: int):
+        await asyncio.sleep(10 if n == 0 else 0.01)
+        return f"attempt {n}"
+
+    async def on_cancel(n: int):
+        remote_cancels.append(n)
+
+    result = asyncio.run(hedging.hedged_call(
+        "test", attempt, budget=hedging.HedgeBudget(max_hedges=1), on_cancel=on_cancel,
+    ))
+    assert result == "attempt 1" and remote_cancels == [0]
@@ -0,0 +1,37 @@
+import asyncio
+import base64
+import io
+
+from PIL import Image
+
+from src.services import image_prep
+
+
+def _data_uri(color: str, size: int = 64) -> str:
+    buf = io.BytesIO()
+    Image.new("RGB", (size, size), color).save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def test_inline_images_are_memoised_by_digest(monkeypatch):
+    monkeypatch.setattr(image_prep, "_prepared", image_prep.OrderedDict())
+    decoded = []
+    decode = image_prep._decode
+    monkeypatch.setattr(image_prep, "_decode", lambda image: decoded.append(image) or decode(image))
+
+    red, blue = _data_uri("red"), _data_uri("blue")
+    first = asyncio.run(image_prep.reference_data_uri(red))
+    assert asyncio.run(image_prep.reference_data_uri(red)) == first
+    assert asyncio.run(image_prep.reference_data_uri(blue)) != first
+    assert decoded == [red, blue]
+    # The cache holds digests and the prepared (small) images, never the inline originals
+    assert all(key[0].startswith("sha256:") for key in image_prep._prepared)
+    assert red not in str(list(image_prep._prepared))
+
+
+def test_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(image_prep, "_prepared", image_prep.OrderedDict())
+    monkeypatch.setattr(image_prep, "_PREPARED_MAX", 2)
+    for color in ("red", "green", "blue"):
+        asyncio.run(image_prep.reference_data_uri(_data_uri(color)))
+    assert len(image_prep._prepared) == 2
@@ -0,0 +1,37 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from src.services import rate_limiter
+
+REQUEST = httpx.Request("POST", "https://gateway.example/v1/chat/completions")
+
+
+@pytest.mark.parametrize("exc", [
+    openai.APIConnectionError(request=REQUEST),
+    httpx.ConnectError("connection refused", request=REQUEST),
+    httpx.RemoteProtocolError("peer closed connection", request=REQUEST),
+    ConnectionResetError(),
+])
+def test_connection_failures_are_retryable(exc):
+    assert rate_limiter.classify_exception(exc) == (rate_limiter.OUTCOME_CONNECTION, None)
+
+
+def test_validation_errors_are_not_retried():
+    assert rate_limiter.classify_exception(ValueError("bad prompt")) == (rate_limiter.OUTCOME_ERROR, None)
+
+
+def test_call_with_limit_retries_a_connection_reset(monkeypatch):
+    monkeypatch.setattr(rate_limiter.random, "random", lambda: 0.0)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise openai.APIConnectionError(request=REQUEST)
+        return "ok"
+
+    result = asyncio.run(rate_limiter.call_with_limit("test-conn", "m", flaky))
+    assert result == "ok" and len(calls) == 2
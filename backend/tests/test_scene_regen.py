@@ -0,0 +1,153 @@
+import asyncio
+import base64
+import itertools
+
+from src.agents import director_agent
+from src.services.checkpoint import TeaserCheckpoint
+
+SESSION = "regen01"
+BLUEPRINT = {"unit_name": "REGEN", "members": [{"member_id": "m1", "stage_name": "ONE"}]}
+
+
+def _scenario() -> dict:
+    scenes = [
+        {"scene_number": n, "visual_concept": f"concept {n}", "member_focus": "m1"}
+        for n in range(1, 5)
+    ]
+    return {"title": "t", "mood": "calm", "music_direction": {}, "scenes": scenes}
+
+
+class FakeProviders:
+    """Keyframe / clip providers with an opt-in result cache, like media_cache."""
+
+    def __init__(self, assets_root):
+        self.assets_root = assets_root
+        self.takes = itertools.count(1)
+        self.cache: dict = {}
+        self.images: list[str] = []
+
+    async def generate_image(self, visual_description, unit_name, cache=False, **kwargs):
+        from src.services import asset_store
+
+        key = ("image", visual_description, kwargs.get("reference_image_b64"))
+        if cache and key in self.cache:
+            return self.cache[key]
+        data = base64.b64encode(f"frame-{next(self.takes)}".encode()).decode()
+        handle = asset_store.save_image(f"data:image/png;base64,{data}")
+        self.cache[key] = handle
+        self.images.append(visual_description)
+        return handle
+
+    async def generate_single_clip(self, prompt, first_frame_url=None, last_frame_url=None, cache=False, **kwargs):
+        key = ("clip", prompt, first_frame_url, last_frame_url)
+        if cache and key in self.cache:
+            return self.cache[key]
+        clip = self.assets_root / "clips" / f"take{next(self.takes)}.mp4"
+        clip.parent.mkdir(parents=True, exist_ok=True)
+        clip.write_bytes(clip.name.encode())
+        url = f"/api/assets/clips/{clip.name}"
+        self.cache[key] = url
+        return url
+
+
+class FakeAssembler:
+    def __init__(self, group_name):
+        pass
+
+    async def add(self, index, url):
+        return True
+
+
+def _install(monkeypatch, assets_root) -> tuple[director_agent.DirectorAgent, FakeProviders]:
+    providers = FakeProviders(assets_root)
+    monkeypatch.setattr(director_agent, "generate_image", providers.generate_image)
+    monkeypatch.setattr(director_agent, "generate_single_clip", providers.generate_single_clip)
+    monkeypatch.setattr(director_agent, "start_frame_upload", lambda image: None)
+    monkeypatch.setattr(director_agent, "ProgressiveConcat", FakeAssembler)
+
+    async def render_teaser(timeline, output_path, group_name="", assembler=None):
+        return "/api/assets/REGEN/final/teaser.mp4"
+
+    monkeypatch.setattr(director_agent, "render_teaser", render_teaser)
+
+    director = director_agent.DirectorAgent()
+
+    async def generate_scenario(blueprint, on_music_direction=None, on_scene=None):
+        return _scenario()
+
+    async def start_bgm_generation(scenario, unit_name="", on_submitted=None, cache=False):
+        return None
+
+    async def regenerate_scene(blueprint, scenario, scene_number, instructions=""):
+        return {**scenario["scenes"][scene_number - 1], "visual_concept": f"rewritten {scene_number}"}
+
+    monkeypatch.setattr(director.scenario_agent, "generate_scenario", generate_scenario)
+    monkeypatch.setattr(director.scenario_agent, "start_bgm_generation", start_bgm_generation)
+    monkeypatch.setattr(director.scenario_agent, "regenerate_scene", regenerate_scene)
+    return director, providers
+
+
+def test_regenerated_scene_is_not_served_from_the_media_cache(assets_root, monkeypatch):
+    director, providers = _install(monkeypatch, assets_root)
+
+    async def run():
+        first = await director.produce_teaser(BLUEPRINT, SESSION)
+        regen = await director.regenerate_scene(BLUEPRINT, SESSION, 2)
+        return first, regen
+
+    first, regen = asyncio.run(run())
+
+    before = [s["video_url"] for s in first["scenes"]]
+    after = [s["video_url"] for s in regen["scenes"]]
+    assert after[1] != before[1]
+    assert after[2:] == before[2:]
+    checkpoint = TeaserCheckpoint.find(SESSION)
+    assert not any(checkpoint.needs_refresh(name) for name in checkpoint.stages)
+
+
+def test_regenerating_an_interior_scene_redraws_its_frame_and_rechains(assets_root, monkeypatch):
+    director, providers = _install(monkeypatch, assets_root)
+
+    async def run():
+        first = await director.produce_teaser(BLUEPRINT, SESSION)
+        drawn = len(providers.images)
+        regen = await director.regenerate_scene(BLUEPRINT, SESSION, 2)
+        return first, regen, providers.images[drawn:]
+
+    first, regen, redrawn = asyncio.run(run())
+
+    # Scene 2's first frame comes from the rewritten visual concept
+    assert len(redrawn) == 1 and "rewritten 2" in redrawn[0]
+    assert regen["scenes"][1]["image_url"] != first["scenes"][1]["image_url"]
+    # Scene 1 ends on that frame, so it's re-rendered; scenes 3 and 4 are untouched
+    assert regen["scenes"][0]["last_frame_url"] == regen["scenes"][1]["image_url"]
+    before = [s["video_url"] for s in first["scenes"]]
+    after = [s["video_url"] for s in regen["scenes"]]
+    assert after[0] != before[0] and after[1] != before[1]
+    assert after[2:] == before[2:]
+
+
+def test_rerun_of_the_same_regen_resumes_without_rewriting(assets_root, monkeypatch):
+    director, providers = _install(monkeypatch, assets_root)
+    rewrites = []
+    rewrite = director.scenario_agent.regenerate_scene
+
+    async def counting_rewrite(blueprint, scenario, scene_number, instructions=""):
+        rewrites.append(scene_number)
+        return await rewrite(blueprint, scenario, scene_number, instructions=instructions)
+
+    monkeypatch.setattr(director.scenario_agent, "regenerate_scene", counting_rewrite)
+
+    async def run():
+        await director.produce_teaser(BLUEPRINT, SESSION)
+        regen = await director.regenerate_scene(BLUEPRINT, SESSION, 2, regen_id="r1")
+        # A reclaimed job reruns the same request: nothing is rewritten or invalidated again
+        rerun = await director.regenerate_scene(BLUEPRINT, SESSION, 2, regen_id="r1")
+        again = await director.regenerate_scene(BLUEPRINT, SESSION, 2, regen_id="r2")
+        return regen, rerun, again
+
+    regen, rerun, again = asyncio.run(run())
+
+    assert rewrites == [2, 2]
+    assert [s["video_url"] for s in rerun["scenes"]] == [s["video_url"] for s in regen["scenes"]]
+    assert again["scenes"][1]["video_url"] != regen["scenes"][1]["video_url"]
@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+
+from src import worker
+from src.services.state_store import get_state_store
+
+
+def test_failed_production_is_recorded_and_reraised(monkeypatch):
+    async def produce(progress_callback):
+        raise RuntimeError("veo down")
+
+    monkeypatch.setattr(worker, "_build_production", lambda job: produce)
+    monkeypatch.setattr(worker, "update_session", lambda session_id, **fields: None)
+    store = get_state_store()
+    store.put_operation("mv-fail01", {"status": "queued", "session_id": "fail01"})
+
+    job = {"job_id": "mv-fail01", "session_id": "fail01", "payload": {"kind": "generate"}, "attempts": 1}
+    with pytest.raises(RuntimeError, match="veo down"):
+        asyncio.run(worker.run_teaser_job(job))
+    operation = store.get_operation("mv-fail01")
+    assert operation["status"] == "error" and operation["error"] == "veo down"